@@ -0,0 +1,69 @@
+"""UI-independent core of the Steam game aggregator.
+
+The Streamlit app in ``videogameagg.py`` is a thin layer over this package;
+everything here can also be used from scripts, workers or benchmarks.
+"""
+from .async_steam import (
+    AccountRefresh,
+    AsyncSteamClient,
+    get_steam_usernames_sync,
+    import_account,
+    import_account_sync,
+    refresh_all_accounts,
+    refresh_all_accounts_sync,
+)
+from .auth import get_username, hash_password, login_user, register_user
+from .breaker import breaker_metrics, get_breaker, open_upstreams
+from .cache import get_cache, set_cache
+from .db import get_connection, init_db
+from .errors import CircuitOpenError, GameAggError, InvalidSteamURL, SteamAPIError, UserExistsError
+from .images import get_thumbnail, prefetch_thumbnails, prefetch_thumbnails_sync, prune_cache
+from .importer import (
+    ImportResult,
+    add_games_to_db,
+    import_steam_library,
+    set_catalog_genres,
+    store_games,
+    upsert_catalog,
+)
+from .migrations import migrate
+from .passwords import get_hasher, set_hasher, verify_password
+from .prices import PollResult, PriceOverview, poll_wishlist_prices, price_history
+from .recommender import generate_recommendations, parse_recommendations
+from .refresher import RefreshReport, RefreshResult, refresh_catalog, refresh_report
+from .repository import (
+    LibraryGame,
+    add_review,
+    add_reviews,
+    add_to_wishlist,
+    delete_review,
+    fetch_wishlist,
+    find_catalog_games,
+    get_catalog_details,
+    get_games_from_db,
+    get_known_appids,
+    get_played_games,
+    get_steam_accounts,
+    get_user_reviews,
+    get_user_reviews_for_ai,
+    has_existing_review,
+    is_game_in_wishlist,
+    remove_from_wishlist,
+    search_catalog,
+    update_review,
+)
+from .search import ReviewHit, ReviewPage, search_reviews
+from .similarity import SimilarGame, build_similarity, players_also_played, similar_games
+from .stats import LibraryStats, get_library_stats
+from .steam import (
+    GameDetails,
+    extract_user_id,
+    fetch_game_details,
+    fetch_game_news,
+    fetch_owned_games,
+    get_steam_username,
+    resolve_steam_id,
+    resolve_vanity_url,
+    search_game_by_name_steam,
+)
+from .transfer import TransferResult, export_user_data, import_user_data
@@ -0,0 +1,262 @@
+"""Command line entry point: ``python -m gameagg <command> ...``."""
+import argparse
+import multiprocessing
+import os
+import sqlite3
+import tempfile
+import time
+import tracemalloc
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from . import config
+from .cache import simulate_workload
+from .db import get_connection, init_db
+from .migrations import migrate
+from .passwords import Argon2Hasher, LegacySHA256Hasher, ScryptHasher, argon2
+from .prices import poll_wishlist_prices
+from .repository import get_games_from_db
+from .refresher import REFRESH_BUDGET, REFRESH_MAX_AGE, refresh_catalog, refresh_report
+from .similarity import TOP_K, build_similarity
+from .transfer import FORMAT_EXTENSIONS, export_user_data, import_user_data
+
+
+def cmd_migrate(args):
+    connection = sqlite3.connect(args.db_file)
+    try:
+        names = migrate(connection)
+        connection.execute("VACUUM")
+    finally:
+        connection.close()
+    print("Applied: " + ", ".join(names) if names else "Database already up to date.")
+
+
+def cmd_poll_prices(args):
+    init_db()
+    result = poll_wishlist_prices(batch_size=args.batch_size)
+    print(f"Polled {result.appids} apps in {result.requests} requests "
+          f"({result.failed_batches} failed): {result.changed} price changes recorded.")
+
+
+def _print_counts(verb, result):
+    counts = ", ".join(f"{rows} {table}" for table, rows in result.rows.items())
+    print(f"{verb} {counts} ({result.format}).")
+
+
+def cmd_export(args):
+    init_db()
+    _print_counts("Exported", export_user_data(args.user_id, args.directory, fmt=args.format))
+
+
+def cmd_import(args):
+    init_db()
+    _print_counts("Imported", import_user_data(args.user_id, args.directory, fmt=args.format))
+
+
+def cmd_build_similarity(args):
+    init_db()
+    result = build_similarity(top_k=args.top_k, full=args.full)
+    kind = "Full" if result.full else "Incremental"
+    print(f"{kind} build over {result.users} users and {result.items} games: "
+          f"recomputed {result.recomputed} games, wrote {result.neighbors} neighbour rows.")
+
+
+def cmd_refresh_catalog(args):
+    init_db()
+    max_age = args.max_age_days * 24 * 3600
+    if not args.report_only:
+        result = refresh_catalog(budget=args.budget, max_age=max_age)
+        print(f"Checked {result.requests} games: {result.changed} changed, {result.unchanged} unchanged, "
+              f"{result.unavailable} not on the store, {result.failed} failed"
+              + (" (stopped early: Steam Store unavailable)." if result.stopped else "."))
+    report = refresh_report(max_age=max_age)
+    coverage = report.fresh / report.catalog if report.catalog else 0.0
+    print(f"Coverage: {report.fresh} of {report.catalog} games checked in the last {args.max_age_days:g} days "
+          f"({coverage:.1%}), {report.checked} ever checked.")
+    print("Last checked: " + ", ".join(f"{label} {count}" for label, count in report.ages))
+    per_change = f"{report.requests_per_change:.1f}" if report.requests_per_change is not None else "n/a"
+    print(f"Last 30 days: {report.runs} runs, {report.requests} requests, {report.changed} rows changed, "
+          f"{per_change} requests per changed row.")
+
+
+def cmd_bench_cache(args):
+    prefix = f"bench:{uuid.uuid4().hex}"
+    jobs = [(args.backend, args.requests, args.keys, args.skew, seed, prefix) for seed in range(args.processes)]
+    started = time.perf_counter()
+    with multiprocessing.Pool(args.processes) as pool:
+        results = pool.starmap(simulate_workload, jobs)
+    elapsed = time.perf_counter() - started
+    hits = sum(h for h, _ in results)
+    misses = sum(m for _, m in results)
+    print(f"{args.backend}: {args.processes} processes x {args.requests} lookups over {args.keys} keys "
+          f"(zipf s={args.skew})")
+    print(f"hit ratio {hits / (hits + misses):.1%}, {misses} upstream calls, "
+          f"{(hits + misses) / elapsed:,.0f} lookups/s")
+
+
+def password_bench_settings():
+    settings = [LegacySHA256Hasher(), ScryptHasher(2 ** 14), ScryptHasher(2 ** 15), ScryptHasher(2 ** 16)]
+    if argon2 is not None:
+        settings += [Argon2Hasher(time_cost=2, memory_cost=19 * 1024), Argon2Hasher(time_cost=3, memory_cost=64 * 1024)]
+    return settings
+
+
+def _verify_for(hasher, stored, seconds):
+    count = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        hasher.verify("correct horse battery staple", stored)
+        count += 1
+    return count
+
+
+def cmd_bench_hash(args):
+    print(f"{'scheme':<8} {'parameters':<22} {'logins/s/core':>14} {f'logins/s x{args.threads}':>14}")
+    for hasher in password_bench_settings():
+        stored = hasher.hash("correct horse battery staple")
+        single = _verify_for(hasher, stored, args.seconds) / args.seconds
+        with ThreadPoolExecutor(args.threads) as pool:
+            counts = pool.map(_verify_for, [hasher] * args.threads, [stored] * args.threads,
+                              [args.seconds] * args.threads)
+            parallel = sum(counts) / args.seconds
+        print(f"{hasher.scheme:<8} {hasher.params or '-':<22} {single:>14,.1f} {parallel:>14,.1f}")
+
+
+BENCH_GENRES = ["Action", "Adventure", "Indie", "RPG", "Strategy", "Simulation", "Sports", "Racing"]
+
+# get_games_from_db before it returned LibraryGame rows: every column, sorted in Python
+LEGACY_LIBRARY_SQL = """
+    SELECT l.id, l.appid, c.game_name, l.playtime, c.genres, c.cover_url, c.store_url,
+           l.added_on, l.user_id, l.steam_user_id
+    FROM library l JOIN catalog c ON c.appid = l.appid
+    WHERE l.user_id = ? AND l.steam_user_id = ?
+"""
+
+
+def _legacy_library(user_id, steam_user_id, sort_by="playtime", genre=None):
+    conn = get_connection()
+    try:
+        games = conn.execute(LEGACY_LIBRARY_SQL, (user_id, steam_user_id)).fetchall()
+    finally:
+        conn.close()
+    # The page sorted the full list and only skipped non-matching genres while rendering
+    if sort_by == "playtime":
+        return sorted(games, key=lambda x: x[3], reverse=True)
+    return sorted(games, key=lambda x: x[2])
+
+
+def _fill_bench_library(rows):
+    """Create a user with one Steam account owning ``rows`` synthetic games."""
+    conn = get_connection()
+    try:
+        user_id = conn.execute("INSERT INTO users (username, password) VALUES ('bench', '')").lastrowid
+        catalog = [(str(appid), f"Synthetic Game {appid}",
+                    ", ".join(BENCH_GENRES[(appid + k) % len(BENCH_GENRES)] for k in range(3)),
+                    f"https://shared.akamai.steamstatic.com/store_item_assets/steam/apps/{appid}/header.jpg"
+                    f"?t=1726252771", config.STORE_URL_TEMPLATE.format(appid=appid))
+                   for appid in range(10, 10 + rows)]
+        conn.executemany("INSERT INTO catalog (appid, game_name, genres, cover_url, store_url) VALUES (?, ?, ?, ?, ?)",
+                         catalog)
+        conn.executemany("""
+            INSERT INTO library (user_id, steam_user_id, appid, playtime, added_on)
+            VALUES (?, '76561190000000000', ?, ?, CURRENT_TIMESTAMP)
+        """, [(user_id, appid, (int(appid) * 7919) % 50_000) for appid, *_ in catalog])
+        conn.commit()
+    finally:
+        conn.close()
+    return user_id, "76561190000000000"
+
+
+def _measure(func, *args, **kwargs):
+    """Return (rows, retained bytes, peak bytes, seconds) for one call.
+
+    Time comes from a separate untraced call; tracemalloc slows allocation down.
+    """
+    started = time.perf_counter()
+    func(*args, **kwargs)
+    elapsed = time.perf_counter() - started
+    tracemalloc.start()
+    result = func(*args, **kwargs)
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return len(result), retained, peak, elapsed
+
+
+def cmd_bench_library(args):
+    with tempfile.TemporaryDirectory() as directory:
+        config.DB_FILE = os.path.join(directory, "bench.db")
+        init_db()
+        account = _fill_bench_library(args.rows)
+        _legacy_library(*account)  # Warm the page cache so both paths read from memory
+        runs = [
+            ("10-tuples, Python sort", _legacy_library, {}),
+            ("LibraryGame, SQL sort", get_games_from_db, {}),
+            ("LibraryGame, genre=RPG", get_games_from_db, {"genre": "RPG"}),
+        ]
+        print(f"{args.rows} library rows; MiB per 10k rows")
+        print(f"{'path':<24} {'rows':>6} {'retained':>9} {'peak':>9} {'ms':>7}")
+        for label, func, kwargs in runs:
+            rows, retained, peak, elapsed = _measure(func, *account, **kwargs)
+            scale = 10_000 / args.rows / 2 ** 20
+            print(f"{label:<24} {rows:>6} {retained * scale:>9.2f} {peak * scale:>9.2f} {elapsed * 1000:>7.1f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m gameagg")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    migrate_parser = commands.add_parser("migrate", help="upgrade a database file to the current schema in place")
+    migrate_parser.add_argument("db_file")
+    migrate_parser.set_defaults(func=cmd_migrate)
+
+    prices_parser = commands.add_parser("poll-prices", help="record current prices of all wishlisted games")
+    prices_parser.add_argument("--batch-size", type=int, default=100)
+    prices_parser.set_defaults(func=cmd_poll_prices)
+
+    export_parser = commands.add_parser("export", help="write a user's library and reviews to a directory")
+    export_parser.add_argument("user_id", type=int)
+    export_parser.add_argument("directory")
+    export_parser.add_argument("--format", choices=sorted(FORMAT_EXTENSIONS))
+    export_parser.set_defaults(func=cmd_export)
+
+    import_parser = commands.add_parser("import", help="load an export into a user's library and reviews")
+    import_parser.add_argument("user_id", type=int)
+    import_parser.add_argument("directory")
+    import_parser.add_argument("--format", choices=sorted(FORMAT_EXTENSIONS))
+    import_parser.set_defaults(func=cmd_import)
+
+    similarity_parser = commands.add_parser("build-similarity", help="update the item-item neighbour table")
+    similarity_parser.add_argument("--top-k", type=int, default=TOP_K)
+    similarity_parser.add_argument("--full", action="store_true", help="recompute every game, not only changed ones")
+    similarity_parser.set_defaults(func=cmd_build_similarity)
+
+    refresh_parser = commands.add_parser("refresh-catalog", help="re-check catalog metadata and store what changed")
+    refresh_parser.add_argument("--budget", type=int, default=REFRESH_BUDGET, help="appdetails requests per run")
+    refresh_parser.add_argument("--max-age-days", type=float, default=REFRESH_MAX_AGE / (24 * 3600),
+                                help="skip games checked more recently than this")
+    refresh_parser.add_argument("--report-only", action="store_true", help="print the metrics report without refreshing")
+    refresh_parser.set_defaults(func=cmd_refresh_catalog)
+
+    bench_parser = commands.add_parser("bench-cache", help="measure cache hit ratio with several processes")
+    bench_parser.add_argument("--backend", default="memory", help="cache spec, e.g. memory,sqlite")
+    bench_parser.add_argument("--processes", type=int, default=4)
+    bench_parser.add_argument("--requests", type=int, default=5000, help="lookups per process")
+    bench_parser.add_argument("--keys", type=int, default=2000)
+    bench_parser.add_argument("--skew", type=float, default=1.1)
+    bench_parser.set_defaults(func=cmd_bench_cache)
+
+    hash_parser = commands.add_parser("bench-hash", help="measure password verifications per second")
+    hash_parser.add_argument("--seconds", type=float, default=2.0, help="time spent on each setting")
+    hash_parser.add_argument("--threads", type=int, default=multiprocessing.cpu_count())
+    hash_parser.set_defaults(func=cmd_bench_hash)
+
+    library_parser = commands.add_parser("bench-library", help="measure memory of loading a large library")
+    library_parser.add_argument("--rows", type=int, default=10_000)
+    library_parser.set_defaults(func=cmd_bench_library)
+
+    args = parser.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,257 @@
+"""asyncio counterpart of ``steam.py`` for bulk imports.
+
+A single ``AsyncSteamClient`` shares one connection pool and bounds the
+number of requests in flight with a semaphore, so thousands of appids can be
+enriched from one process without a thread per request.
+"""
+import asyncio
+from collections import namedtuple
+
+import httpx
+
+from . import config
+from .breaker import guarded_async_get
+from .cache import PERSONA_TTL, get_cache
+from .db import get_connection
+from .errors import CircuitOpenError, GameAggError, SteamAPIError
+from .images import prefetch_thumbnails
+from .importer import add_games_to_db, store_games
+from .repository import get_catalog_details, get_steam_accounts
+from .steam import REQUEST_TIMEOUT, decode_response, fetch_game_details, parse_app_details, parse_owned_games
+
+# Requests allowed in flight at once per client
+DEFAULT_CONCURRENCY = 100
+
+AccountRefresh = namedtuple("AccountRefresh", ["steam_user_id", "result", "error"])
+
+
+class AsyncSteamClient:
+    """Async Steam Web API / Store client.
+
+    Use as an async context manager::
+
+        async with AsyncSteamClient() as client:
+            games = await client.fetch_owned_games(steamid)
+    """
+
+    def __init__(self, concurrency=DEFAULT_CONCURRENCY, timeout=REQUEST_TIMEOUT):
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._client = httpx.AsyncClient(
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency),
+        )
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    async def aclose(self):
+        await self._client.aclose()
+
+    async def _get(self, upstream, url, params):
+        async with self._semaphore:
+            return await guarded_async_get(upstream, self._client, url, params)
+
+    async def get_steam_username(self, steam_id):
+        """Fetch Steam username from Steam ID, falling back to the ID itself."""
+        url = f"{config.STEAM_API_URL}/ISteamUser/GetPlayerSummaries/v2/"
+        params = {"key": config.STEAM_API_KEY, "steamids": steam_id}
+        try:
+            response = await self._get("steam_api", url, params)
+            if response.status_code == 200:
+                players = response.json().get("response", {}).get("players", [])
+                if players:
+                    return players[0].get("personaname", steam_id)
+        except (httpx.HTTPError, ValueError, CircuitOpenError):
+            pass
+        return steam_id
+
+    async def resolve_vanity_url(self, vanity_url):
+        """Resolve a vanity profile name to a Steam64 ID."""
+        url = f"{config.STEAM_API_URL}/ISteamUser/ResolveVanityURL/v1/"
+        params = {"key": config.STEAM_API_KEY, "vanityurl": vanity_url}
+        try:
+            response = await self._get("steam_api", url, params)
+        except httpx.HTTPError as e:
+            raise SteamAPIError(f"Failed to resolve vanity URL: {e}") from e
+        if response.status_code != 200:
+            raise SteamAPIError(f"Failed to resolve vanity URL. Steam API returned: {response.status_code}",
+                                response.status_code)
+        data = decode_response(response, "vanity URL")
+        if data.get("response", {}).get("success") == 1:
+            return data["response"].get("steamid")
+        raise SteamAPIError("Could not resolve vanity URL. Ensure the vanity URL is correct.")
+
+    async def fetch_game_news(self, app_id):
+        """Fetch recent news for a game by its Steam App ID."""
+        url = f"{config.STEAM_API_URL}/ISteamNews/GetNewsForApp/v2/"
+        params = {"appid": app_id, "count": 3, "maxlength": 300, "format": "json"}
+        try:
+            response = await self._get("steam_api", url, params)
+        except (httpx.HTTPError, CircuitOpenError):
+            return None
+        if response.status_code != 200:
+            return None
+        news_items = response.json().get("appnews", {}).get("newsitems", [])
+        return news_items if news_items else None
+
+    async def fetch_owned_games(self, steamid):
+        """Return the list of games owned by a Steam account."""
+        url = f"{config.STEAM_API_URL}/IPlayerService/GetOwnedGames/v1/"
+        params = {
+            "key": config.STEAM_API_KEY,
+            "steamid": steamid,
+            "include_appinfo": "true",
+            "include_played_free_games": "true",
+        }
+        try:
+            response = await self._get("steam_api", url, params)
+        except httpx.HTTPError as e:
+            raise SteamAPIError(f"Network error while fetching games: {e}") from e
+        if response.status_code == 200:
+            return parse_owned_games(response)
+        raise SteamAPIError(f"Failed to fetch games. Steam API returned: {response.status_code} - {response.text}",
+                            response.status_code)
+
+    async def fetch_game_details(self, appid, game_name):
+        """Async ``steam.fetch_game_details``; never raises."""
+        url = f"{config.STEAM_STORE_API_URL}/api/appdetails"
+        params = {"appids": appid, "l": "english", "cc": "us"}
+        try:
+            response = await self._get("steam_store", url, params)
+            if response.status_code == 200:
+                return parse_app_details(appid, game_name, response.json())
+            error = f"Unable to fetch details for {game_name}. Using basic information."
+        except httpx.HTTPError as e:
+            error = f"Network error while fetching game details: {str(e)}"
+        except (KeyError, ValueError) as e:
+            error = f"Error processing game data: {str(e)}"
+        except CircuitOpenError as e:
+            error = str(e)
+        return parse_app_details(appid, game_name, None)._replace(error=error)
+
+    async def fetch_many_game_details(self, games):
+        """Fetch details for many ``{"appid", "name"}`` dicts concurrently.
+
+        Returns:
+            dict: appid -> GameDetails
+        """
+        results = await asyncio.gather(*(self.fetch_game_details(g["appid"], g["name"]) for g in games))
+        return {game["appid"]: details for game, details in zip(games, results)}
+
+    async def get_steam_usernames(self, steam_ids):
+        """Return steam_id -> persona name for several accounts at once.
+
+        Names already in the shared cache are not requested again.
+        """
+        cache = get_cache()
+        names = {steam_id: cache.get(f"persona:{steam_id}") for steam_id in steam_ids}
+        missing = [steam_id for steam_id, name in names.items() if name is None]
+        fetched = await asyncio.gather(*(self.get_steam_username(steam_id) for steam_id in missing))
+        for steam_id, name in zip(missing, fetched):
+            names[steam_id] = name
+            if name != steam_id:
+                cache.set(f"persona:{steam_id}", name, PERSONA_TTL)
+        return {steam_id: names[steam_id] for steam_id in steam_ids}
+
+
+async def fetch_missing_details(client, games):
+    """Return appid -> GameDetails for every game, fetching only titles the catalog lacks.
+
+    Games are deduplicated by appid, so a title in several libraries is
+    looked up at most once.
+    """
+    unique = {game["appid"]: game for game in games}
+    details = get_catalog_details(unique)
+    details.update(await client.fetch_many_game_details(
+        [game for appid, game in unique.items() if appid not in details]))
+    return details
+
+
+async def import_account(user_id, steam_user_id, client=None, concurrency=DEFAULT_CONCURRENCY):
+    """Fetch a Steam library and enrich all new games concurrently.
+
+    Only games missing from the shared catalog hit the appdetails endpoint;
+    the database write itself happens in one transaction once every lookup
+    has finished, after which uncached cover thumbnails are prefetched.
+
+    Returns:
+        ImportResult: same result as ``importer.import_steam_library``
+    """
+    if client is None:
+        async with AsyncSteamClient(concurrency=concurrency) as client:
+            return await import_account(user_id, steam_user_id, client)
+
+    games = await client.fetch_owned_games(steam_user_id)
+    details = await fetch_missing_details(client, games)
+    # Rows removed from the catalog since the lookup fall back to a blocking fetch
+    result = add_games_to_db(games, user_id, steam_user_id,
+                             fetch_details=lambda appid, name: details.get(appid) or fetch_game_details(appid, name))
+    await prefetch_thumbnails(d.cover_url for d in details.values() if d.error is None)
+    return result
+
+
+async def refresh_all_accounts(user_id, client=None, concurrency=DEFAULT_CONCURRENCY):
+    """Refresh every Steam account linked to ``user_id`` in one pass.
+
+    Owned-game lists are fetched in parallel, each appid missing from the
+    catalog is looked up once no matter how many accounts own it, and all
+    accounts are written in a single transaction. An account whose library
+    can't be fetched is reported and skipped without failing the others.
+
+    Returns:
+        list: one AccountRefresh per linked account, with either an
+        ImportResult or the error message
+    """
+    if client is None:
+        async with AsyncSteamClient(concurrency=concurrency) as client:
+            return await refresh_all_accounts(user_id, client)
+
+    steam_ids = get_steam_accounts(user_id)
+    libraries = await asyncio.gather(*(client.fetch_owned_games(steam_id) for steam_id in steam_ids),
+                                     return_exceptions=True)
+    for library in libraries:
+        if isinstance(library, BaseException) and not isinstance(library, GameAggError):
+            raise library
+
+    details = await fetch_missing_details(client, [
+        game for games in libraries if not isinstance(games, GameAggError) for game in games])
+
+    summary = []
+    conn = get_connection()
+    try:
+        cursor = conn.cursor()
+        for steam_id, games in zip(steam_ids, libraries):
+            if isinstance(games, GameAggError):
+                summary.append(AccountRefresh(steam_id, None, str(games)))
+                continue
+            result = store_games(cursor, games, user_id, steam_id,
+                                 fetch_details=lambda appid, name: details.get(appid) or fetch_game_details(appid, name))
+            summary.append(AccountRefresh(steam_id, result, None))
+        conn.commit()
+    finally:
+        conn.close()
+    await prefetch_thumbnails(d.cover_url for d in details.values() if d.error is None)
+    return summary
+
+
+def refresh_all_accounts_sync(user_id, concurrency=DEFAULT_CONCURRENCY):
+    """Blocking wrapper around ``refresh_all_accounts``."""
+    return asyncio.run(refresh_all_accounts(user_id, concurrency=concurrency))
+
+
+async def _usernames(steam_ids):
+    async with AsyncSteamClient() as client:
+        return await client.get_steam_usernames(steam_ids)
+
+
+def get_steam_usernames_sync(steam_ids):
+    """Blocking wrapper resolving persona names for several Steam IDs concurrently."""
+    return asyncio.run(_usernames(steam_ids))
+
+
+def import_account_sync(user_id, steam_user_id, concurrency=DEFAULT_CONCURRENCY):
+    """Blocking wrapper around ``import_account`` for non-async callers."""
+    return asyncio.run(import_account(user_id, steam_user_id, concurrency=concurrency))
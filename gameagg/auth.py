@@ -0,0 +1,64 @@
+import sqlite3
+
+from .db import get_connection
+from .errors import UserExistsError
+from .passwords import burn_verification, hash_password, verify_password
+
+
+def register_user(username, password):
+    """Create a new user and return its user_id.
+
+    Raises:
+        UserExistsError: if the username is already taken.
+    """
+    conn = get_connection()
+    cursor = conn.cursor()
+    hashed_password = hash_password(password)
+    try:
+        cursor.execute("""
+            INSERT INTO users (username, password) VALUES (?,?)
+        """, (username, hashed_password))
+        conn.commit()
+        return cursor.lastrowid
+    except sqlite3.IntegrityError as e:
+        raise UserExistsError("Username already exists.") from e
+    finally:
+        conn.close()
+
+
+def login_user(username, password):
+    """Return the ``(user_id,)`` row for valid credentials, else None.
+
+    Hashes made with an older scheme or weaker parameters are replaced with
+    a fresh hash from the current hasher once the password has checked out.
+    """
+    conn = get_connection()
+    try:
+        row = conn.execute("SELECT user_id, password FROM users WHERE username = ?", (username,)).fetchone()
+        if row is None:
+            burn_verification(password)
+            return None
+        user_id, stored = row
+        valid, needs_rehash = verify_password(password, stored)
+        if not valid:
+            return None
+        if needs_rehash:
+            # Skip the upgrade if the password changed while we were hashing
+            conn.execute("UPDATE users SET password = ? WHERE user_id = ? AND password = ?",
+                         (hash_password(password), user_id, stored))
+            conn.commit()
+        return (user_id,)
+    finally:
+        conn.close()
+
+
+def get_username(user_id):
+    """Fetch username based on user_id."""
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT username FROM users WHERE user_id = ?", (user_id,))
+        result = cursor.fetchone()
+        return result[0] if result else None
+    finally:
+        conn.close()
@@ -0,0 +1,223 @@
+"""Per-upstream circuit breakers.
+
+Each upstream (Steam Web API, Steam Store, the image CDN, Gemini) has one
+``CircuitBreaker`` per process. It watches the outcome and latency of the
+last ``WINDOW`` calls; once at least ``MIN_CALLS`` have been made and
+``FAILURE_RATE`` of them failed or took longer than the upstream's
+slow-call threshold, the breaker opens and calls fail fast with
+``CircuitOpenError`` instead of tying up a Streamlit thread. After
+``RESET_TIMEOUT`` seconds a single probe call is let through (half-open);
+its outcome closes the breaker or opens it again. Outcomes of calls let
+through before the breaker last changed state are ignored, so a slow call
+started while it was closed can't decide a half-open probe.
+
+``breaker_metrics()`` reports every breaker's state and counters.
+"""
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import requests
+
+from .errors import CircuitOpenError
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+WINDOW = 20
+MIN_CALLS = 5
+FAILURE_RATE = 0.5
+RESET_TIMEOUT = 30
+SLOW_CALL_SECONDS = 5
+
+# Upstream -> (display name, slow-call threshold in seconds)
+UPSTREAMS = {
+    "steam_api": ("Steam Web API", SLOW_CALL_SECONDS),
+    "steam_store": ("Steam Store", SLOW_CALL_SECONDS),
+    "steam_cdn": ("Steam image CDN", SLOW_CALL_SECONDS),
+    "gemini": ("Gemini", 30),
+}
+
+
+class CircuitBreaker:
+    """Thread-safe breaker for one upstream; see the module docstring."""
+
+    def __init__(self, name, slow_call_seconds=SLOW_CALL_SECONDS, window=WINDOW, min_calls=MIN_CALLS,
+                 failure_rate=FAILURE_RATE, reset_timeout=RESET_TIMEOUT, clock=time.monotonic):
+        self.name = name
+        self.slow_call_seconds = slow_call_seconds
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._outcomes = deque(maxlen=window)
+        self._state = CLOSED
+        self._opened_at = None
+        self._probing = False
+        # Bumped on every state change; outcomes from an older generation are stale
+        self._generation = 0
+        self.calls = self.failures = self.slow_calls = self.rejected = self.times_opened = 0
+
+    @property
+    def state(self):
+        with self._lock:
+            if self._state == OPEN and self._clock() - self._opened_at >= self.reset_timeout:
+                return HALF_OPEN
+            return self._state
+
+    def allow(self):
+        """Return True if a call may go ahead now, counting it as rejected otherwise."""
+        return self._admit() is not None
+
+    def _admit(self):
+        """Let a call through and return the generation it belongs to, or None if rejected."""
+        with self._lock:
+            if self._state == OPEN and self._clock() - self._opened_at >= self.reset_timeout:
+                self._state = HALF_OPEN
+                self._generation += 1
+            if self._state == CLOSED:
+                return self._generation
+            if self._state == HALF_OPEN and not self._probing:
+                self._probing = True
+                return self._generation
+            self.rejected += 1
+            return None
+
+    def check(self):
+        """Raise ``CircuitOpenError`` unless a call may go ahead.
+
+        Returns:
+            int: the generation to pass to ``record`` with the call's outcome
+        """
+        generation = self._admit()
+        if generation is None:
+            retry_in = None
+            if self._opened_at is not None:
+                retry_in = max(0.0, self.reset_timeout - (self._clock() - self._opened_at))
+            raise CircuitOpenError(UPSTREAMS.get(self.name, (self.name,))[0], retry_in)
+        return generation
+
+    def record(self, success, latency, generation=None):
+        """Record the outcome of an allowed call; slow successes count as failures.
+
+        Outcomes of calls admitted in an earlier ``generation`` (see ``check``)
+        only count towards the metrics, not the breaker's state.
+        """
+        slow = latency > self.slow_call_seconds
+        failed = not success or slow
+        with self._lock:
+            self.calls += 1
+            self.failures += not success
+            self.slow_calls += slow
+            if generation is not None and generation != self._generation:
+                return
+            if self._state == HALF_OPEN:
+                self._probing = False
+                if failed:
+                    self._open()
+                else:
+                    self._state = CLOSED
+                    self._generation += 1
+                    self._outcomes.clear()
+                return
+            self._outcomes.append(failed)
+            if (self._state == CLOSED and len(self._outcomes) >= self.min_calls
+                    and sum(self._outcomes) / len(self._outcomes) >= self.failure_rate):
+                self._open()
+
+    def _open(self):
+        self._state = OPEN
+        self._generation += 1
+        self._opened_at = self._clock()
+        self.times_opened += 1
+        self._outcomes.clear()
+
+    @contextmanager
+    def guard(self):
+        """Run the ``with`` block as one call: fail fast if open, record how it went."""
+        generation = self.check()
+        started = time.perf_counter()
+        try:
+            yield
+        except BaseException:  # Includes cancellation, so a half-open probe is never left hanging
+            self.record(False, time.perf_counter() - started, generation)
+            raise
+        self.record(True, time.perf_counter() - started, generation)
+
+    def metrics(self):
+        with self._lock:
+            recent = len(self._outcomes)
+            return {
+                "state": self._state,
+                "calls": self.calls,
+                "failures": self.failures,
+                "slow_calls": self.slow_calls,
+                "rejected": self.rejected,
+                "times_opened": self.times_opened,
+                "recent_failure_rate": sum(self._outcomes) / recent if recent else 0.0,
+            }
+
+
+_breakers = {}
+_registry_lock = threading.Lock()
+
+
+def get_breaker(upstream):
+    """Return this process's breaker for ``upstream``, creating it on first use."""
+    with _registry_lock:
+        if upstream not in _breakers:
+            _breakers[upstream] = CircuitBreaker(upstream, UPSTREAMS.get(upstream, (upstream, SLOW_CALL_SECONDS))[1])
+        return _breakers[upstream]
+
+
+def breaker_metrics():
+    """Return upstream -> metrics dict for every breaker used so far."""
+    with _registry_lock:
+        breakers = dict(_breakers)
+    return {name: breaker.metrics() for name, breaker in breakers.items()}
+
+
+def open_upstreams():
+    """Return display names of upstreams whose breakers are currently rejecting calls."""
+    return [UPSTREAMS.get(name, (name,))[0] for name, breaker in list(_breakers.items()) if breaker.state == OPEN]
+
+
+def is_failure_status(status_code):
+    """Server errors and rate limiting mean the upstream is unhealthy; other statuses don't."""
+    return status_code >= 500 or status_code == 429
+
+
+def guarded_get(upstream, url, params=None, *, timeout):
+    """``requests.get`` through ``upstream``'s breaker, always with a timeout.
+
+    Raises:
+        CircuitOpenError: if the breaker is open; no request is made
+        requests.RequestException: as ``requests.get`` (and counted as a failure)
+    """
+    breaker = get_breaker(upstream)
+    generation = breaker.check()
+    started = time.perf_counter()
+    try:
+        response = requests.get(url, params=params, timeout=timeout)
+    except BaseException:  # Any exception, so a half-open probe is never left hanging
+        breaker.record(False, time.perf_counter() - started, generation)
+        raise
+    breaker.record(not is_failure_status(response.status_code), time.perf_counter() - started, generation)
+    return response
+
+
+async def guarded_async_get(upstream, client, url, params=None):
+    """``httpx.AsyncClient.get`` through ``upstream``'s breaker; the client sets the timeout."""
+    breaker = get_breaker(upstream)
+    generation = breaker.check()
+    started = time.perf_counter()
+    try:
+        response = await client.get(url, params=params)
+    except BaseException:  # Includes cancellation, so a half-open probe is never left hanging
+        breaker.record(False, time.perf_counter() - started, generation)
+        raise
+    breaker.record(not is_failure_status(response.status_code), time.perf_counter() - started, generation)
+    return response
@@ -0,0 +1,316 @@
+"""Pluggable cache for upstream metadata, recommendations and persona names.
+
+``get_cache()`` returns the process-wide backend configured by
+``config.CACHE_BACKEND``, a comma-separated list of tiers checked in order:
+
+- ``memory``: in-process LRU, private to one process
+- ``sqlite``: a SQLite file (``config.CACHE_DB_FILE``) shared by every process on the host
+- ``redis``: a Redis-compatible server (``config.REDIS_URL``) shared by every replica
+
+e.g. ``memory,sqlite`` keeps hot keys in process and shares the rest between
+Streamlit workers. A hit in a lower tier is copied into the tiers above it.
+Values are pickled for the shared tiers, so only cache trusted data. Cache
+failures are treated as misses; they never break a page.
+"""
+import os
+import pickle
+import random
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from . import config
+
+try:
+    import redis
+except ImportError:  # Only needed for the redis tier
+    redis = None
+
+# Time to live, in seconds, per kind of cached value
+METADATA_TTL = 24 * 3600
+SEARCH_TTL = 3600
+NEWS_TTL = 1800
+PERSONA_TTL = 24 * 3600
+RECOMMENDATION_TTL = 7 * 24 * 3600
+
+MEMORY_MAX_ENTRIES = 10_000
+# How long a tier keeps a value copied up from a slower tier, whose own expiry isn't known
+PROMOTED_TTL = 300
+# The SQLite tier deletes expired rows after this many writes from one instance
+PURGE_EVERY = 1000
+
+_MISS = object()
+
+
+class CacheBackend:
+    """Base class: subclasses implement ``_get``, ``_set`` and ``delete``.
+
+    ``hits`` and ``misses`` count lookups made through this instance.
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        value = self._get(key)
+        if value is _MISS:
+            self.misses += 1
+            return default
+        self.hits += 1
+        return value
+
+    def set(self, key, value, ttl=None):
+        self._set(key, value, ttl)
+
+    def get_or_set(self, key, compute, ttl=None, cache_if=None):
+        """Return the cached value for ``key``, computing and storing it on a miss.
+
+        ``cache_if(value)`` can veto storing a computed value (e.g. an error result).
+        """
+        value = self._get(key)
+        if value is not _MISS:
+            self.hits += 1
+            return value
+        self.misses += 1
+        value = compute()
+        if cache_if is None or cache_if(value):
+            self._set(key, value, ttl)
+        return value
+
+    @property
+    def hit_ratio(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def _get(self, key):
+        raise NotImplementedError
+
+    def _set(self, key, value, ttl):
+        raise NotImplementedError
+
+    def delete(self, key):
+        raise NotImplementedError
+
+
+def _expiry(ttl):
+    return time.time() + ttl if ttl else None
+
+
+class MemoryCache(CacheBackend):
+    """Thread-safe in-process LRU with per-entry expiry."""
+
+    def __init__(self, max_entries=MEMORY_MAX_ENTRIES):
+        super().__init__()
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return _MISS
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.time():
+                del self._entries[key]
+                return _MISS
+            self._entries.move_to_end(key)
+            return value
+
+    def _set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (value, _expiry(ttl))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class SQLiteCache(CacheBackend):
+    """Cache table in its own SQLite file, shared by all processes on a host."""
+
+    def __init__(self, path=None):
+        super().__init__()
+        self.path = path or config.CACHE_DB_FILE
+        self._local = threading.local()
+        self._writes = 0
+        conn = self._connection()
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS cache (
+                key TEXT PRIMARY KEY,
+                value BLOB NOT NULL,
+                expires_at REAL
+            ) WITHOUT ROWID
+        """)
+        conn.commit()
+
+    def _connection(self):
+        # One connection per thread; reopening on every lookup would cost more than the lookup
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _get(self, key):
+        try:
+            row = self._connection().execute(
+                "SELECT value, expires_at FROM cache WHERE key = ?", (key,)).fetchone()
+        except sqlite3.Error:
+            return _MISS
+        if row is None or (row[1] is not None and row[1] <= time.time()):
+            return _MISS
+        try:
+            return pickle.loads(row[0])
+        except Exception:
+            return _MISS
+
+    def _write(self, sql, params):
+        """Run and commit one statement; returns its row count, or None if it failed."""
+        try:
+            conn = self._connection()
+        except sqlite3.Error:
+            return None
+        try:
+            count = conn.execute(sql, params).rowcount
+            conn.commit()
+            return count
+        except sqlite3.Error:
+            try:
+                conn.rollback()
+            except sqlite3.Error:
+                pass
+            return None
+
+    def _set(self, key, value, ttl):
+        written = self._write("INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)",
+                              (key, pickle.dumps(value), _expiry(ttl)))
+        if written is None:
+            return
+        # Expired rows are only skipped on read; delete them now and then so the file doesn't grow forever
+        self._writes += 1
+        if self._writes % PURGE_EVERY == 0:
+            self.purge_expired()
+
+    def delete(self, key):
+        self._write("DELETE FROM cache WHERE key = ?", (key,))
+
+    def purge_expired(self):
+        """Delete expired entries; returns how many were removed (0 if the purge failed)."""
+        return self._write("DELETE FROM cache WHERE expires_at <= ?", (time.time(),)) or 0
+
+
+class RedisCache(CacheBackend):
+    """Cache on a Redis-compatible server (Redis, Valkey, KeyDB, ...)."""
+
+    def __init__(self, url=None, prefix="gameagg:"):
+        super().__init__()
+        if redis is None:
+            raise RuntimeError("The redis cache tier needs the redis package.")
+        self.prefix = prefix
+        self._client = redis.Redis.from_url(url or config.REDIS_URL)
+
+    def _get(self, key):
+        try:
+            data = self._client.get(self.prefix + key)
+            return _MISS if data is None else pickle.loads(data)
+        except Exception:
+            return _MISS
+
+    def _set(self, key, value, ttl):
+        try:
+            self._client.set(self.prefix + key, pickle.dumps(value), ex=ttl or None)
+        except redis.RedisError:
+            pass
+
+    def delete(self, key):
+        try:
+            self._client.delete(self.prefix + key)
+        except redis.RedisError:
+            pass
+
+
+class TieredCache(CacheBackend):
+    """Check each tier in order and copy hits into the faster tiers above."""
+
+    def __init__(self, tiers):
+        super().__init__()
+        self.tiers = list(tiers)
+
+    def _get(self, key):
+        for index, tier in enumerate(self.tiers):
+            value = tier.get(key, _MISS)
+            if value is not _MISS:
+                for upper in self.tiers[:index]:
+                    upper.set(key, value, PROMOTED_TTL)
+                return value
+        return _MISS
+
+    def _set(self, key, value, ttl):
+        for tier in self.tiers:
+            tier.set(key, value, ttl)
+
+    def delete(self, key):
+        for tier in self.tiers:
+            tier.delete(key)
+
+
+BACKENDS = {"memory": MemoryCache, "sqlite": SQLiteCache, "redis": RedisCache}
+
+
+def create_cache(spec):
+    """Build a backend from a spec such as ``"memory"`` or ``"memory,sqlite"``."""
+    names = [name.strip() for name in spec.split(",") if name.strip()]
+    unknown = [name for name in names if name not in BACKENDS]
+    if unknown or not names:
+        raise ValueError(f"Unknown cache backend {spec!r}; choose from {', '.join(BACKENDS)}")
+    tiers = [BACKENDS[name]() for name in names]
+    return tiers[0] if len(tiers) == 1 else TieredCache(tiers)
+
+
+_cache = None
+_cache_pid = None
+
+
+def get_cache():
+    """Return the process-wide cache, creating it from ``config.CACHE_BACKEND`` on first use."""
+    global _cache, _cache_pid
+    # Connections and locks don't survive fork; build a fresh cache in child processes
+    if _cache is None or _cache_pid != os.getpid():
+        _cache = create_cache(config.CACHE_BACKEND)
+        _cache_pid = os.getpid()
+    return _cache
+
+
+def set_cache(cache):
+    """Replace the process-wide cache, e.g. with a specific backend in scripts."""
+    global _cache, _cache_pid
+    _cache, _cache_pid = cache, os.getpid()
+
+
+def simulate_workload(spec, requests, keys, skew=1.1, seed=0, prefix="bench"):
+    """Replay ``requests`` Zipf-distributed lookups against a fresh ``spec`` cache.
+
+    Each miss stands in for an upstream call. Used by ``python -m gameagg
+    bench-cache`` to measure hit ratios when several processes share a tier.
+
+    Returns:
+        tuple: (hits, misses) seen by this process
+    """
+    cache = create_cache(spec)
+    rng = random.Random(seed)
+    weights = [1 / rank ** skew for rank in range(1, keys + 1)]
+    for rank in rng.choices(range(keys), weights=weights, k=requests):
+        cache.get_or_set(f"{prefix}:{rank}", lambda: {"appid": str(rank), "payload": "x" * 512})
+    return cache.hits, cache.misses
@@ -0,0 +1,46 @@
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Steam API Key
+STEAM_API_KEY = os.getenv("STEAM_API_KEY")
+# Steam endpoints; overridable to point at a local stand-in server
+STEAM_API_URL = os.getenv("GAMEAGG_STEAM_API_URL", "https://api.steampowered.com")
+STEAM_STORE_API_URL = os.getenv("GAMEAGG_STEAM_STORE_URL", "https://store.steampowered.com")
+# Google Generative AI
+GENAI_API_KEY = os.getenv("GENAI_API_KEY")
+GENAI_MODEL = "gemini-1.5-flash"
+GENAI_TIMEOUT = 60
+
+# IGDB API Credentials
+CLIENT_ID = os.getenv("IGDB_CLIENT_ID")
+ACCESS_TOKEN = os.getenv("IGDB_ACCESS_TOKEN")
+BASE_URL = "https://api.igdb.com/v4"
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Database setup; relative paths are resolved against the project directory
+# so every process opens the same file regardless of its working directory
+DB_FILE = os.path.join(PROJECT_DIR, os.getenv("GAMEAGG_DB_FILE", "steam_games_recommendations.db"))
+
+# Shared cache: comma-separated tiers, checked in order (see gameagg.cache)
+CACHE_BACKEND = os.getenv("GAMEAGG_CACHE", "memory")
+CACHE_DB_FILE = os.path.join(PROJECT_DIR, os.getenv("GAMEAGG_CACHE_DB_FILE", ".cache.db"))
+REDIS_URL = os.getenv("GAMEAGG_REDIS_URL", "redis://localhost:6379/0")
+
+# Password hashing scheme for new hashes ("scrypt" or "argon2") and the
+# number of threads verifying passwords at once
+PASSWORD_HASHER = os.getenv("GAMEAGG_PASSWORD_HASHER", "scrypt")
+PASSWORD_WORKERS = int(os.getenv("GAMEAGG_PASSWORD_WORKERS", os.cpu_count() or 1))
+
+# Downscaled cover images, shared by every process (resolved like DB_FILE)
+IMAGE_CACHE_DIR = os.path.join(PROJECT_DIR, os.getenv("GAMEAGG_IMAGE_CACHE_DIR", ".image_cache"))
+IMAGE_CACHE_MAX_BYTES = 200 * 1024 * 1024
+
+# Store region (ISO country code) whose prices are polled for wishlists
+STORE_COUNTRY = os.getenv("GAMEAGG_STORE_COUNTRY", "us")
+
+# Fallbacks used when Steam doesn't return usable metadata
+PLACEHOLDER_COVER_URL = "https://via.placeholder.com/150"
+STORE_URL_TEMPLATE = "https://store.steampowered.com/app/{appid}"
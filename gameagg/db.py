@@ -0,0 +1,87 @@
+import sqlite3
+
+from . import config
+from .migrations import (
+    create_catalog_tables,
+    create_price_tables,
+    create_refresh_tables,
+    create_review_search_index,
+    create_reviews_table,
+    create_similarity_tables,
+    create_stats_tables,
+    migrate,
+)
+
+
+# Seconds a writer waits for another connection's write lock
+BUSY_TIMEOUT = 30
+
+
+def get_connection():
+    """Open a connection to the application database."""
+    conn = sqlite3.connect(config.DB_FILE, timeout=BUSY_TIMEOUT)
+    conn.execute("PRAGMA foreign_keys = ON;")
+    return conn
+
+
+# Initialize database
+def init_db():
+    conn = get_connection()
+    # WAL lets readers proceed while a review or import is being written
+    conn.execute("PRAGMA journal_mode = WAL;")
+    migrate(conn)
+    cursor = conn.cursor()
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS users (
+            user_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT UNIQUE NOT NULL,
+            password TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    create_catalog_tables(cursor)
+    create_reviews_table(cursor)
+    create_review_search_index(cursor)
+    create_stats_tables(cursor)
+    create_similarity_tables(cursor)
+    create_refresh_tables(cursor)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_reviews_user_created ON reviews(user_id, created_at)")
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS accounts (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            steam_user_id TEXT,
+            user_id INTEGER,
+            FOREIGN KEY(user_id) REFERENCES users(user_id),
+            UNIQUE(steam_user_id, user_id)
+        );
+    """)
+
+    # Create wishlist table
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS wishlist (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            steam_game_id TEXT NOT NULL,
+            game_name TEXT NOT NULL,
+            cover_url TEXT,
+            store_url TEXT,
+            added_on TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY(user_id) REFERENCES users(user_id)
+        )
+    """)
+
+    create_price_tables(cursor)
+
+    # Check if cover_url and store_url exist, and add them if missing
+    try:
+        cursor.execute("ALTER TABLE wishlist ADD COLUMN cover_url TEXT")
+    except sqlite3.OperationalError:
+        pass  # Column already exists
+
+    try:
+        cursor.execute("ALTER TABLE wishlist ADD COLUMN store_url TEXT")
+    except sqlite3.OperationalError:
+        pass  # Column already exists
+
+    conn.commit()
+    conn.close()
@@ -0,0 +1,27 @@
+class GameAggError(Exception):
+    """Base class for errors raised by the core package."""
+
+
+class SteamAPIError(GameAggError):
+    """A Steam Web API or Store request failed or returned an unusable response."""
+
+    def __init__(self, message, status_code=None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class InvalidSteamURL(GameAggError):
+    """The given Steam profile URL could not be parsed."""
+
+
+class UserExistsError(GameAggError):
+    """Registration was attempted with a username that is already taken."""
+
+
+class CircuitOpenError(GameAggError):
+    """An upstream service is failing, so calls to it are rejected without being made."""
+
+    def __init__(self, upstream, retry_in=None):
+        super().__init__(f"{upstream} is currently unavailable; please try again shortly.")
+        self.upstream = upstream
+        self.retry_in = retry_in
@@ -0,0 +1,254 @@
+"""Local cache of downscaled cover images.
+
+Steam header images are ~460x215 JPEGs but every page renders them 150px
+wide. ``get_thumbnail`` downloads each cover once, stores a 150px-wide WebP
+(or JPEG when WebP isn't available) under ``config.IMAGE_CACHE_DIR`` keyed
+by the SHA-256 of the image URL, and returns the bytes so pages can pass
+them straight to ``st.image``. The directory is kept under
+``config.IMAGE_CACHE_MAX_BYTES`` by evicting the least recently used files.
+Each process keeps a running total of the directory's size, so the
+directory is only walked when that total crosses the cap or goes stale.
+"""
+import asyncio
+import functools
+import hashlib
+import io
+import os
+import struct
+import tempfile
+import threading
+import time
+import zlib
+
+import httpx
+import requests
+
+from . import config
+from .breaker import guarded_async_get, guarded_get
+from .errors import CircuitOpenError
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow is optional; covers are then cached at full size
+    Image = None
+
+THUMBNAIL_WIDTH = 150
+DOWNLOAD_TIMEOUT = 10
+PREFETCH_CONCURRENCY = 16
+# Pruning evicts down to this fraction of the cap, so it doesn't rerun on the next write
+PRUNE_TARGET = 0.9
+# Other processes write to the directory too; rescan the running total this often
+RESCAN_INTERVAL = 300
+# Reads only bump a file's mtime (its LRU position) once it's at least this old
+TOUCH_INTERVAL = 24 * 3600
+
+
+def _thumbnail_format():
+    if Image is None:
+        return None
+    from PIL import features
+    return "WEBP" if features.check("webp") else "JPEG"
+
+
+THUMBNAIL_FORMAT = _thumbnail_format()
+
+
+def cache_path(url):
+    """Return where the thumbnail for ``url`` lives in the cache directory."""
+    digest = hashlib.sha256(url.encode()).hexdigest()
+    return os.path.join(config.IMAGE_CACHE_DIR, digest[:2], digest)
+
+
+@functools.lru_cache(maxsize=1)
+def placeholder_thumbnail():
+    """Plain grey cover served instead of hotlinking a placeholder service."""
+    if Image is None:
+        return _solid_png(THUMBNAIL_WIDTH, 70, (64, 64, 64))
+    out = io.BytesIO()
+    Image.new("RGB", (THUMBNAIL_WIDTH, 70), (64, 64, 64)).save(out, THUMBNAIL_FORMAT)
+    return out.getvalue()
+
+
+def _solid_png(width, height, rgb):
+    """Encode a single-colour PNG without Pillow."""
+    def chunk(kind, data):
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+    rows = (b"\0" + bytes(rgb) * width) * height
+    return (b"\x89PNG\r\n\x1a\n"
+            + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+            + chunk(b"IDAT", zlib.compress(rows))
+            + chunk(b"IEND", b""))
+
+
+def is_cacheable(url):
+    return bool(url) and url.startswith("http") and url != config.PLACEHOLDER_COVER_URL
+
+
+def make_thumbnail(data, width=THUMBNAIL_WIDTH):
+    """Downscale encoded image bytes to ``width`` pixels wide."""
+    if Image is None:
+        return data
+    with Image.open(io.BytesIO(data)) as image:
+        if image.width > width:
+            height = max(1, round(image.height * width / image.width))
+            image = image.resize((width, height), Image.LANCZOS)
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGB")
+        if THUMBNAIL_FORMAT == "JPEG" and image.mode == "RGBA":
+            image = image.convert("RGB")
+        out = io.BytesIO()
+        image.save(out, THUMBNAIL_FORMAT, quality=80)
+        return out.getvalue()
+
+
+def store_thumbnail(url, data, prune=True):
+    """Thumbnail downloaded bytes, write them atomically and return the thumbnail.
+
+    With ``prune``, the new file counts towards the cache size and the
+    least recently used files are evicted once it's over the cap.
+    """
+    thumbnail = make_thumbnail(data)
+    path = cache_path(url)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(thumbnail)
+        os.replace(tmp_path, path)
+    except OSError:
+        os.unlink(tmp_path)
+        raise
+    if prune:
+        _note_written(len(thumbnail))
+    return thumbnail
+
+
+def read_cached(url):
+    """Return cached thumbnail bytes for ``url`` or None, marking them recently used.
+
+    The mtime is only bumped once it's ``TOUCH_INTERVAL`` old, so rerendering
+    a page doesn't write to the filesystem for every cover on it.
+    """
+    path = cache_path(url)
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+            modified = os.fstat(f.fileno()).st_mtime
+    except FileNotFoundError:
+        return None
+    if time.time() - modified >= TOUCH_INTERVAL:
+        try:
+            os.utime(path)
+        except OSError:
+            pass  # Evicted by another process in the meantime
+    return data
+
+
+def get_thumbnail(url):
+    """Return thumbnail bytes for a cover URL, downloading it on a cache miss.
+
+    Missing covers (no URL, e.g. catalog stubs) get a local placeholder,
+    even without Pillow. Returns None when the image can't be fetched, so
+    callers can fall back to the URL itself.
+    """
+    if not url or url == config.PLACEHOLDER_COVER_URL:
+        return placeholder_thumbnail()
+    if not is_cacheable(url):
+        return None
+    cached = read_cached(url)
+    if cached is not None:
+        return cached
+    try:
+        response = guarded_get("steam_cdn", url, timeout=DOWNLOAD_TIMEOUT)
+        if response.status_code != 200:
+            return None
+        return store_thumbnail(url, response.content)
+    except (requests.RequestException, OSError, ValueError, CircuitOpenError):
+        return None
+
+
+_size_lock = threading.Lock()
+# Running size of the cache directory in bytes; None until this process has scanned it
+_cached_bytes = None
+_scanned_at = 0.0
+
+
+def _note_written(size):
+    """Add a new thumbnail to the running total, pruning only once it's over the cap."""
+    global _cached_bytes
+    with _size_lock:
+        if _cached_bytes is not None and time.monotonic() - _scanned_at < RESCAN_INTERVAL:
+            _cached_bytes += size
+            if _cached_bytes <= config.IMAGE_CACHE_MAX_BYTES:
+                return
+    prune_cache()
+
+
+def prune_cache(max_bytes=None):
+    """Evict least recently used thumbnails once the cache is over ``max_bytes``.
+
+    Eviction stops at ``PRUNE_TARGET`` of the cap. Walks the whole
+    directory; returns the number of files evicted.
+    """
+    global _cached_bytes, _scanned_at
+    max_bytes = config.IMAGE_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+    entries = []
+    total = 0
+    for root, _, files in os.walk(config.IMAGE_CACHE_DIR):
+        for name in files:
+            path = os.path.join(root, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+    evicted = 0
+    if total > max_bytes:
+        for _, size, path in sorted(entries):
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            evicted += 1
+            if total <= max_bytes * PRUNE_TARGET:
+                break
+    with _size_lock:
+        _cached_bytes, _scanned_at = total, time.monotonic()
+    return evicted
+
+
+async def prefetch_thumbnails(urls, concurrency=PREFETCH_CONCURRENCY):
+    """Download and cache every uncached cover in ``urls`` concurrently.
+
+    Failures are skipped; returns the number of thumbnails newly cached.
+    """
+    pending = {url for url in urls if is_cacheable(url) and not os.path.exists(cache_path(url))}
+    if not pending:
+        return 0
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def fetch(client, url):
+        async with semaphore:
+            try:
+                response = await guarded_async_get("steam_cdn", client, url)
+            except (httpx.HTTPError, CircuitOpenError):
+                return False
+        if response.status_code != 200:
+            return False
+        try:
+            await asyncio.to_thread(store_thumbnail, url, response.content)
+        except (OSError, ValueError):
+            return False
+        return True
+
+    async with httpx.AsyncClient(timeout=DOWNLOAD_TIMEOUT) as client:
+        results = await asyncio.gather(*(fetch(client, url) for url in pending))
+    return sum(results)
+
+
+def prefetch_thumbnails_sync(urls, concurrency=PREFETCH_CONCURRENCY):
+    """Blocking wrapper around ``prefetch_thumbnails``."""
+    return asyncio.run(prefetch_thumbnails(urls, concurrency))
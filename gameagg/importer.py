@@ -0,0 +1,140 @@
+from collections import Counter, namedtuple
+
+from .db import get_connection
+from .migrations import split_genres
+from .repository import CATALOG_STUB_SQL
+from .steam import fetch_game_details, fetch_owned_games
+
+ImportResult = namedtuple("ImportResult", ["fetched", "added", "updated", "warnings"])
+
+
+def upsert_catalog(cursor, appid, details):
+    """Insert or overwrite the shared catalog entry for one appid.
+
+    Only pass details fetched successfully (``details.error`` is None).
+    """
+    cursor.execute("""
+        INSERT INTO catalog (appid, game_name, genres, cover_url, store_url, updated_at)
+        VALUES (?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+        ON CONFLICT(appid) DO UPDATE SET
+            game_name = excluded.game_name,
+            genres = excluded.genres,
+            cover_url = excluded.cover_url,
+            store_url = excluded.store_url,
+            updated_at = excluded.updated_at
+    """, (str(appid), details.name, details.genres, details.cover_url, details.store_url))
+    set_catalog_genres(cursor, appid, details.genres)
+
+
+def set_catalog_genres(cursor, appid, genres):
+    """Sync the ``catalog_genres`` rows of one appid with its genres string.
+
+    Only the difference is written, so unchanged genres don't churn the
+    per-user genre aggregates maintained by triggers.
+    """
+    wanted = split_genres(genres)
+    cursor.execute("SELECT genre FROM catalog_genres WHERE appid = ?", (str(appid),))
+    current = {row[0] for row in cursor.fetchall()}
+    cursor.executemany("DELETE FROM catalog_genres WHERE appid = ? AND genre = ?",
+                       [(str(appid), genre) for genre in current - wanted])
+    cursor.executemany("INSERT INTO catalog_genres (appid, genre) VALUES (?, ?)",
+                       [(str(appid), genre) for genre in wanted - current])
+
+
+def store_games(cursor, games, user_id, steam_user_id, fetch_details=fetch_game_details):
+    """Write a fetched library through an open cursor without committing.
+
+    Returns:
+        ImportResult: counts of added/updated rows and any metadata warnings
+    """
+    added = updated = 0
+    errors = []
+    cursor.execute("""
+        INSERT OR IGNORE INTO accounts (steam_user_id, user_id) VALUES (?, ?)
+    """, (steam_user_id, user_id))
+    for game in games:
+        appid = str(game["appid"])
+        # Only titles missing from the shared catalog need a metadata lookup
+        cursor.execute("SELECT 1 FROM catalog WHERE appid = ? AND genres IS NOT NULL", (appid,))
+        if cursor.fetchone() is None:
+            details = fetch_details(game["appid"], game["name"])
+            if details.error:
+                # Placeholder metadata must not reach the shared catalog; a
+                # name-only stub (genres NULL) is looked up again next import
+                errors.append(details.error)
+                cursor.execute(CATALOG_STUB_SQL, (appid, game["name"]))
+            else:
+                upsert_catalog(cursor, appid, details)
+
+        # Check if the game already exists
+        cursor.execute("""
+            SELECT playtime FROM library WHERE appid = ? AND user_id = ? AND steam_user_id = ?
+        """, (appid, user_id, steam_user_id))
+        existing_game = cursor.fetchone()
+
+        if existing_game:
+            # Update playtime if it has increased
+            if existing_game[0] is None or game["playtime_forever"] > existing_game[0]:
+                cursor.execute("""
+                    UPDATE library
+                    SET playtime = ?, added_on = CURRENT_TIMESTAMP
+                    WHERE appid = ? AND user_id = ? AND steam_user_id = ?
+                """, (game["playtime_forever"], appid, user_id, steam_user_id))
+                updated += 1
+            continue
+
+        # Insert new game
+        cursor.execute("""
+            INSERT INTO library (appid, playtime, added_on, user_id, steam_user_id)
+            VALUES (?, ?, CURRENT_TIMESTAMP, ?, ?)
+        """, (appid, game["playtime_forever"], user_id, steam_user_id))
+        added += 1
+    return ImportResult(len(games), added, updated, summarize_lookup_errors(errors))
+
+
+def summarize_lookup_errors(errors):
+    """Collapse per-game metadata errors into at most one warning.
+
+    An open breaker fails every remaining lookup at once, so a large
+    library would otherwise produce thousands of identical warnings.
+    """
+    if not errors:
+        return []
+    if len(errors) == 1:
+        return errors
+    # Breaker rejections all share one message, so the most common error is
+    # the "service unavailable" one whenever the breaker opened
+    reason = Counter(errors).most_common(1)[0][0]
+    return [f"Details for {len(errors)} games couldn't be fetched and will be looked up again "
+            f"on the next import. Most common error: {reason}"]
+
+
+def add_games_to_db(games, user_id, steam_user_id, fetch_details=fetch_game_details):
+    """Insert new games and bump playtime on existing ones.
+
+    Args:
+        games (list): game dicts as returned by ``fetch_owned_games``
+        user_id (int): owner in the ``users`` table
+        steam_user_id (str): Steam64 ID the games were fetched from
+        fetch_details (callable): metadata lookup, ``(appid, name) -> GameDetails``
+
+    Returns:
+        ImportResult: counts of added/updated rows and any metadata warnings
+    """
+    conn = get_connection()
+    try:
+        result = store_games(conn.cursor(), games, user_id, steam_user_id, fetch_details)
+        conn.commit()
+    finally:
+        conn.close()
+    return result
+
+
+def import_steam_library(user_id, steam_user_id):
+    """Fetch a Steam account's owned games and store them for ``user_id``.
+
+    Raises:
+        SteamAPIError: if the owned-games request fails.
+    """
+    games = fetch_owned_games(steam_user_id)
+    return add_games_to_db(games, user_id, steam_user_id)
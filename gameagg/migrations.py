@@ -0,0 +1,563 @@
+"""In-place schema migrations for existing databases.
+
+``init_db`` runs these automatically; they can also be applied to a copy of
+a database from the command line::
+
+    python -m gameagg migrate path/to/steam_games_recommendations.db
+"""
+import sqlite3
+from contextlib import contextmanager
+
+
+def table_exists(cursor, name, kind="table"):
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = ? AND name = ?", (kind, name))
+    return cursor.fetchone() is not None
+
+
+def column_names(cursor, table):
+    cursor.execute(f"PRAGMA table_info({table})")
+    return {row[1] for row in cursor.fetchall()}
+
+
+@contextmanager
+def rebuild_transaction(conn):
+    """Run a table rebuild in one transaction with foreign key enforcement off.
+
+    Enforcement can't be toggled inside a transaction, so any pending one
+    is committed first. Foreign keys are checked before committing.
+    """
+    conn.commit()
+    cursor = conn.cursor()
+    cursor.execute("PRAGMA foreign_keys = OFF;")
+    try:
+        cursor.execute("BEGIN")
+        yield cursor
+        cursor.execute("PRAGMA foreign_key_check")
+        problems = cursor.fetchall()
+        if problems:
+            raise sqlite3.IntegrityError(f"Foreign key violations after migration: {problems[:5]}")
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.execute("PRAGMA foreign_keys = ON;")
+
+
+def migrate_games_to_catalog(conn):
+    """Split the per-user ``games`` table into ``catalog`` and ``library``.
+
+    Metadata (name, genres, cover, store URL) moves to one ``catalog`` row
+    per appid, preferring the most recently added row that has genres.
+    Every ``games`` row becomes a ``library`` row with the same id so
+    ``reviews.game_id`` stays valid; ``reviews`` is rebuilt to point its
+    foreign key at ``library`` (see ``migrate_reviews_to_appid`` for the
+    next step).
+
+    Returns:
+        bool: True if a migration was applied, False if already up to date.
+    """
+    cursor = conn.cursor()
+    if not table_exists(cursor, "games") or table_exists(cursor, "library"):
+        return False
+
+    with rebuild_transaction(conn) as cursor:
+        create_catalog_tables(cursor)
+        cursor.execute("""
+            INSERT OR IGNORE INTO catalog (appid, game_name, genres, cover_url, store_url, updated_at)
+            SELECT steam_game_id, game_name, genres, cover_url, store_url, COALESCE(added_on, CURRENT_TIMESTAMP)
+            FROM games
+            WHERE steam_game_id IS NOT NULL
+            ORDER BY genres IS NULL, added_on DESC
+        """)
+        cursor.execute("""
+            INSERT OR IGNORE INTO library (id, user_id, steam_user_id, appid, playtime, added_on)
+            SELECT id, user_id, steam_user_id, steam_game_id, playtime, added_on
+            FROM games
+            WHERE steam_game_id IS NOT NULL
+            ORDER BY id
+        """)
+        # Point reviews of collapsed duplicate rows at the surviving library row
+        cursor.execute("""
+            UPDATE reviews SET game_id = (
+                SELECT l.id FROM games g
+                JOIN library l ON l.user_id = g.user_id AND l.appid = g.steam_game_id
+                    AND l.steam_user_id IS g.steam_user_id
+                WHERE g.id = reviews.game_id
+            )
+            WHERE game_id NOT IN (SELECT id FROM library)
+        """)
+        cursor.execute("ALTER TABLE reviews RENAME TO reviews_old")
+        cursor.execute("""
+            CREATE TABLE reviews (
+                review_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id INTEGER,
+                game_id INTEGER,
+                review_text TEXT,
+                rating INTEGER CHECK(rating >= 1 AND rating <= 5),
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY(user_id) REFERENCES users(user_id),
+                FOREIGN KEY(game_id) REFERENCES library(id)
+            )
+        """)
+        cursor.execute("""
+            INSERT INTO reviews (review_id, user_id, game_id, review_text, rating, created_at)
+            SELECT review_id, user_id, game_id, review_text, rating, created_at FROM reviews_old
+        """)
+        cursor.execute("DROP TABLE reviews_old")
+        cursor.execute("DROP TABLE games")
+    return True
+
+
+def migrate_reviews_to_appid(conn):
+    """Key reviews by ``(user_id, appid)`` instead of a library row id.
+
+    Reviews used to hang off whichever library row matched, so a game owned
+    on several accounts, or reviewed concurrently, could collect duplicate
+    reviews. Only the newest review per user and app is kept, and the
+    account-less library rows that existed just to anchor reviews are
+    dropped.
+
+    Returns:
+        bool: True if a migration was applied, False if already up to date.
+    """
+    cursor = conn.cursor()
+    if not table_exists(cursor, "reviews") or "appid" in column_names(cursor, "reviews"):
+        return False
+
+    with rebuild_transaction(conn) as cursor:
+        cursor.execute("ALTER TABLE reviews RENAME TO reviews_old")
+        create_reviews_table(cursor)
+        cursor.execute("""
+            INSERT INTO reviews (review_id, user_id, appid, review_text, rating, created_at)
+            SELECT r.review_id, r.user_id, l.appid, r.review_text, r.rating, r.created_at
+            FROM reviews_old r JOIN library l ON l.id = r.game_id
+            WHERE r.review_id IN (
+                SELECT MAX(r2.review_id) FROM reviews_old r2
+                JOIN library l2 ON l2.id = r2.game_id
+                GROUP BY r2.user_id, l2.appid
+            )
+        """)
+        cursor.execute("DROP TABLE reviews_old")
+        cursor.execute("DELETE FROM library WHERE steam_user_id IS NULL")
+    return True
+
+
+def create_catalog_tables(cursor):
+    # One row per Steam app, shared by every user
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS catalog (
+            appid TEXT PRIMARY KEY,
+            game_name TEXT,
+            genres TEXT,
+            cover_url TEXT,
+            store_url TEXT,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    # One row per game owned (or reviewed) by a user on a Steam account
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS library (
+            id INTEGER PRIMARY KEY,
+            user_id INTEGER,
+            steam_user_id TEXT,
+            appid TEXT NOT NULL,
+            playtime INTEGER,
+            added_on TIMESTAMP,
+            FOREIGN KEY(user_id) REFERENCES users(user_id),
+            FOREIGN KEY(appid) REFERENCES catalog(appid),
+            UNIQUE(user_id, steam_user_id, appid)
+        )
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_library_appid ON library(appid)")
+    # Case-insensitive name lookups when matching model recommendations
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_catalog_name ON catalog(game_name COLLATE NOCASE)")
+
+
+def create_reviews_table(cursor):
+    # One review per user and app; writes upsert against the unique key
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS reviews (
+            review_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            appid TEXT NOT NULL,
+            review_text TEXT,
+            rating INTEGER CHECK(rating >= 1 AND rating <= 5),
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY(user_id) REFERENCES users(user_id),
+            FOREIGN KEY(appid) REFERENCES catalog(appid),
+            UNIQUE(user_id, appid)
+        )
+    """)
+
+
+def create_review_search_index(cursor):
+    """Create the FTS5 index over review text and game names, kept in sync by triggers.
+
+    The index stores its own copy of both columns (rowid = review_id) so
+    ``snippet()`` works; it is backfilled from existing reviews when first
+    created.
+    """
+    if table_exists(cursor, "reviews_fts"):
+        return
+    cursor.execute("""
+        CREATE VIRTUAL TABLE reviews_fts USING fts5(
+            review_text, game_name, tokenize = 'unicode61 remove_diacritics 2'
+        )
+    """)
+    cursor.execute("""
+        INSERT INTO reviews_fts (rowid, review_text, game_name)
+        SELECT r.review_id, r.review_text, c.game_name
+        FROM reviews r LEFT JOIN catalog c ON c.appid = r.appid
+    """)
+    cursor.execute("""
+        CREATE TRIGGER reviews_fts_insert AFTER INSERT ON reviews BEGIN
+            INSERT INTO reviews_fts (rowid, review_text, game_name)
+            VALUES (new.review_id, new.review_text, (SELECT game_name FROM catalog WHERE appid = new.appid));
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER reviews_fts_update AFTER UPDATE OF review_text ON reviews BEGIN
+            UPDATE reviews_fts SET review_text = new.review_text WHERE rowid = new.review_id;
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER reviews_fts_delete AFTER DELETE ON reviews BEGIN
+            DELETE FROM reviews_fts WHERE rowid = old.review_id;
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER reviews_fts_game_name AFTER UPDATE OF game_name ON catalog BEGIN
+            UPDATE reviews_fts SET game_name = new.game_name
+            WHERE rowid IN (SELECT review_id FROM reviews WHERE appid = new.appid);
+        END
+    """)
+
+
+def split_genres(genres):
+    return {genre.strip() for genre in (genres or "").split(",") if genre.strip()}
+
+
+def create_stats_tables(cursor):
+    """Create per-user aggregate tables and the triggers that maintain them.
+
+    ``catalog_genres`` is the one-genre-per-row form of ``catalog.genres``
+    (written by ``importer.set_catalog_genres``) so triggers can attribute
+    playtime to genres without string splitting. All aggregates are
+    backfilled from existing rows when first created; the library side is
+    set up by ``create_owned_game_stats``.
+    """
+    if table_exists(cursor, "user_stats"):
+        create_owned_game_stats(cursor)
+        return
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS catalog_genres (
+            appid TEXT NOT NULL,
+            genre TEXT NOT NULL,
+            PRIMARY KEY(appid, genre)
+        ) WITHOUT ROWID
+    """)
+    cursor.execute("""
+        CREATE TABLE user_stats (
+            user_id INTEGER PRIMARY KEY,
+            game_count INTEGER NOT NULL DEFAULT 0,
+            total_playtime INTEGER NOT NULL DEFAULT 0,
+            backlog_count INTEGER NOT NULL DEFAULT 0,
+            review_count INTEGER NOT NULL DEFAULT 0,
+            rating_sum INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE user_genre_playtime (
+            user_id INTEGER NOT NULL,
+            genre TEXT NOT NULL,
+            game_count INTEGER NOT NULL DEFAULT 0,
+            playtime INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY(user_id, genre)
+        ) WITHOUT ROWID
+    """)
+    cursor.execute("""
+        CREATE TABLE user_rating_counts (
+            user_id INTEGER NOT NULL,
+            rating INTEGER NOT NULL,
+            review_count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY(user_id, rating)
+        ) WITHOUT ROWID
+    """)
+    # Most-played games are summed from this index
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_library_user_playtime ON library(user_id, playtime DESC)")
+
+    # Backfill
+    cursor.execute("SELECT appid, genres FROM catalog WHERE genres IS NOT NULL")
+    cursor.executemany("INSERT OR IGNORE INTO catalog_genres (appid, genre) VALUES (?, ?)",
+                       [(appid, genre) for appid, genres in cursor.fetchall() for genre in split_genres(genres)])
+    cursor.execute("""
+        INSERT INTO user_stats (user_id, review_count, rating_sum)
+        SELECT user_id, COUNT(*), COALESCE(SUM(rating), 0) FROM reviews GROUP BY user_id
+    """)
+    cursor.execute("""
+        INSERT INTO user_rating_counts (user_id, rating, review_count)
+        SELECT user_id, rating, COUNT(*) FROM reviews WHERE rating IS NOT NULL GROUP BY user_id, rating
+    """)
+    create_owned_game_stats(cursor)
+
+    # Reviews
+    cursor.execute("""
+        CREATE TRIGGER stats_review_insert AFTER INSERT ON reviews BEGIN
+            INSERT INTO user_stats (user_id, review_count, rating_sum)
+            VALUES (new.user_id, 1, COALESCE(new.rating, 0))
+            ON CONFLICT(user_id) DO UPDATE SET
+                review_count = review_count + 1,
+                rating_sum = rating_sum + excluded.rating_sum;
+            INSERT INTO user_rating_counts (user_id, rating, review_count)
+            SELECT new.user_id, new.rating, 1 WHERE new.rating IS NOT NULL
+            ON CONFLICT(user_id, rating) DO UPDATE SET review_count = review_count + 1;
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER stats_review_rating AFTER UPDATE OF rating ON reviews BEGIN
+            UPDATE user_stats SET rating_sum = rating_sum + COALESCE(new.rating, 0) - COALESCE(old.rating, 0)
+            WHERE user_id = new.user_id;
+            UPDATE user_rating_counts SET review_count = review_count - 1
+            WHERE user_id = old.user_id AND rating = old.rating;
+            INSERT INTO user_rating_counts (user_id, rating, review_count)
+            SELECT new.user_id, new.rating, 1 WHERE new.rating IS NOT NULL
+            ON CONFLICT(user_id, rating) DO UPDATE SET review_count = review_count + 1;
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER stats_review_delete AFTER DELETE ON reviews BEGIN
+            UPDATE user_stats SET
+                review_count = review_count - 1,
+                rating_sum = rating_sum - COALESCE(old.rating, 0)
+            WHERE user_id = old.user_id;
+            UPDATE user_rating_counts SET review_count = review_count - 1
+            WHERE user_id = old.user_id AND rating = old.rating;
+        END
+    """)
+
+
+def create_owned_game_stats(cursor):
+    """Create the library-side triggers of the stats tables and backfill them.
+
+    A user owns a game once however many linked Steam accounts have it:
+    ``game_count`` and the per-genre ``game_count`` count distinct appids,
+    a game's playtime is the sum over those accounts, and it is in the
+    backlog while that sum is 0. Earlier versions counted one game per
+    library row; their triggers are replaced and the library columns
+    recomputed.
+    """
+    if table_exists(cursor, "stats_owned_insert", kind="trigger"):
+        return
+    for name in ("stats_library_insert", "stats_library_playtime", "stats_library_delete",
+                 "stats_genre_insert", "stats_genre_delete", "stats_owned_playtime", "stats_owned_delete",
+                 "stats_owned_genre_insert", "stats_owned_genre_delete"):
+        cursor.execute(f"DROP TRIGGER IF EXISTS {name}")
+
+    # Backfill, one row per user and game
+    cursor.execute("UPDATE user_stats SET game_count = 0, total_playtime = 0, backlog_count = 0")
+    cursor.execute("""
+        INSERT INTO user_stats (user_id, game_count, total_playtime, backlog_count)
+        SELECT user_id, COUNT(*), SUM(playtime), SUM(playtime = 0)
+        FROM (SELECT user_id, appid, SUM(COALESCE(playtime, 0)) AS playtime
+              FROM library WHERE user_id IS NOT NULL GROUP BY user_id, appid)
+        WHERE true
+        GROUP BY user_id
+        ON CONFLICT(user_id) DO UPDATE SET
+            game_count = excluded.game_count,
+            total_playtime = excluded.total_playtime,
+            backlog_count = excluded.backlog_count
+    """)
+    cursor.execute("DELETE FROM user_genre_playtime")
+    cursor.execute("""
+        INSERT INTO user_genre_playtime (user_id, genre, game_count, playtime)
+        SELECT o.user_id, g.genre, COUNT(*), SUM(o.playtime)
+        FROM (SELECT user_id, appid, SUM(COALESCE(playtime, 0)) AS playtime
+              FROM library WHERE user_id IS NOT NULL GROUP BY user_id, appid) o
+        JOIN catalog_genres g ON g.appid = o.appid
+        GROUP BY o.user_id, g.genre
+    """)
+
+    # Library rows. Each trigger reads the game's row count (n) and summed
+    # playtime (t) after the change to tell whether the game itself was
+    # added, removed or left or entered the backlog.
+    cursor.execute("""
+        CREATE TRIGGER stats_owned_insert AFTER INSERT ON library WHEN new.user_id IS NOT NULL BEGIN
+            INSERT INTO user_stats (user_id, game_count, total_playtime, backlog_count)
+            SELECT new.user_id, n = 1, COALESCE(new.playtime, 0),
+                   (t = 0) - (n > 1 AND t - COALESCE(new.playtime, 0) = 0)
+            FROM (SELECT COUNT(*) AS n, SUM(COALESCE(playtime, 0)) AS t FROM library
+                  WHERE user_id = new.user_id AND appid = new.appid)
+            WHERE true
+            ON CONFLICT(user_id) DO UPDATE SET
+                game_count = game_count + excluded.game_count,
+                total_playtime = total_playtime + excluded.total_playtime,
+                backlog_count = backlog_count + excluded.backlog_count;
+            INSERT INTO user_genre_playtime (user_id, genre, game_count, playtime)
+            SELECT new.user_id, g.genre,
+                   (SELECT COUNT(*) FROM library WHERE user_id = new.user_id AND appid = new.appid) = 1,
+                   COALESCE(new.playtime, 0)
+            FROM catalog_genres g WHERE g.appid = new.appid
+            ON CONFLICT(user_id, genre) DO UPDATE SET
+                game_count = game_count + excluded.game_count,
+                playtime = playtime + excluded.playtime;
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER stats_owned_playtime AFTER UPDATE OF playtime ON library
+        WHEN new.user_id IS NOT NULL BEGIN
+            UPDATE user_stats SET
+                total_playtime = total_playtime + COALESCE(new.playtime, 0) - COALESCE(old.playtime, 0),
+                backlog_count = backlog_count + (
+                    SELECT (t = 0) - (t - COALESCE(new.playtime, 0) + COALESCE(old.playtime, 0) = 0)
+                    FROM (SELECT SUM(COALESCE(playtime, 0)) AS t FROM library
+                          WHERE user_id = new.user_id AND appid = new.appid))
+            WHERE user_id = new.user_id;
+            UPDATE user_genre_playtime SET
+                playtime = playtime + COALESCE(new.playtime, 0) - COALESCE(old.playtime, 0)
+            WHERE user_id = new.user_id
+              AND genre IN (SELECT genre FROM catalog_genres WHERE appid = new.appid);
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER stats_owned_delete AFTER DELETE ON library WHEN old.user_id IS NOT NULL BEGIN
+            UPDATE user_stats SET
+                game_count = game_count - (
+                    SELECT n = 0 FROM (SELECT COUNT(*) AS n FROM library
+                                       WHERE user_id = old.user_id AND appid = old.appid)),
+                total_playtime = total_playtime - COALESCE(old.playtime, 0),
+                backlog_count = backlog_count + (
+                    SELECT (n > 0 AND t = 0) - (t + COALESCE(old.playtime, 0) = 0)
+                    FROM (SELECT COUNT(*) AS n, COALESCE(SUM(COALESCE(playtime, 0)), 0) AS t FROM library
+                          WHERE user_id = old.user_id AND appid = old.appid))
+            WHERE user_id = old.user_id;
+            UPDATE user_genre_playtime SET
+                game_count = game_count - (
+                    SELECT n = 0 FROM (SELECT COUNT(*) AS n FROM library
+                                       WHERE user_id = old.user_id AND appid = old.appid)),
+                playtime = playtime - COALESCE(old.playtime, 0)
+            WHERE user_id = old.user_id
+              AND genre IN (SELECT genre FROM catalog_genres WHERE appid = old.appid);
+        END
+    """)
+
+    # Genre changes on a catalog entry move its owners' playtime between genres
+    cursor.execute("""
+        CREATE TRIGGER stats_owned_genre_insert AFTER INSERT ON catalog_genres BEGIN
+            INSERT INTO user_genre_playtime (user_id, genre, game_count, playtime)
+            SELECT user_id, new.genre, 1, SUM(COALESCE(playtime, 0))
+            FROM library WHERE appid = new.appid AND user_id IS NOT NULL GROUP BY user_id
+            ON CONFLICT(user_id, genre) DO UPDATE SET
+                game_count = game_count + excluded.game_count,
+                playtime = playtime + excluded.playtime;
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER stats_owned_genre_delete AFTER DELETE ON catalog_genres BEGIN
+            UPDATE user_genre_playtime SET
+                game_count = game_count - 1,
+                playtime = playtime - (
+                    SELECT COALESCE(SUM(l.playtime), 0) FROM library l
+                    WHERE l.appid = old.appid AND l.user_id = user_genre_playtime.user_id)
+            WHERE genre = old.genre
+              AND user_id IN (SELECT user_id FROM library WHERE appid = old.appid);
+        END
+    """)
+
+
+def create_similarity_tables(cursor):
+    """Create the item-item neighbour table and the change log that drives incremental rebuilds.
+
+    Triggers append the appid of every library or review change to
+    ``similarity_changes``; ``similarity.build_similarity`` recomputes only
+    the neighbour lists those changes can affect.
+    """
+    if table_exists(cursor, "item_neighbors"):
+        return
+    cursor.execute("""
+        CREATE TABLE item_neighbors (
+            appid TEXT NOT NULL,
+            neighbor TEXT NOT NULL,
+            score REAL NOT NULL,
+            PRIMARY KEY(appid, neighbor)
+        ) WITHOUT ROWID
+    """)
+    cursor.execute("CREATE INDEX idx_item_neighbors_neighbor ON item_neighbors(neighbor)")
+    cursor.execute("""
+        CREATE TABLE similarity_changes (
+            id INTEGER PRIMARY KEY,
+            appid TEXT NOT NULL
+        )
+    """)
+    for name, event, row in [
+        ("similarity_library_insert", "INSERT ON library", "new"),
+        ("similarity_library_playtime", "UPDATE OF playtime ON library", "new"),
+        ("similarity_library_delete", "DELETE ON library", "old"),
+        ("similarity_review_insert", "INSERT ON reviews", "new"),
+        ("similarity_review_rating", "UPDATE OF rating ON reviews", "new"),
+        ("similarity_review_delete", "DELETE ON reviews", "old"),
+    ]:
+        cursor.execute(f"""
+            CREATE TRIGGER {name} AFTER {event} BEGIN
+                INSERT INTO similarity_changes (appid) VALUES ({row}.appid);
+            END
+        """)
+
+
+def create_refresh_tables(cursor):
+    """Create the bookkeeping tables of the catalog metadata refresher.
+
+    ``catalog_refresh`` holds, per appid, the content hash of the metadata
+    last seen on Steam and when it was last checked and last changed;
+    ``catalog_refresh_runs`` logs what each refresh run spent and found.
+    Times are Unix seconds.
+    """
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS catalog_refresh (
+            appid TEXT PRIMARY KEY,
+            content_hash TEXT,
+            checked_at INTEGER NOT NULL,
+            changed_at INTEGER
+        ) WITHOUT ROWID
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_catalog_refresh_checked ON catalog_refresh(checked_at)")
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS catalog_refresh_runs (
+            id INTEGER PRIMARY KEY,
+            started_at INTEGER NOT NULL,
+            requests INTEGER NOT NULL,
+            changed INTEGER NOT NULL,
+            unchanged INTEGER NOT NULL,
+            unavailable INTEGER NOT NULL,
+            failed INTEGER NOT NULL
+        )
+    """)
+
+
+def create_price_tables(cursor):
+    """Create the wishlist price history, one row per app per observed change.
+
+    Prices are in cents of ``currency``; ``recorded_at`` is Unix seconds.
+    """
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS price_history (
+            appid TEXT NOT NULL,
+            recorded_at INTEGER NOT NULL,
+            currency TEXT,
+            initial_price INTEGER,
+            final_price INTEGER,
+            discount_percent INTEGER,
+            PRIMARY KEY(appid, recorded_at)
+        ) WITHOUT ROWID
+    """)
+
+
+def migrate(conn):
+    """Apply every pending migration; returns the names of those applied."""
+    applied = []
+    if migrate_games_to_catalog(conn):
+        applied.append("games_to_catalog")
+    if migrate_reviews_to_appid(conn):
+        applied.append("reviews_to_appid")
+    return applied
+
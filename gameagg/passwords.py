@@ -0,0 +1,201 @@
+"""Password hashing with per-user salts and versioned parameters.
+
+Stored hashes are self-describing strings, so rows written with older
+schemes or weaker parameters keep working and are upgraded on the next
+successful login:
+
+- ``scrypt$n=16384,r=8,p=1$<salt>$<hash>``: stdlib scrypt, the default
+- ``$argon2id$v=19$m=...,t=...,p=...$<salt>$<hash>``: Argon2id via the optional ``argon2-cffi`` package
+- 64 hex digits: the original unsalted SHA-256, accepted for verification only
+
+Hashing is deliberately slow, so it runs on a small thread pool: scrypt and
+Argon2 release the GIL, and the pool caps how many hashes (and how much of
+their memory) are in flight at once.
+"""
+import base64
+import hashlib
+import hmac
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from . import config
+
+try:
+    import argon2
+except ImportError:  # Argon2id is optional; scrypt needs nothing beyond the stdlib
+    argon2 = None
+
+SALT_BYTES = 16
+HASH_BYTES = 32
+
+_LEGACY_RE = re.compile(r"^[0-9a-f]{64}$")
+
+
+def _b64encode(data):
+    return base64.b64encode(data).decode().rstrip("=")
+
+
+def _b64decode(text):
+    return base64.b64decode(text + "=" * (-len(text) % 4))
+
+
+class ScryptHasher:
+    """scrypt with a random salt; cost parameters are stored with each hash."""
+
+    scheme = "scrypt"
+
+    def __init__(self, n=2 ** 14, r=8, p=1):
+        self.n, self.r, self.p = n, r, p
+
+    @property
+    def params(self):
+        return f"n={self.n},r={self.r},p={self.p}"
+
+    def _derive(self, password, salt, n, r, p):
+        # OpenSSL's default memory cap is too small for n >= 2**15
+        return hashlib.scrypt(password.encode(), salt=salt, n=n, r=r, p=p,
+                              maxmem=256 * r * n * p, dklen=HASH_BYTES)
+
+    def hash(self, password):
+        salt = os.urandom(SALT_BYTES)
+        digest = self._derive(password, salt, self.n, self.r, self.p)
+        return f"{self.scheme}${self.params}${_b64encode(salt)}${_b64encode(digest)}"
+
+    def identify(self, stored):
+        return stored.startswith(self.scheme + "$")
+
+    def verify(self, password, stored):
+        try:
+            _, params, salt, digest = stored.split("$")
+            values = dict(item.split("=") for item in params.split(","))
+            expected = _b64decode(digest)
+            actual = self._derive(password, _b64decode(salt), int(values["n"]), int(values["r"]), int(values["p"]))
+        except (ValueError, KeyError):
+            return False
+        return hmac.compare_digest(actual, expected)
+
+    def needs_rehash(self, stored):
+        return stored.split("$")[1] != self.params
+
+
+class Argon2Hasher:
+    """Argon2id through ``argon2-cffi``, which handles salts and parameters itself."""
+
+    scheme = "argon2"
+
+    def __init__(self, time_cost=3, memory_cost=64 * 1024, parallelism=1):
+        if argon2 is None:
+            raise RuntimeError("The argon2 password hasher needs the argon2-cffi package.")
+        self._hasher = argon2.PasswordHasher(time_cost=time_cost, memory_cost=memory_cost,
+                                             parallelism=parallelism, hash_len=HASH_BYTES, salt_len=SALT_BYTES)
+        self.params = f"m={memory_cost},t={time_cost},p={parallelism}"
+
+    def hash(self, password):
+        return self._hasher.hash(password)
+
+    def identify(self, stored):
+        return stored.startswith("$argon2")
+
+    def verify(self, password, stored):
+        try:
+            return self._hasher.verify(stored, password)
+        except argon2.exceptions.VerifyMismatchError:
+            return False
+        except argon2.exceptions.InvalidHashError:
+            return False
+
+    def needs_rehash(self, stored):
+        return self._hasher.check_needs_rehash(stored)
+
+
+class LegacySHA256Hasher:
+    """The original unsalted SHA-256 scheme; only ever used to verify old rows."""
+
+    scheme = "sha256"
+    params = ""
+
+    def hash(self, password):
+        return hashlib.sha256(password.encode()).hexdigest()
+
+    def identify(self, stored):
+        return bool(_LEGACY_RE.match(stored))
+
+    def verify(self, password, stored):
+        return hmac.compare_digest(self.hash(password), stored)
+
+    def needs_rehash(self, stored):
+        return True
+
+
+HASHERS = {"scrypt": ScryptHasher, "argon2": Argon2Hasher}
+
+_hasher = None
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_hasher():
+    """Return the hasher new passwords are hashed with (``config.PASSWORD_HASHER``)."""
+    global _hasher
+    if _hasher is None:
+        _hasher = HASHERS[config.PASSWORD_HASHER]()
+    return _hasher
+
+
+def set_hasher(hasher):
+    """Switch the hasher for new hashes, e.g. to stronger parameters."""
+    global _hasher
+    _hasher = hasher
+
+
+def _identify(stored):
+    current = get_hasher()
+    for hasher in (current, ScryptHasher(), LegacySHA256Hasher()):
+        if hasher.identify(stored):
+            return hasher
+    if argon2 is not None and stored.startswith("$argon2"):
+        return Argon2Hasher()
+    return None
+
+
+def _run(func, *args):
+    global _pool
+    # Sessions logging in at once must share one pool, not each build their own
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=config.PASSWORD_WORKERS, thread_name_prefix="password")
+    return _pool.submit(func, *args).result()
+
+
+def hash_password(password):
+    """Hash a password with the current hasher, on the hashing pool."""
+    return _run(get_hasher().hash, password)
+
+
+def verify_password(password, stored):
+    """Check a password against a stored hash of any supported scheme.
+
+    Returns:
+        tuple: ``(valid, needs_rehash)``; ``needs_rehash`` is True when the
+        hash uses an older scheme or parameters than the current hasher
+    """
+    hasher = _identify(stored or "")
+    if hasher is None:
+        return False, False
+    if not _run(hasher.verify, password, stored):
+        return False, False
+    current = get_hasher()
+    return True, hasher.scheme != current.scheme or current.needs_rehash(stored)
+
+
+_dummy_hash = None
+
+
+def burn_verification(password):
+    """Spend a verification's worth of time, so unknown usernames take as long as known ones."""
+    global _dummy_hash
+    if _dummy_hash is None:
+        _dummy_hash = get_hasher().hash("")
+    _run(get_hasher().verify, password, _dummy_hash)
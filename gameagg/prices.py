@@ -0,0 +1,147 @@
+"""Wishlist price tracking.
+
+Prices come from the store ``appdetails`` endpoint with
+``filters=price_overview``, which accepts many comma-separated appids per
+request. Polling covers the distinct wishlisted appids across all users, and
+a row is added to ``price_history`` only when an app's price changes.
+Prices are those of the ``config.STORE_COUNTRY`` store region.
+"""
+import time
+from collections import namedtuple
+
+import requests
+
+from . import config
+from .breaker import guarded_get
+from .db import get_connection
+from .errors import CircuitOpenError
+from .steam import REQUEST_TIMEOUT
+
+# Appids per appdetails request
+PRICE_BATCH_SIZE = 100
+
+PriceOverview = namedtuple("PriceOverview", ["currency", "initial_price", "final_price", "discount_percent"])
+PollResult = namedtuple("PollResult", ["appids", "requests", "changed", "failed_batches"])
+
+# Recorded when a listed app has no price (it went free-to-play, or isn't for sale yet)
+NO_PRICE = PriceOverview(None, None, None, None)
+
+
+def parse_price_overviews(data):
+    """Return appid -> PriceOverview from a ``price_overview`` appdetails payload.
+
+    Listed apps without a price (free or unreleased) map to ``NO_PRICE``;
+    apps the store doesn't list in the region are left out.
+    """
+    prices = {}
+    for appid, entry in (data or {}).items():
+        if not isinstance(entry, dict) or not entry.get("success"):
+            continue
+        overview = entry.get("data")
+        if not isinstance(overview, dict) or "price_overview" not in overview:
+            prices[str(appid)] = NO_PRICE
+            continue
+        overview = overview["price_overview"]
+        prices[str(appid)] = PriceOverview(
+            overview.get("currency"),
+            overview.get("initial"),
+            overview.get("final"),
+            overview.get("discount_percent", 0),
+        )
+    return prices
+
+
+def fetch_price_overviews(appids, country=None):
+    """Fetch current prices for up to ``PRICE_BATCH_SIZE`` appids in one request.
+
+    ``country`` defaults to ``config.STORE_COUNTRY``.
+    """
+    params = {
+        "appids": ",".join(str(appid) for appid in appids),
+        "filters": "price_overview",
+        "cc": country or config.STORE_COUNTRY,
+    }
+    response = guarded_get("steam_store", f"{config.STEAM_STORE_API_URL}/api/appdetails",
+                           params, timeout=REQUEST_TIMEOUT)
+    response.raise_for_status()
+    return parse_price_overviews(response.json())
+
+
+def get_wishlisted_appids():
+    conn = get_connection()
+    try:
+        return [row[0] for row in conn.execute("SELECT DISTINCT steam_game_id FROM wishlist")]
+    finally:
+        conn.close()
+
+
+def record_prices(cursor, prices, recorded_at=None):
+    """Append a history row for each app whose price differs from its latest one.
+
+    An app that loses its price gets a ``NO_PRICE`` row, so its last price
+    isn't shown forever; one that never had a price gets no row at all.
+
+    Returns:
+        int: number of apps whose price changed
+    """
+    recorded_at = int(time.time()) if recorded_at is None else recorded_at
+    changed = 0
+    for appid, price in prices.items():
+        cursor.execute("""
+            SELECT currency, initial_price, final_price, discount_percent
+            FROM price_history WHERE appid = ?
+            ORDER BY recorded_at DESC LIMIT 1
+        """, (appid,))
+        latest = cursor.fetchone()
+        if latest == tuple(price) or (latest is None and price == NO_PRICE):
+            continue
+        cursor.execute("""
+            INSERT OR REPLACE INTO price_history (appid, recorded_at, currency, initial_price, final_price, discount_percent)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, (appid, recorded_at, *price))
+        changed += 1
+    return changed
+
+
+def poll_wishlist_prices(batch_size=PRICE_BATCH_SIZE, fetch=fetch_price_overviews):
+    """Poll prices for every wishlisted app and store the ones that changed.
+
+    Returns:
+        PollResult: appids polled, requests made, prices changed and failed batches
+    """
+    appids = get_wishlisted_appids()
+    prices = {}
+    requests_made = failed = 0
+    for start in range(0, len(appids), batch_size):
+        requests_made += 1
+        try:
+            prices.update(fetch(appids[start:start + batch_size]))
+        except (requests.RequestException, ValueError, CircuitOpenError):
+            failed += 1
+
+    conn = get_connection()
+    try:
+        changed = record_prices(conn.cursor(), prices)
+        conn.commit()
+    finally:
+        conn.close()
+    return PollResult(len(appids), requests_made, changed, failed)
+
+
+def price_history(appid):
+    """Return ``(recorded_at, final_price, discount_percent)`` rows for an app, oldest first."""
+    conn = get_connection()
+    try:
+        return conn.execute("""
+            SELECT recorded_at, final_price, discount_percent
+            FROM price_history WHERE appid = ? ORDER BY recorded_at
+        """, (str(appid),)).fetchall()
+    finally:
+        conn.close()
+
+
+def format_price(cents, currency):
+    if cents is None:
+        return "Unknown"
+    symbol = "$" if currency == "USD" else f"{currency} "
+    return f"{symbol}{cents / 100:.2f}"
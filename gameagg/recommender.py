@@ -0,0 +1,315 @@
+import hashlib
+import json
+import re
+
+from . import config
+from .breaker import get_breaker
+from .cache import RECOMMENDATION_TTL, get_cache
+from .errors import CircuitOpenError
+from .repository import find_catalog_games, get_played_games, get_user_reviews_for_ai
+
+_model = None
+
+
+def get_model():
+    """Return the shared Gemini model, configuring the client on first use."""
+    global _model
+    if _model is None:
+        import google.generativeai as genai
+        genai.configure(api_key=config.GENAI_API_KEY)
+        _model = genai.GenerativeModel(config.GENAI_MODEL)
+    return _model
+
+
+RESPONSE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "recommendations": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "name": {"type": "string"},
+                    "description": {"type": "string"},
+                    "genres": {"type": "array", "items": {"type": "string"}},
+                },
+                "required": ["name", "description", "genres"],
+            },
+        },
+    },
+    "required": ["recommendations"],
+}
+
+GENERATION_CONFIG = {"response_mime_type": "application/json", "response_schema": RESPONSE_SCHEMA}
+
+
+def build_prompt(reviews, limit, exclude=()):
+    review_text = "\n".join([
+        f"Game: {game}\nReview: {review}\nRating: {rating}/5\n"
+        for game, review, rating in reviews
+    ])
+    excluded = ", ".join(sorted(exclude))
+
+    return f"""
+    Based on these user game reviews, recommend {limit} different Steam games.
+
+    User's Game Reviews:
+    {review_text}
+
+    For each game give its name, a brief explanation of why it matches the
+    user's tastes (1-2 sentences) and its main genres.
+
+    Rules:
+    - Use plain text game names without any formatting
+    - Only recommend games available on Steam
+    - Do not recommend games the user has already reviewed
+    - Keep game names concise and exact as they appear on Steam
+    - Provide short, direct explanations
+    - Focus on games matching the user's demonstrated preferences
+    {f"- Do not recommend any of these games: {excluded}" if excluded else ""}
+
+    Please provide exactly {limit} recommendations.
+    """
+
+
+def _recommendation(name, description=None, genres=None):
+    if isinstance(genres, (list, tuple)):
+        genres = ", ".join(str(genre).strip() for genre in genres if str(genre).strip())
+    return {
+        "name": name,
+        "description": description or "No description available",
+        "genres": genres or "Genre information unavailable",
+    }
+
+
+_FENCE_RE = re.compile(r"^\s*```(?:json)?\s*|\s*```\s*$")
+_BULLET_RE = re.compile(r"^(?:#+\s*|[-*\u2022]\s+|\d+\s*[.):]\s*)+")
+_LABEL_RE = re.compile(r"^\W*(name|game|title|description|why|reason|genres?)\W*:\W*", re.IGNORECASE)
+# "Hades - roguelike with great combat (Action, Roguelike)" on a single line
+_ONE_LINE_RE = re.compile(r"^(?P<name>.+?)\s+[-\u2013\u2014]\s+(?P<description>.+?)(?:\s*\((?P<genres>[^()]+)\))?$")
+
+
+def _parse_json(text):
+    """Return recommendation dicts from a JSON answer, or None if it isn't JSON.
+
+    A JSON answer of the wrong shape yields no recommendations rather than
+    being reparsed as text.
+    """
+    text = _FENCE_RE.sub("", text)
+    try:
+        data = json.loads(text)
+    except ValueError:
+        # Tolerate prose around the JSON document
+        start, end = text.find("{"), text.rfind("}")
+        if start == -1 or end <= start:
+            return None
+        try:
+            data = json.loads(text[start:end + 1])
+        except ValueError:
+            return None
+    if isinstance(data, dict):
+        data = data.get("recommendations", [])
+    if not isinstance(data, list):
+        return []
+    return [
+        _recommendation(str(item["name"]).strip(), item.get("description"), item.get("genres"))
+        for item in data
+        if isinstance(item, dict) and str(item.get("name") or "").strip()
+    ]
+
+
+def _clean_line(line):
+    """Strip list numbering, markdown emphasis and headers from a line of text."""
+    line = _BULLET_RE.sub("", line.strip())
+    return line.replace("**", "").replace("__", "").strip().strip("*_").strip()
+
+
+def _parse_lines(text):
+    """Parse the plain-text ``name / description / genres`` block format.
+
+    Blocks are separated by blank lines or ``---``. Numbering, bullets,
+    markdown and ``Name:``/``Genres:`` labels are ignored. A name line of
+    the form ``Name - description (genres)`` fills all three fields.
+    """
+    recommendations = []
+    block = {}
+
+    def flush():
+        if block.get("name"):
+            recommendations.append(_recommendation(block["name"], block.get("description"), block.get("genres")))
+        block.clear()
+
+    for raw in text.split("\n"):
+        stripped = raw.strip()
+        if not stripped or set(stripped) <= set("-*_="):
+            flush()
+            continue
+        if not block and stripped.endswith(":"):
+            continue  # "Here are some games you might like:"
+        numbered = re.match(r"\s*\d+\s*[.):]", raw)
+        label = _LABEL_RE.match(_clean_line(raw))
+        line = _clean_line(_LABEL_RE.sub("", _clean_line(raw)))
+        if not line:
+            continue
+        field = label.group(1).lower() if label else None
+        if field in ("game", "title"):
+            field = "name"
+        elif field in ("why", "reason"):
+            field = "description"
+        elif field == "genre":
+            field = "genres"
+        elif field is None:
+            # Unlabelled lines fill name, description, genres in order;
+            # a numbered line or a fourth line starts the next game
+            field = "name" if numbered else next(
+                (f for f in ("name", "description", "genres") if f not in block), "name")
+        if field == "name" and block.get("name"):
+            flush()
+        one_line = _ONE_LINE_RE.match(line) if field == "name" else None
+        if one_line:
+            block.update((key, value) for key, value in one_line.groupdict().items() if value)
+        else:
+            block[field] = line
+    flush()
+    return recommendations
+
+
+def parse_recommendations(text):
+    """Turn the model's answer into recommendation dicts.
+
+    Structured JSON output is expected; anything else falls back to a
+    tolerant parser for the older plain-text format.
+    """
+    if not text:
+        return []
+    parsed = _parse_json(text)
+    return parsed if parsed is not None else _parse_lines(text)
+
+
+def _name_key(name):
+    """Normalised name used to compare game titles."""
+    return " ".join(re.sub(r"[\u2122\u00ae\u00a9]", "", name).lower().split())
+
+
+def attach_catalog_details(recommendations):
+    """Add ``appid``, ``cover_url`` and ``store_url`` from the catalog to each recommendation.
+
+    Names are matched case-insensitively; games missing from the local
+    catalog keep a None appid and no links.
+    """
+    names = {rec["name"] for rec in recommendations} | {_name_key(rec["name"]) for rec in recommendations}
+    found = find_catalog_games(names)
+    for rec in recommendations:
+        match = found.get(rec["name"].lower()) or found.get(_name_key(rec["name"]))
+        appid, game_name, cover_url, store_url = match or (None, rec["name"], None, None)
+        rec.update(name=game_name, appid=appid, cover_url=cover_url, store_url=store_url)
+    return recommendations
+
+
+def filter_recommendations(recommendations, played, seen=()):
+    """Drop duplicates and games the user already owns or has reviewed.
+
+    Args:
+        recommendations (list): dicts with ``name`` and ``appid``
+        played (dict): appid -> game name of the user's owned and reviewed games
+        seen (iterable): name keys already recommended
+    """
+    played_names = {_name_key(name) for name in played.values() if name}
+    seen = set(seen)
+    kept = []
+    for rec in recommendations:
+        key = _name_key(rec["name"])
+        if rec.get("appid") in played or key in played_names or key in seen:
+            continue
+        seen.add(key)
+        kept.append(rec)
+    return kept
+
+
+def _ask(model, reviews, limit, exclude=()):
+    with get_breaker("gemini").guard():
+        response = model.generate_content(build_prompt(reviews, limit, exclude), generation_config=GENERATION_CONFIG,
+                                          request_options={"timeout": config.GENAI_TIMEOUT})
+    return attach_catalog_details(parse_recommendations(response.text))
+
+
+# Generate recommendations using Google Gemini
+def generate_recommendations(user_id, limit=10, model=None, refresh=False):
+    """Return up to ``limit`` recommendation dicts for a user.
+
+    Recommendations the user already owns or has reviewed are dropped; if
+    that leaves fewer than ``limit``, one follow-up request asks for the
+    rest, excluding every name seen so far. Results are cached per user and
+    set of reviews, so every replica serves the same list until the reviews
+    change or ``refresh`` is set.
+    """
+    reviews = get_user_reviews_for_ai(user_id)
+
+    if not reviews:
+        return [{
+            "name": "No Reviews Found",
+            "description": "Please submit some game reviews to get personalized recommendations.",
+            "genres": "N/A"
+        }]
+
+    fingerprint = hashlib.sha1("\n".join(sorted(map(repr, reviews))).encode()).hexdigest()
+    key = f"recs:{user_id}:{limit}:{fingerprint}"
+    cache = get_cache()
+    if not refresh:
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
+    recommendations = _recommend(model, user_id, reviews, limit)
+    # Error and placeholder entries have no appid key; only cache real results
+    if all("appid" in rec for rec in recommendations):
+        cache.set(key, recommendations, RECOMMENDATION_TTL)
+    return recommendations
+
+
+def _recommend(model, user_id, reviews, limit):
+    try:
+        model = model or get_model()
+        played = get_played_games(user_id)
+        candidates = _ask(model, reviews, limit)
+        recommendations = filter_recommendations(candidates, played)[:limit]
+
+        if len(recommendations) < limit:
+            recommendations += _top_up(model, reviews, candidates, played, limit - len(recommendations))
+
+        if not recommendations:
+            return [{
+                "name": "No recommendations available",
+                "description": "Please try again.",
+                "genres": "N/A"
+            }]
+
+        return recommendations
+
+    except CircuitOpenError as e:
+        return [{
+            "name": "Recommendations temporarily unavailable",
+            "description": str(e),
+            "genres": "N/A"
+        }]
+    except Exception as e:
+        return [{
+            "name": "Error",
+            "description": f"An error occurred: {str(e)}",
+            "genres": "N/A"
+        }]
+
+
+def _top_up(model, reviews, candidates, played, missing):
+    """Ask once more for ``missing`` recommendations not among ``candidates``.
+
+    The first answer has already been paid for, so if this follow-up fails
+    the shorter list is kept rather than replaced by an error.
+    """
+    exclude = {rec["name"] for rec in candidates} | {game for game, _, _ in reviews}
+    try:
+        extra = _ask(model, reviews, missing, exclude)
+    except Exception:  # Includes CircuitOpenError
+        return []
+    seen = {_name_key(rec["name"]) for rec in candidates}
+    return filter_recommendations(extra, played, seen)[:missing]
@@ -0,0 +1,210 @@
+"""Scheduled refresh of catalog metadata.
+
+Catalog rows (name, genres, cover) are fetched once, when a game is first
+imported, and go stale as Steam updates them. ``refresh_catalog`` is a
+periodic job (``python -m gameagg refresh-catalog``, e.g. hourly from cron)
+that re-checks up to ``budget`` appids per run, most-owned and most recently
+played first, skipping any checked within ``max_age``.
+
+Each fetched payload is reduced to the fields the catalog stores and hashed;
+only appids whose hash differs from the last one seen are written, so
+unchanged games never touch ``catalog``, its genre aggregates or the review
+search index. ``refresh_report`` summarises coverage, check age and how
+many requests each actual change cost.
+
+Changed appids are also evicted from ``get_cache()``. That only reaches
+the running app when ``config.CACHE_BACKEND`` includes a tier shared
+between processes (``sqlite`` or ``redis``); with ``memory`` alone the
+app serves its cached details until they expire.
+"""
+import hashlib
+import json
+import time
+from collections import namedtuple
+
+import requests
+
+from .cache import get_cache
+from .db import get_connection
+from .errors import CircuitOpenError, SteamAPIError
+from .importer import upsert_catalog
+from .steam import fetch_app_details_payload, parse_app_details
+
+# appdetails requests per run; the store allows roughly 200 per 5 minutes
+REFRESH_BUDGET = 150
+# Games checked more recently than this are not due yet
+REFRESH_MAX_AGE = 7 * 24 * 3600
+# Runs counted in the report's requests-per-change figure
+REPORT_WINDOW = 30 * 24 * 3600
+
+# Upper bounds, in seconds, of the check-age buckets in the report
+AGE_BUCKETS = [("under 1 day", 24 * 3600), ("1-7 days", 7 * 24 * 3600), ("7-30 days", 30 * 24 * 3600),
+               ("over 30 days", None)]
+
+RefreshResult = namedtuple("RefreshResult", ["requests", "changed", "unchanged", "unavailable", "failed", "stopped"])
+RefreshReport = namedtuple("RefreshReport", [
+    "catalog", "checked", "fresh", "ages", "runs", "requests", "changed", "requests_per_change",
+])
+
+
+def content_hash(details):
+    """Hash the parts of a GameDetails the catalog stores.
+
+    Volatile payload fields (price, review counts, ...) are left out, so
+    they don't register as changes.
+    """
+    return _hash_fields(details.name, details.genres, details.cover_url, details.store_url)
+
+
+def _hash_fields(name, genres, cover_url, store_url):
+    content = [name, genres, cover_url, store_url]
+    return hashlib.sha256(json.dumps(content, ensure_ascii=False).encode()).hexdigest()
+
+
+def due_appids(cursor, budget=REFRESH_BUDGET, max_age=REFRESH_MAX_AGE, now=None):
+    """Return up to ``budget`` ``(appid, game_name, known hash)`` rows due for a check.
+
+    Priority is owners, then the latest library activity (``added_on`` moves
+    whenever playtime grows), then the oldest check. With no hash recorded
+    yet, the known hash is derived from the current catalog row.
+    """
+    now = int(time.time()) if now is None else now
+    cursor.execute("""
+        SELECT c.appid, c.game_name, c.genres, c.cover_url, c.store_url, r.content_hash
+        FROM catalog c
+        LEFT JOIN (
+            SELECT appid, COUNT(DISTINCT user_id) AS owners, MAX(added_on) AS last_active
+            FROM library GROUP BY appid
+        ) l ON l.appid = c.appid
+        LEFT JOIN catalog_refresh r ON r.appid = c.appid
+        WHERE r.checked_at IS NULL OR r.checked_at <= ?
+        ORDER BY COALESCE(l.owners, 0) DESC, l.last_active DESC, r.checked_at
+        LIMIT ?
+    """, (now - max_age, budget))
+    return [(appid, name, known or _hash_fields(name, genres, cover_url, store_url))
+            for appid, name, genres, cover_url, store_url, known in cursor.fetchall()]
+
+
+def _is_available(appid, payload):
+    entry = (payload or {}).get(str(appid))
+    return isinstance(entry, dict) and entry.get("success", False)
+
+
+def refresh_catalog(budget=REFRESH_BUDGET, max_age=REFRESH_MAX_AGE, fetch=fetch_app_details_payload):
+    """Re-check the metadata of up to ``budget`` due appids and store what changed.
+
+    Everything is fetched before the database is written, in one short
+    transaction. Apps the store no longer lists keep their metadata and
+    are marked checked; network failures are retried next run. The run
+    stops early if the Steam Store breaker opens.
+
+    Returns:
+        RefreshResult: requests made, rows changed and unchanged, apps the
+        store didn't list, failed requests, and whether the run stopped early
+    """
+    started = int(time.time())
+    conn = get_connection()
+    try:
+        due = due_appids(conn.cursor(), budget, max_age, started)
+    finally:
+        conn.close()
+
+    changed, unchanged, unavailable = [], [], []
+    failed = 0
+    stopped = False
+    for appid, name, known in due:
+        try:
+            payload = fetch(appid)
+        except CircuitOpenError:
+            # Rejected without a request; the rest are picked up next run
+            stopped = True
+            break
+        except (requests.RequestException, SteamAPIError, ValueError):
+            failed += 1
+            continue
+        if not _is_available(appid, payload):
+            unavailable.append(appid)
+            continue
+        details = parse_app_details(appid, name, payload)
+        digest = content_hash(details)
+        if digest == known:
+            unchanged.append((appid, digest))
+        else:
+            changed.append((appid, details, digest))
+    requests_made = len(changed) + len(unchanged) + len(unavailable) + failed
+
+    checked_at = int(time.time())
+    conn = get_connection()
+    try:
+        cursor = conn.cursor()
+        for appid, details, _ in changed:
+            upsert_catalog(cursor, appid, details)
+        cursor.executemany("""
+            INSERT INTO catalog_refresh (appid, content_hash, checked_at, changed_at) VALUES (?, ?, ?, ?)
+            ON CONFLICT(appid) DO UPDATE SET
+                content_hash = excluded.content_hash,
+                checked_at = excluded.checked_at,
+                changed_at = excluded.changed_at
+        """, [(appid, digest, checked_at, checked_at) for appid, _, digest in changed])
+        cursor.executemany("""
+            INSERT INTO catalog_refresh (appid, content_hash, checked_at) VALUES (?, ?, ?)
+            ON CONFLICT(appid) DO UPDATE SET
+                content_hash = excluded.content_hash,
+                checked_at = excluded.checked_at
+        """, [(appid, digest, checked_at) for appid, digest in unchanged])
+        cursor.executemany("""
+            INSERT INTO catalog_refresh (appid, checked_at) VALUES (?, ?)
+            ON CONFLICT(appid) DO UPDATE SET checked_at = excluded.checked_at
+        """, [(appid, checked_at) for appid in unavailable])
+        cursor.execute("""
+            INSERT INTO catalog_refresh_runs (started_at, requests, changed, unchanged, unavailable, failed)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, (started, requests_made, len(changed), len(unchanged), len(unavailable), failed))
+        conn.commit()
+    finally:
+        conn.close()
+
+    # Drop the stale details from the shared tiers (sqlite, redis) the app also reads; a "memory"
+    # tier is private to this process, so the app's own copy lasts until its TTL runs out
+    cache = get_cache()
+    for appid, _, _ in changed:
+        cache.delete(f"appdetails:{appid}")
+    return RefreshResult(requests_made, len(changed), len(unchanged), len(unavailable), failed, stopped)
+
+
+def refresh_report(max_age=REFRESH_MAX_AGE, window=REPORT_WINDOW, now=None):
+    """Summarise how fresh the catalog is and what recent refresh runs cost.
+
+    Returns:
+        RefreshReport: catalog size, games ever checked, games checked within
+        ``max_age``, ``(bucket, count)`` check ages (``"never"`` last), and the
+        runs, requests and changes of the last ``window`` seconds with their
+        requests per changed row (None if nothing changed)
+    """
+    now = int(time.time()) if now is None else now
+    conn = get_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT COUNT(*), COUNT(r.checked_at), COALESCE(SUM(r.checked_at > ?), 0)
+            FROM catalog c LEFT JOIN catalog_refresh r ON r.appid = c.appid
+        """, (now - max_age,))
+        catalog, checked, fresh = cursor.fetchone()
+        bounds = [bound for _, bound in AGE_BUCKETS if bound is not None]
+        cases = " ".join(f"WHEN :now - r.checked_at < {bound} THEN {i}" for i, bound in enumerate(bounds))
+        cursor.execute(f"""
+            SELECT CASE {cases} ELSE {len(bounds)} END AS bucket, COUNT(*)
+            FROM catalog c JOIN catalog_refresh r ON r.appid = c.appid
+            GROUP BY bucket
+        """, {"now": now})
+        counts = dict(cursor.fetchall())
+        cursor.execute("""
+            SELECT COUNT(*), COALESCE(SUM(requests), 0), COALESCE(SUM(changed), 0)
+            FROM catalog_refresh_runs WHERE started_at > ?
+        """, (now - window,))
+        runs, requests_made, changes = cursor.fetchone()
+    finally:
+        conn.close()
+    ages = [(label, counts.get(i, 0)) for i, (label, _) in enumerate(AGE_BUCKETS)] + [("never", catalog - checked)]
+    return RefreshReport(catalog, checked, fresh, ages, runs, requests_made, changes,
+                         requests_made / changes if changes else None)
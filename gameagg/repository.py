@@ -0,0 +1,380 @@
+import re
+from collections import namedtuple
+
+from .db import get_connection
+from .steam import GameDetails
+
+# Parameters bound per IN (...) query, well below SQLite's variable limit
+SQL_BATCH_SIZE = 500
+
+# Library rows carry only the fields the games page renders
+LibraryGame = namedtuple("LibraryGame", ["id", "appid", "name", "playtime", "genres", "cover_url", "store_url"])
+
+# Ties (and never-played games, whose playtime may be NULL or 0) fall back to name, then appid
+LIBRARY_ORDER = {
+    "playtime": "COALESCE(l.playtime, 0) DESC, c.game_name, l.appid",
+    "name": "c.game_name, l.appid",
+}
+
+
+def _like_pattern(text):
+    """LIKE pattern matching ``text`` anywhere, with its wildcards escaped."""
+    return "%" + re.sub(r"([%_\\])", r"\\\1", text) + "%"
+
+
+# Games
+def get_games_from_db(user_id, steam_user_id, sort_by="playtime", genre=None):
+    """Return a Steam account's games, sorted and filtered by SQLite.
+
+    Args:
+        sort_by (str): ``"playtime"`` (most played first) or ``"name"``
+        genre (str): keep only games with a genre containing this text, ignoring
+            case (matched against ``catalog_genres``)
+
+    Returns:
+        list[LibraryGame]
+    """
+    filters = ["l.user_id = ?", "l.steam_user_id = ?"]
+    params = [user_id, steam_user_id]
+    if genre:
+        filters.append("""EXISTS (
+            SELECT 1 FROM catalog_genres g WHERE g.appid = l.appid AND g.genre LIKE ? ESCAPE '\\'
+        )""")
+        params.append(_like_pattern(genre))
+    conn = get_connection()
+    try:
+        rows = conn.execute(f"""
+            SELECT l.id, l.appid, c.game_name, COALESCE(l.playtime, 0), c.genres, c.cover_url, c.store_url
+            FROM library l JOIN catalog c ON c.appid = l.appid
+            WHERE {" AND ".join(filters)}
+            ORDER BY {LIBRARY_ORDER[sort_by]}
+        """, params)
+        return list(map(LibraryGame._make, rows))
+    finally:
+        conn.close()
+
+
+def get_known_appids(user_id, steam_user_id):
+    """Return the set of appids already stored for a user's Steam account."""
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("""
+            SELECT appid FROM library WHERE user_id = ? AND steam_user_id = ?
+        """, (user_id, steam_user_id))
+        return {row[0] for row in cursor.fetchall()}
+    finally:
+        conn.close()
+
+
+def get_catalog_details(appids):
+    """Return appid -> GameDetails for appids whose catalog metadata is complete.
+
+    Appids are returned with the same type they were passed in. Catalog rows
+    created without metadata (e.g. by a review of a searched game) are left
+    out so callers fetch them from Steam.
+    """
+    wanted = {str(appid): appid for appid in appids}
+    keys = list(wanted)
+    details = {}
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        for start in range(0, len(keys), SQL_BATCH_SIZE):
+            chunk = keys[start:start + SQL_BATCH_SIZE]
+            cursor.execute(f"""
+                SELECT appid, genres, cover_url, store_url, game_name
+                FROM catalog
+                WHERE appid IN ({", ".join("?" * len(chunk))}) AND genres IS NOT NULL
+            """, chunk)
+            for appid, genres, cover_url, store_url, name in cursor.fetchall():
+                details[wanted[appid]] = GameDetails(genres, cover_url, store_url, "No description available.", name)
+        return details
+    finally:
+        conn.close()
+
+
+def find_catalog_games(names):
+    """Look up catalog rows by game name, ignoring case.
+
+    Returns:
+        dict: lower-cased name -> ``(appid, game_name, cover_url, store_url)``
+    """
+    names = list({name.lower() for name in names if name})
+    found = {}
+    conn = get_connection()
+    try:
+        for start in range(0, len(names), SQL_BATCH_SIZE):
+            chunk = names[start:start + SQL_BATCH_SIZE]
+            rows = conn.execute(f"""
+                SELECT appid, game_name, cover_url, store_url FROM catalog
+                WHERE game_name COLLATE NOCASE IN ({", ".join("?" * len(chunk))})
+                ORDER BY genres IS NULL
+            """, chunk)
+            for row in rows:
+                found.setdefault(row[1].lower(), row)
+    finally:
+        conn.close()
+    return found
+
+
+def search_catalog(name, limit=25):
+    """Search the local catalog by game name, in the shape of ``steam.search_game_by_name_steam``."""
+    pattern = _like_pattern(name.strip())
+    conn = get_connection()
+    try:
+        rows = conn.execute("""
+            SELECT appid, game_name, cover_url FROM catalog
+            WHERE game_name LIKE ? ESCAPE '\\'
+            ORDER BY length(game_name), game_name LIMIT ?
+        """, (pattern, limit)).fetchall()
+    finally:
+        conn.close()
+    return [{"appid": appid, "name": game_name, "image": cover_url or ""} for appid, game_name, cover_url in rows]
+
+
+def get_played_games(user_id):
+    """Return appid -> game name for every game a user owns or has reviewed."""
+    conn = get_connection()
+    try:
+        return dict(conn.execute("""
+            SELECT c.appid, c.game_name FROM library l JOIN catalog c ON c.appid = l.appid
+            WHERE l.user_id = ?
+            UNION
+            SELECT c.appid, c.game_name FROM reviews r JOIN catalog c ON c.appid = r.appid
+            WHERE r.user_id = ?
+        """, (user_id, user_id)))
+    finally:
+        conn.close()
+
+
+def get_steam_accounts(user_id):
+    """Return the Steam IDs linked to a user or holding imported games."""
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("""
+            SELECT steam_user_id FROM accounts WHERE user_id = ?
+            UNION
+            SELECT steam_user_id FROM library WHERE user_id = ? AND steam_user_id IS NOT NULL
+        """, (user_id, user_id))
+        return [row[0] for row in cursor.fetchall()]
+    finally:
+        conn.close()
+
+
+# Reviews
+REVIEW_UPSERT_SQL = """
+    INSERT INTO reviews (user_id, appid, review_text, rating, created_at)
+    VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
+    ON CONFLICT(user_id, appid) DO UPDATE SET
+        review_text = excluded.review_text,
+        rating = excluded.rating,
+        created_at = excluded.created_at
+"""
+
+CATALOG_STUB_SQL = """
+    INSERT INTO catalog (appid, game_name) VALUES (?, ?)
+    ON CONFLICT(appid) DO NOTHING
+"""
+
+
+def has_existing_review(user_id, game_id):
+    """Check if a user has already reviewed a specific game."""
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("""
+            SELECT 1 FROM reviews WHERE user_id = ? AND appid = ?
+        """, (user_id, str(game_id)))
+        existing_review = cursor.fetchone()
+        return bool(existing_review)
+    finally:
+        conn.close()
+
+
+def add_review(user_id, game_id, game_name, review_text, rating):
+    """Create or replace a user's review of a Steam app.
+
+    The write is a single upsert on ``(user_id, appid)``, so concurrent
+    submissions for the same game can't produce duplicate reviews; the last
+    one wins. Games not yet in the catalog get a name-only entry.
+
+    Returns:
+        int: the review_id
+
+    Raises:
+        sqlite3.Error: if the review could not be written.
+    """
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute(CATALOG_STUB_SQL, (str(game_id), game_name))
+        cursor.execute(REVIEW_UPSERT_SQL + " RETURNING review_id",
+                       (user_id, str(game_id), review_text, rating))
+        review_id = cursor.fetchone()[0]
+        conn.commit()
+        return review_id
+    finally:
+        conn.close()
+
+
+def add_reviews(reviews):
+    """Upsert many reviews in one transaction.
+
+    Args:
+        reviews (iterable): ``(user_id, appid, game_name, review_text, rating)`` tuples
+
+    Returns:
+        int: number of reviews written
+    """
+    reviews = [(user_id, str(appid), game_name, review_text, rating)
+               for user_id, appid, game_name, review_text, rating in reviews]
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.executemany(CATALOG_STUB_SQL, [(appid, game_name) for _, appid, game_name, _, _ in reviews])
+        cursor.executemany(REVIEW_UPSERT_SQL, [(user_id, appid, review_text, rating)
+                                               for user_id, appid, _, review_text, rating in reviews])
+        conn.commit()
+        return len(reviews)
+    finally:
+        conn.close()
+
+
+def get_user_reviews(user_id):
+    """Retrieve all reviews submitted by the logged-in user."""
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("""
+            SELECT r.review_id, c.game_name, r.review_text, r.rating, r.created_at
+            FROM reviews r
+            JOIN catalog c ON c.appid = r.appid
+            WHERE r.user_id = ?
+        """, (user_id,))
+        return cursor.fetchall()
+    finally:
+        conn.close()
+
+
+def update_review(review_id, new_text, new_rating):
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("""
+            UPDATE reviews
+            SET review_text = ?, rating = ?, created_at = CURRENT_TIMESTAMP
+            WHERE review_id = ?
+        """, (new_text, new_rating, review_id))
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def delete_review(review_id):
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("""
+            DELETE FROM reviews WHERE review_id = ?
+        """, (review_id,))
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def get_user_reviews_for_ai(user_id):
+    """Return ``(game_name, review_text, rating)`` for every review by a user."""
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("""
+            SELECT c.game_name, r.review_text, r.rating
+            FROM reviews r
+            INNER JOIN catalog c ON c.appid = r.appid
+            WHERE r.user_id = ?
+        """, (user_id,))
+        return cursor.fetchall()
+    finally:
+        conn.close()
+
+
+# Wishlist
+def is_game_in_wishlist(user_id, steam_game_id):
+    """Check if a game is already in the user's wishlist."""
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("""
+            SELECT id FROM wishlist 
+            WHERE user_id = ? AND steam_game_id = ?
+        """, (user_id, steam_game_id))
+        result = cursor.fetchone()
+        return bool(result)
+    finally:
+        conn.close()
+
+
+def add_to_wishlist(user_id, steam_game_id, game_name, cover_url, store_url):
+    """Add a game to the user's wishlist.
+
+    Returns:
+        bool: True if the game was added, False if it was already present.
+    """
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        # Check if the game is already in the wishlist
+        cursor.execute("""
+            SELECT id FROM wishlist WHERE user_id = ? AND steam_game_id = ?
+        """, (user_id, steam_game_id))
+        if cursor.fetchone():
+            return False
+
+        # Add the game to the wishlist
+        cursor.execute("""
+            INSERT INTO wishlist (user_id, steam_game_id, game_name, cover_url, store_url, added_on)
+            VALUES (?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+        """, (user_id, steam_game_id, game_name, cover_url, store_url))
+        conn.commit()
+        return True
+    finally:
+        conn.close()
+
+
+def remove_from_wishlist(user_id, steam_game_id):
+    """Remove a game from the user's wishlist."""
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("""
+            DELETE FROM wishlist WHERE user_id = ? AND steam_game_id = ?
+        """, (user_id, steam_game_id))
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def fetch_wishlist(user_id):
+    """Fetch all games in the user's wishlist with their latest known price.
+
+    Rows are ``(steam_game_id, game_name, cover_url, store_url, added_on,
+    currency, initial_price, final_price, discount_percent)``; the price
+    columns are None until the app has been polled, and while it has no price.
+    """
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("""
+            SELECT w.steam_game_id, w.game_name, w.cover_url, w.store_url, w.added_on,
+                   p.currency, p.initial_price, p.final_price, p.discount_percent
+            FROM wishlist w
+            LEFT JOIN price_history p ON p.appid = w.steam_game_id AND p.recorded_at = (
+                SELECT MAX(recorded_at) FROM price_history WHERE appid = w.steam_game_id
+            )
+            WHERE w.user_id = ?
+        """, (user_id,))
+        return cursor.fetchall()
+    finally:
+        conn.close()
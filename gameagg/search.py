@@ -0,0 +1,103 @@
+"""Search over a user's own reviews and notes.
+
+Keyword and phrase queries run against the ``reviews_fts`` FTS5 index
+(review text and game name), ranked by BM25 with matches in the game name
+weighted higher. Rating and date filters and pagination are applied in the
+same query, so only one page of reviews is ever loaded.
+"""
+import re
+from collections import namedtuple
+
+from .db import get_connection
+
+DEFAULT_PAGE_SIZE = 20
+
+# Relative BM25 weights of the review_text and game_name columns
+COLUMN_WEIGHTS = (1.0, 2.0)
+
+ReviewHit = namedtuple("ReviewHit", ["review_id", "game_name", "review_text", "rating", "created_at", "snippet"])
+ReviewPage = namedtuple("ReviewPage", ["hits", "total", "page", "page_size"])
+
+_TOKEN_RE = re.compile(r'"([^"]*)"|(\S+)')
+
+
+def build_match_query(text):
+    """Turn free text into a safe FTS5 MATCH expression.
+
+    ``"quoted phrases"`` are kept as phrases, every other word must appear,
+    and the last bare word also matches as a prefix. FTS5 operators typed by
+    the user are treated as plain words, and tokens without any letters or
+    digits (a lone ``-``) are dropped. Returns None for blank input.
+    """
+    terms = []
+    tokens = _TOKEN_RE.findall(text or "")
+    for phrase, word in tokens:
+        if re.search(r"\w", phrase):
+            terms.append('"' + phrase.replace('"', '""') + '"')
+        elif word:
+            # Drop characters FTS5 would read as syntax
+            word = re.sub(r'["*^():{}\[\]]', " ", word).strip()
+            terms.extend('"' + part + '"' for part in word.split() if re.search(r"\w", part))
+    if not terms:
+        return None
+    _, last_word = tokens[-1]
+    if last_word and re.search(r"\w", last_word):
+        terms[-1] += "*"
+    return " AND ".join(terms)
+
+
+def search_reviews(user_id, text="", min_rating=1, max_rating=5, since=None, until=None,
+                   page=1, page_size=DEFAULT_PAGE_SIZE):
+    """Return one page of a user's reviews matching ``text`` and the filters.
+
+    Args:
+        user_id (int): whose reviews to search
+        text (str): keywords and/or ``"quoted phrases"``; blank lists all reviews newest first
+        min_rating, max_rating (int): inclusive rating range
+        since, until (str | date): inclusive ``created_at`` date bounds
+        page (int): 1-based page number
+        page_size (int): hits per page
+
+    Returns:
+        ReviewPage: the hits on this page and the total number of matches
+    """
+    page = max(1, int(page))
+    filters = ["r.user_id = ?", "r.rating BETWEEN ? AND ?"]
+    params = [user_id, min_rating, max_rating]
+    if since:
+        filters.append("date(r.created_at) >= date(?)")
+        params.append(str(since))
+    if until:
+        filters.append("date(r.created_at) <= date(?)")
+        params.append(str(until))
+
+    match = build_match_query(text)
+    if match:
+        source = "reviews_fts f JOIN reviews r ON r.review_id = f.rowid"
+        filters.insert(0, "reviews_fts MATCH ?")
+        params.insert(0, match)
+        snippet = "snippet(reviews_fts, 0, '**', '**', '…', 16)"
+        order = "bm25(reviews_fts, {}, {})".format(*COLUMN_WEIGHTS)
+    else:
+        source = "reviews r"
+        snippet = "NULL"
+        order = "r.created_at DESC"
+    where = " AND ".join(filters)
+
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute(f"SELECT COUNT(*) FROM {source} WHERE {where}", params)
+        total = cursor.fetchone()[0]
+        cursor.execute(f"""
+            SELECT r.review_id, c.game_name, r.review_text, r.rating, r.created_at, {snippet}
+            FROM {source}
+            LEFT JOIN catalog c ON c.appid = r.appid
+            WHERE {where}
+            ORDER BY {order}
+            LIMIT ? OFFSET ?
+        """, params + [page_size, (page - 1) * page_size])
+        hits = [ReviewHit(*row) for row in cursor.fetchall()]
+    finally:
+        conn.close()
+    return ReviewPage(hits, total, page, page_size)
@@ -0,0 +1,228 @@
+"""Item-item similarity from co-ownership, playtime and ratings.
+
+``build_similarity`` is an offline job (``python -m gameagg build-similarity``)
+that turns every user's library and reviews into a sparse user x game matrix,
+computes cosine similarity between game columns and stores the top-k
+neighbours of each appid in ``item_neighbors``. Triggers log every library
+and review change in ``similarity_changes``, so later runs only recompute the
+neighbour lists those changes can affect.
+
+Reading neighbours is a primary-key range scan and needs neither NumPy nor
+SciPy; only building does.
+"""
+import math
+from collections import namedtuple
+
+from .db import get_connection
+from .repository import SQL_BATCH_SIZE
+
+try:
+    import numpy as np
+    from scipy import sparse
+except ImportError:  # Only needed to build the neighbour table
+    np = sparse = None
+
+# Neighbours kept per appid
+TOP_K = 50
+# Appid rows multiplied at once; bounds the dense work per block
+BLOCK_SIZE = 1000
+# Reviews at or above this rating seed "players who loved X" recommendations
+LOVED_RATING = 4
+# Most-played library games also used as seeds
+PLAYED_SEEDS = 20
+
+BuildResult = namedtuple("BuildResult", ["users", "items", "recomputed", "neighbors", "full"])
+SimilarGame = namedtuple("SimilarGame", ["appid", "game_name", "score", "cover_url", "store_url"])
+
+
+def interaction_weight(playtime, rating):
+    """Weight of one user's relationship with a game.
+
+    Owning counts 1, growing with the log of hours played; a review scales
+    that by ``rating / 3`` so loved games count more and disliked ones less.
+    """
+    weight = 1 + math.log1p((playtime or 0) / 60)
+    if rating:
+        weight *= rating / 3
+    return weight
+
+
+def load_interactions(cursor):
+    """Return ``(user_index, appids, matrix)`` for every user's games.
+
+    ``matrix`` is a CSC user x appid matrix of interaction weights.
+    """
+    weights = {}
+    cursor.execute("""
+        SELECT user_id, appid, SUM(playtime) FROM library
+        WHERE user_id IS NOT NULL GROUP BY user_id, appid
+    """)
+    for user_id, appid, playtime in cursor:
+        weights[(user_id, appid)] = [playtime, None]
+    cursor.execute("SELECT user_id, appid, rating FROM reviews")
+    for user_id, appid, rating in cursor:
+        weights.setdefault((user_id, appid), [None, None])[1] = rating
+
+    users = {}
+    # Columns in appid order, so their relative order is stable between builds
+    items = {appid: i for i, appid in enumerate(sorted({appid for _, appid in weights}))}
+    rows, cols, data = [], [], []
+    for (user_id, appid), (playtime, rating) in weights.items():
+        rows.append(users.setdefault(user_id, len(users)))
+        cols.append(items[appid])
+        data.append(interaction_weight(playtime, rating))
+    matrix = sparse.csc_matrix((data, (rows, cols)), shape=(len(users), len(items)), dtype=np.float64)
+    return users, list(items), matrix
+
+
+def _normalize_columns(matrix):
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=0)).ravel())
+    norms[norms == 0] = 1
+    return (matrix @ sparse.diags(1 / norms)).tocsc()
+
+
+def _top_neighbors(matrix, columns, top_k):
+    """Yield ``(column, neighbour columns, scores)`` for each requested column."""
+    for start in range(0, len(columns), BLOCK_SIZE):
+        block = columns[start:start + BLOCK_SIZE]
+        scores = (matrix[:, block].T @ matrix).tocsr()
+        for row, column in enumerate(block):
+            lo, hi = scores.indptr[row], scores.indptr[row + 1]
+            neighbors = scores.indices[lo:hi]
+            values = scores.data[lo:hi]
+            keep = (neighbors != column) & (values > 0)
+            neighbors, values = neighbors[keep], values[keep]
+            if len(values) > top_k:
+                # Ties (common between games with a single owner) go to the lower
+                # column, i.e. the lower appid, so reruns pick the same neighbours
+                best = np.lexsort((neighbors, -values))[:top_k]
+                neighbors, values = neighbors[best], values[best]
+            yield column, neighbors, values
+
+
+def _cooccurring(matrix, columns):
+    """Return the columns sharing at least one user with any of ``columns``."""
+    users = np.unique(matrix[:, columns].nonzero()[0])
+    if not len(users):
+        return set()
+    return set(np.unique(matrix.tocsr()[users].nonzero()[1]).tolist())
+
+
+def _in_chunks(cursor, sql, values):
+    values = list(values)
+    found = []
+    for start in range(0, len(values), SQL_BATCH_SIZE):
+        chunk = values[start:start + SQL_BATCH_SIZE]
+        cursor.execute(sql.format(", ".join("?" * len(chunk))), chunk)
+        found.extend(row[0] for row in cursor.fetchall())
+    return found
+
+
+def build_similarity(top_k=TOP_K, full=False):
+    """Recompute neighbour lists, incrementally unless ``full`` or nothing is built yet.
+
+    An incremental run recomputes every appid that changed since the last
+    run, every appid sharing a user with one of them, and every appid that
+    currently lists one of them as a neighbour; all other rows are left as
+    they are.
+
+    Returns:
+        BuildResult: matrix size, appids recomputed and neighbour rows written
+    """
+    if sparse is None:
+        raise RuntimeError("Building item similarity needs numpy and scipy.")
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT MAX(id) FROM similarity_changes")
+        last_change = cursor.fetchone()[0]
+        cursor.execute("SELECT EXISTS (SELECT 1 FROM item_neighbors)")
+        full = full or not cursor.fetchone()[0]
+        if last_change is None and not full:
+            return BuildResult(0, 0, 0, 0, False)
+
+        users, appids, matrix = load_interactions(cursor)
+        matrix = _normalize_columns(matrix)
+        index = {appid: i for i, appid in enumerate(appids)}
+
+        if full:
+            targets = set(appids)
+        else:
+            cursor.execute("SELECT DISTINCT appid FROM similarity_changes WHERE id <= ?", (last_change,))
+            changed = {row[0] for row in cursor.fetchall()}
+            changed_columns = [index[appid] for appid in changed if appid in index]
+            targets = changed | {appids[i] for i in _cooccurring(matrix, changed_columns)}
+            targets.update(_in_chunks(cursor, "SELECT DISTINCT appid FROM item_neighbors WHERE neighbor IN ({})",
+                                      changed))
+
+        rows = []
+        columns = sorted(index[appid] for appid in targets if appid in index)
+        for column, neighbors, scores in _top_neighbors(matrix, columns, top_k):
+            appid = appids[column]
+            rows.extend((appid, appids[n], float(score)) for n, score in zip(neighbors, scores))
+
+        if full:
+            cursor.execute("DELETE FROM item_neighbors")
+        else:
+            targets = list(targets)
+            for start in range(0, len(targets), SQL_BATCH_SIZE):
+                chunk = targets[start:start + SQL_BATCH_SIZE]
+                cursor.execute(f"DELETE FROM item_neighbors WHERE appid IN ({', '.join('?' * len(chunk))})", chunk)
+        cursor.executemany("INSERT INTO item_neighbors (appid, neighbor, score) VALUES (?, ?, ?)", rows)
+        if last_change is not None:
+            cursor.execute("DELETE FROM similarity_changes WHERE id <= ?", (last_change,))
+        conn.commit()
+        return BuildResult(len(users), len(appids), len(columns), len(rows), full)
+    finally:
+        conn.close()
+
+
+def similar_games(appid, limit=10):
+    """Return the games most often owned and enjoyed alongside ``appid``."""
+    conn = get_connection()
+    try:
+        rows = conn.execute("""
+            SELECT n.neighbor, c.game_name, n.score, c.cover_url, c.store_url
+            FROM item_neighbors n LEFT JOIN catalog c ON c.appid = n.neighbor
+            WHERE n.appid = ?
+            ORDER BY n.score DESC LIMIT ?
+        """, (str(appid), limit)).fetchall()
+    finally:
+        conn.close()
+    return [SimilarGame(*row) for row in rows]
+
+
+def players_also_played(user_id, limit=10):
+    """Recommend games that players who loved the user's favourites also played.
+
+    Seeds are the user's reviews rated ``LOVED_RATING`` or higher and their
+    ``PLAYED_SEEDS`` most-played games; neighbour scores are summed across
+    seeds and games the user already owns or reviewed are left out.
+    """
+    conn = get_connection()
+    try:
+        rows = conn.execute("""
+            WITH seeds AS (
+                SELECT appid, rating / 5.0 AS weight FROM reviews
+                WHERE user_id = :user_id AND rating >= :loved
+                UNION ALL
+                SELECT appid, 1.0 FROM (
+                    SELECT appid FROM library WHERE user_id = :user_id AND playtime > 0
+                    ORDER BY playtime DESC LIMIT :played
+                )
+            ),
+            played AS (
+                SELECT appid FROM library WHERE user_id = :user_id
+                UNION SELECT appid FROM reviews WHERE user_id = :user_id
+            )
+            SELECT n.neighbor, c.game_name, SUM(n.score * s.weight) AS score, c.cover_url, c.store_url
+            FROM seeds s
+            JOIN item_neighbors n ON n.appid = s.appid
+            LEFT JOIN catalog c ON c.appid = n.neighbor
+            WHERE n.neighbor NOT IN (SELECT appid FROM played)
+            GROUP BY n.neighbor
+            ORDER BY score DESC LIMIT :limit
+        """, {"user_id": user_id, "loved": LOVED_RATING, "played": PLAYED_SEEDS, "limit": limit}).fetchall()
+    finally:
+        conn.close()
+    return [SimilarGame(*row) for row in rows]
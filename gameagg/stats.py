@@ -0,0 +1,60 @@
+"""Per-user library statistics served from trigger-maintained aggregates.
+
+``user_stats``, ``user_genre_playtime`` and ``user_rating_counts`` are kept
+up to date by SQLite triggers on ``library``, ``reviews`` and
+``catalog_genres`` (see ``migrations.create_stats_tables``), so building the
+dashboard costs a handful of primary-key lookups no matter how large the
+library is.
+"""
+from collections import namedtuple
+
+from .db import get_connection
+
+LibraryStats = namedtuple("LibraryStats", [
+    "game_count", "total_playtime", "backlog_count", "review_count", "average_rating",
+    "genres", "most_played", "ratings",
+])
+
+
+def get_library_stats(user_id, top_n=10):
+    """Return the statistics dashboard for one user.
+
+    ``genres`` is a list of ``(genre, playtime, game_count)`` by playtime,
+    ``most_played`` a list of ``(game_name, playtime)`` and ``ratings`` a
+    dict of rating -> number of reviews. Playtimes are in minutes.
+
+    A game owned on several linked Steam accounts counts once, with the
+    playtime of all those accounts added up.
+    """
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("""
+            SELECT game_count, total_playtime, backlog_count, review_count, rating_sum
+            FROM user_stats WHERE user_id = ?
+        """, (user_id,))
+        game_count, total_playtime, backlog_count, review_count, rating_sum = cursor.fetchone() or (0, 0, 0, 0, 0)
+        cursor.execute("""
+            SELECT genre, playtime, game_count FROM user_genre_playtime
+            WHERE user_id = ? AND game_count > 0
+            ORDER BY playtime DESC
+        """, (user_id,))
+        genres = cursor.fetchall()
+        cursor.execute("""
+            SELECT c.game_name, SUM(l.playtime) AS total
+            FROM library l JOIN catalog c ON c.appid = l.appid
+            WHERE l.user_id = ?
+            GROUP BY l.appid HAVING total > 0
+            ORDER BY total DESC, c.game_name LIMIT ?
+        """, (user_id, top_n))
+        most_played = cursor.fetchall()
+        cursor.execute("""
+            SELECT rating, review_count FROM user_rating_counts WHERE user_id = ? AND review_count > 0
+        """, (user_id,))
+        ratings = {rating: 0 for rating in range(1, 6)}
+        ratings.update(cursor.fetchall())
+    finally:
+        conn.close()
+    average_rating = rating_sum / review_count if review_count else None
+    return LibraryStats(game_count, total_playtime, backlog_count, review_count, average_rating,
+                        genres, most_played, ratings)
@@ -0,0 +1,312 @@
+import json
+from collections import namedtuple
+from urllib.parse import urlparse
+
+import requests
+from bs4 import BeautifulSoup
+
+from . import config
+from .breaker import guarded_get
+from .cache import METADATA_TTL, NEWS_TTL, PERSONA_TTL, SEARCH_TTL, get_cache
+from .errors import CircuitOpenError, InvalidSteamURL, SteamAPIError
+
+# Seconds to wait on any Steam request before giving up
+REQUEST_TIMEOUT = 10
+
+GameDetails = namedtuple("GameDetails", ["genres", "cover_url", "store_url", "description", "name", "error"])
+GameDetails.__new__.__defaults__ = (None,)
+
+
+def extract_user_id(steam_url):
+    """Return the Steam64 ID or vanity name from a profile URL."""
+    try:
+        parsed_url = urlparse(steam_url)
+    except ValueError as e:
+        raise InvalidSteamURL(f"Error parsing URL: {e}") from e
+    path_segments = parsed_url.path.strip('/').split('/')
+    if len(path_segments) > 1 and path_segments[0] in ['profiles', 'id']:
+        return path_segments[-1]  # This will return the vanity URL part
+    raise InvalidSteamURL("Invalid Steam URL format. Please use a valid profile or ID URL.")
+
+
+def get_steam_username(steam_id):
+    """Fetch Steam username from Steam ID, falling back to the ID itself."""
+    return get_cache().get_or_set(f"persona:{steam_id}", lambda: _fetch_steam_username(steam_id), PERSONA_TTL,
+                                  cache_if=lambda name: name != steam_id)
+
+
+def _fetch_steam_username(steam_id):
+    url = f"{config.STEAM_API_URL}/ISteamUser/GetPlayerSummaries/v2/"
+    params = {
+        "key": config.STEAM_API_KEY,
+        "steamids": steam_id
+    }
+    try:
+        response = guarded_get("steam_api", url, params, timeout=REQUEST_TIMEOUT)
+        if response.status_code == 200:
+            data = response.json()
+            players = data.get("response", {}).get("players", [])
+            if players:
+                return players[0].get("personaname", steam_id)
+    except (requests.RequestException, ValueError, CircuitOpenError):
+        pass
+    return steam_id  # Return the ID if username can't be fetched
+
+
+def resolve_vanity_url(vanity_url):
+    """Resolve a vanity profile name to a Steam64 ID.
+
+    Raises:
+        SteamAPIError: if the request fails or the name can't be resolved.
+        CircuitOpenError: if the Steam Web API is currently failing.
+    """
+    url = f"{config.STEAM_API_URL}/ISteamUser/ResolveVanityURL/v1/"
+    params = {
+        "key": config.STEAM_API_KEY,
+        "vanityurl": vanity_url
+    }
+    try:
+        response = guarded_get("steam_api", url, params, timeout=REQUEST_TIMEOUT)
+    except requests.RequestException as e:
+        raise SteamAPIError(f"Failed to resolve vanity URL: {e}") from e
+    if response.status_code != 200:
+        raise SteamAPIError(f"Failed to resolve vanity URL. Steam API returned: {response.status_code}",
+                            response.status_code)
+    data = decode_response(response, "vanity URL")
+    if data.get("response", {}).get("success") == 1:
+        return data["response"].get("steamid")
+    raise SteamAPIError("Could not resolve vanity URL. Ensure the vanity URL is correct.")
+
+
+def resolve_steam_id(steam_url):
+    """Turn a profile URL into a Steam64 ID, resolving vanity names when needed."""
+    user_id_or_vanity = extract_user_id(steam_url)
+    if user_id_or_vanity.isdigit():
+        return user_id_or_vanity
+    return resolve_vanity_url(user_id_or_vanity)
+
+
+def fetch_game_news(app_id, steam_api_key=None):
+    """Fetch recent news for a game by its Steam App ID."""
+    return get_cache().get_or_set(f"news:{app_id}", lambda: _fetch_game_news(app_id), NEWS_TTL,
+                                  cache_if=lambda news: news is not None)
+
+
+def _fetch_game_news(app_id):
+    url = f"{config.STEAM_API_URL}/ISteamNews/GetNewsForApp/v2/"
+    params = {
+        "appid": app_id,
+        "count": 3,       # Number of news articles to fetch
+        "maxlength": 300, # Max length of news content
+        "format": "json"
+    }
+    try:
+        response = guarded_get("steam_api", url, params, timeout=REQUEST_TIMEOUT)
+    except (requests.RequestException, CircuitOpenError):
+        return None
+    if response.status_code == 200:
+        data = response.json()
+        news_items = data.get("appnews", {}).get("newsitems", [])
+        return news_items if news_items else None
+    else:
+        return None
+
+
+def fetch_owned_games(steamid):
+    """Return the list of games owned by a Steam account.
+
+    Raises:
+        SteamAPIError: if Steam answers with a non-200 status or an unreadable body.
+        CircuitOpenError: if the Steam Web API is currently failing.
+    """
+    url = f"{config.STEAM_API_URL}/IPlayerService/GetOwnedGames/v1/"
+    params = {
+        "key": config.STEAM_API_KEY,
+        "steamid": steamid,
+        "include_appinfo": True,
+        "include_played_free_games": True
+    }
+    try:
+        response = guarded_get("steam_api", url, params, timeout=REQUEST_TIMEOUT)
+    except requests.RequestException as e:
+        raise SteamAPIError(f"Network error while fetching games: {e}") from e
+    if response.status_code == 200:
+        return parse_owned_games(response)
+    raise SteamAPIError(f"Failed to fetch games. Steam API returned: {response.status_code} - {response.text}",
+                        response.status_code)
+
+
+def decode_response(response, what):
+    """Return the JSON object in a ``requests`` or ``httpx`` response.
+
+    Raises:
+        SteamAPIError: if the body isn't a JSON object (an HTML error page, an empty body...)
+    """
+    try:
+        data = response.json()
+    except ValueError as e:
+        raise SteamAPIError(f"Steam returned an unreadable {what} response: {e}", response.status_code) from e
+    if not isinstance(data, dict):
+        raise SteamAPIError(f"Steam returned an unexpected {what} response.", response.status_code)
+    return data
+
+
+def parse_owned_games(response):
+    """Return the games in a GetOwnedGames response.
+
+    Raises:
+        SteamAPIError: if the body isn't a list of games with an appid, name and playtime.
+    """
+    body = decode_response(response, "games list").get("response", {})
+    games = body.get("games", []) if isinstance(body, dict) else None
+    if not isinstance(games, list) or not all(
+            isinstance(game, dict) and {"appid", "name", "playtime_forever"} <= game.keys() for game in games):
+        raise SteamAPIError("Steam returned an unexpected games list.", response.status_code)
+    return games
+
+
+def parse_app_details(appid, game_name, data):
+    """Build a GameDetails from a decoded ``appdetails`` payload.
+
+    Args:
+        appid (str): Steam app ID
+        game_name (str): Default game name to fall back on
+        data (dict): JSON body returned by the appdetails endpoint
+
+    Returns:
+        GameDetails: parsed details, with defaults for anything missing
+    """
+    name = game_name
+    genres = "Unknown"
+    cover_url = config.PLACEHOLDER_COVER_URL
+    store_url = config.STORE_URL_TEMPLATE.format(appid=appid)
+    description = "No description available."
+
+    # Check if we got valid data
+    if data and str(appid) in data and data[str(appid)].get('success', False):
+        game_data = data[str(appid)]['data']
+
+        # Extract game details with fallbacks
+        name = game_data.get('name', game_name)
+
+        # Get genres with error handling
+        genre_list = game_data.get('genres', [])
+        if genre_list and isinstance(genre_list, list):
+            genres = ", ".join([genre.get('description', '') for genre in genre_list if genre.get('description')])
+
+        # Get header image with validation
+        if 'header_image' in game_data and game_data['header_image'].startswith('http'):
+            cover_url = game_data['header_image']
+
+        # Get description with HTML cleanup
+        if 'short_description' in game_data:
+            description = BeautifulSoup(game_data['short_description'], 'html.parser').get_text()
+            # Limit description length
+            if len(description) > 300:
+                description = description[:297] + "..."
+
+    return GameDetails(genres, cover_url, store_url, description, name)
+
+
+def fetch_game_details(appid, game_name):
+    """
+    Fetch game details from Steam API with improved error handling and language settings.
+
+    Never raises; on failure the returned details carry default values and
+    a human readable ``error``.
+
+    Args:
+        appid (str): Steam app ID
+        game_name (str): Default game name to fall back on
+
+    Returns:
+        GameDetails: (genres, cover_url, store_url, description, name, error)
+    """
+    return get_cache().get_or_set(f"appdetails:{appid}", lambda: _fetch_game_details(appid, game_name),
+                                  METADATA_TTL, cache_if=lambda details: details.error is None)
+
+
+def fetch_app_details_payload(appid):
+    """Fetch the decoded appdetails payload for one app, bypassing the cache.
+
+    Raises:
+        SteamAPIError: if the store answers with a non-200 status.
+        CircuitOpenError: if the Steam Store is currently failing.
+        requests.RequestException, ValueError: on network or decoding errors.
+    """
+    # Set language preference to English and include additional metadata
+    params = {
+        'appids': appid,
+        'l': 'english',  # Force English language
+        'cc': 'us'       # Set region to US for consistent results
+    }
+    url = f"{config.STEAM_STORE_API_URL}/api/appdetails"
+    response = guarded_get("steam_store", url, params, timeout=REQUEST_TIMEOUT)
+    if response.status_code != 200:
+        raise SteamAPIError(f"Steam Store returned: {response.status_code}", response.status_code)
+    return response.json()
+
+
+def _fetch_game_details(appid, game_name):
+    try:
+        return parse_app_details(appid, game_name, fetch_app_details_payload(appid))
+    except SteamAPIError:
+        error = f"Unable to fetch details for {game_name}. Using basic information."
+    except requests.RequestException as e:
+        error = f"Network error while fetching game details: {str(e)}"
+    except (KeyError, ValueError, json.JSONDecodeError) as e:
+        error = f"Error processing game data: {str(e)}"
+    except CircuitOpenError as e:
+        return _saved_details(appid, game_name, str(e))
+
+    return parse_app_details(appid, game_name, None)._replace(error=error)
+
+
+def search_game_by_name_steam(name):
+    """Search for a game by name using Steam Store search.
+
+    While the Steam Store is failing, matching games from the local
+    catalog are returned instead.
+
+    Raises:
+        SteamAPIError: if the store search page can't be fetched.
+    """
+    try:
+        return get_cache().get_or_set(f"search:{name.strip().lower()}", lambda: _search_store(name), SEARCH_TTL)
+    except CircuitOpenError:
+        return _saved_search(name)
+
+
+def _search_store(name):
+    search_url = f"{config.STEAM_STORE_API_URL}/search/"
+    try:
+        response = guarded_get("steam_store", search_url, {"term": name}, timeout=REQUEST_TIMEOUT)
+    except requests.RequestException as e:
+        raise SteamAPIError(f"Failed to search for games: {e}") from e
+    if response.status_code != 200:
+        raise SteamAPIError(f"Failed to search for games. Steam Store returned: {response.status_code}",
+                            response.status_code)
+    soup = BeautifulSoup(response.text, "html.parser")
+    results = []
+    for game in soup.find_all("a", class_="search_result_row"):
+        appid = game.get("data-ds-appid")
+        if appid:
+            title = game.find("span", class_="title").text
+            image = game.find("img").get("src", "")
+            results.append({"appid": appid, "name": title, "image": image})
+    return results
+
+
+# Local fallbacks while Steam's breakers are open. repository imports this
+# module, so it is imported lazily here.
+def _saved_details(appid, game_name, error):
+    from .repository import get_catalog_details
+    saved = get_catalog_details([appid]).get(appid)
+    if saved is None:
+        return parse_app_details(appid, game_name, None)._replace(error=error)
+    return saved._replace(error=f"{error} Showing saved details.")
+
+
+def _saved_search(name):
+    from .repository import search_catalog
+    return search_catalog(name)
@@ -0,0 +1,284 @@
+"""Streaming export and import of one user's data.
+
+A user's library, reviews, wishlist and linked accounts are written to one
+file per table in a directory, as Parquet, Arrow IPC or JSON Lines. Rows are
+read and written ``chunk_size`` at a time, so memory stays bounded however
+large the dump. Library and review rows carry their catalog metadata, so a
+dump can be loaded into an empty database.
+
+Parquet and Arrow need ``pyarrow``; without it only JSON Lines is available.
+"""
+import json
+import os
+from collections import namedtuple
+
+from .db import get_connection
+from .migrations import split_genres
+from .repository import SQL_BATCH_SIZE
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:  # pyarrow is optional; JSON Lines still works
+    pa = None
+
+DEFAULT_CHUNK_SIZE = 50_000
+
+FORMAT_EXTENSIONS = {"parquet": ".parquet", "arrow": ".arrow", "jsonl": ".jsonl"}
+
+Table = namedtuple("Table", ["name", "columns", "query"])
+
+TABLES = [
+    Table("library", [
+        ("appid", "string"), ("steam_user_id", "string"), ("playtime", "int64"), ("added_on", "string"),
+        ("game_name", "string"), ("genres", "string"), ("cover_url", "string"), ("store_url", "string"),
+    ], """
+        SELECT l.appid, l.steam_user_id, l.playtime, l.added_on,
+               c.game_name, c.genres, c.cover_url, c.store_url
+        FROM library l JOIN catalog c ON c.appid = l.appid
+        WHERE l.user_id = ?
+    """),
+    Table("reviews", [
+        ("appid", "string"), ("game_name", "string"), ("review_text", "string"),
+        ("rating", "int64"), ("created_at", "string"),
+    ], """
+        SELECT r.appid, c.game_name, r.review_text, r.rating, r.created_at
+        FROM reviews r LEFT JOIN catalog c ON c.appid = r.appid
+        WHERE r.user_id = ?
+    """),
+    Table("wishlist", [
+        ("steam_game_id", "string"), ("game_name", "string"), ("cover_url", "string"),
+        ("store_url", "string"), ("added_on", "string"),
+    ], """
+        SELECT steam_game_id, game_name, cover_url, store_url, added_on
+        FROM wishlist WHERE user_id = ?
+    """),
+    Table("accounts", [
+        ("steam_user_id", "string"),
+    ], """
+        SELECT steam_user_id FROM accounts WHERE user_id = ?
+    """),
+]
+
+TransferResult = namedtuple("TransferResult", ["format", "rows"])
+
+# Same as repository.REVIEW_UPSERT_SQL, but keeps the exported review date
+REVIEW_IMPORT_SQL = """
+    INSERT INTO reviews (user_id, appid, review_text, rating, created_at)
+    VALUES (?, ?, ?, ?, COALESCE(?, CURRENT_TIMESTAMP))
+    ON CONFLICT(user_id, appid) DO UPDATE SET
+        review_text = excluded.review_text,
+        rating = excluded.rating,
+        created_at = excluded.created_at
+"""
+
+# Fills the gaps of existing rows (e.g. stubs from the wishlist or price
+# paths) without overwriting anything; complete rows aren't touched at all
+CATALOG_MERGE_SQL = """
+    INSERT INTO catalog (appid, game_name, genres, cover_url, store_url) VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT(appid) DO UPDATE SET
+        game_name = COALESCE(catalog.game_name, excluded.game_name),
+        genres = COALESCE(catalog.genres, excluded.genres),
+        cover_url = COALESCE(catalog.cover_url, excluded.cover_url),
+        store_url = COALESCE(catalog.store_url, excluded.store_url)
+    WHERE catalog.game_name IS NULL OR catalog.genres IS NULL
+       OR catalog.cover_url IS NULL OR catalog.store_url IS NULL
+"""
+
+
+def default_format():
+    return "parquet" if pa is not None else "jsonl"
+
+
+def _require_pyarrow(fmt):
+    if fmt != "jsonl" and pa is None:
+        raise RuntimeError(f"The {fmt} format needs pyarrow; install it or use jsonl.")
+
+
+def _arrow_schema(table):
+    return pa.schema([(name, getattr(pa, kind)()) for name, kind in table.columns])
+
+
+class _ChunkWriter:
+    """Append lists of row tuples to one table file in the chosen format."""
+
+    def __init__(self, path, table, fmt):
+        self.table = table
+        self.fmt = fmt
+        self.names = [name for name, _ in table.columns]
+        if fmt == "jsonl":
+            self._file = open(path, "w", encoding="utf-8")
+        else:
+            self.schema = _arrow_schema(table)
+            if fmt == "parquet":
+                self._writer = pa.parquet.ParquetWriter(path, self.schema)
+            else:
+                self._sink = pa.OSFile(path, "wb")
+                self._writer = pa.ipc.new_file(self._sink, self.schema)
+
+    def write(self, rows):
+        if self.fmt == "jsonl":
+            for row in rows:
+                self._file.write(json.dumps(dict(zip(self.names, row)), ensure_ascii=False) + "\n")
+            return
+        columns = list(zip(*rows)) if rows else [[] for _ in self.names]
+        batch = pa.record_batch([pa.array(col, type=field.type) for col, field in zip(columns, self.schema)],
+                                schema=self.schema)
+        self._writer.write_batch(batch)
+
+    def close(self):
+        if self.fmt == "jsonl":
+            self._file.close()
+            return
+        self._writer.close()
+        if self.fmt == "arrow":
+            self._sink.close()
+
+
+def _read_chunks(path, table, fmt, chunk_size):
+    """Yield lists of row tuples (in ``table.columns`` order) from one table file."""
+    names = [name for name, _ in table.columns]
+    if fmt == "jsonl":
+        rows = []
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    rows.append(tuple(record.get(name) for name in names))
+                if len(rows) >= chunk_size:
+                    yield rows
+                    rows = []
+        if rows:
+            yield rows
+        return
+    if fmt == "parquet":
+        batches = pa.parquet.ParquetFile(path).iter_batches(batch_size=chunk_size, columns=names)
+    else:
+        reader = pa.ipc.open_file(pa.memory_map(path, "r"))
+        batches = (reader.get_batch(i) for i in range(reader.num_record_batches))
+    for batch in batches:
+        columns = [batch.column(name).to_pylist() for name in names]
+        yield list(zip(*columns))
+
+
+def export_user_data(user_id, out_dir, fmt=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Write a user's library, reviews, wishlist and accounts to ``out_dir``.
+
+    Returns:
+        TransferResult: the format used and rows written per table
+    """
+    fmt = fmt or default_format()
+    _require_pyarrow(fmt)
+    os.makedirs(out_dir, exist_ok=True)
+    rows_written = {}
+    conn = get_connection()
+    try:
+        for table in TABLES:
+            writer = _ChunkWriter(os.path.join(out_dir, table.name + FORMAT_EXTENSIONS[fmt]), table, fmt)
+            count = 0
+            try:
+                cursor = conn.execute(table.query, (user_id,))
+                while True:
+                    rows = cursor.fetchmany(chunk_size)
+                    if not rows:
+                        break
+                    writer.write(rows)
+                    count += len(rows)
+            finally:
+                writer.close()
+            rows_written[table.name] = count
+    finally:
+        conn.close()
+    return TransferResult(fmt, rows_written)
+
+
+def detect_format(in_dir):
+    for fmt, extension in FORMAT_EXTENSIONS.items():
+        if os.path.exists(os.path.join(in_dir, "library" + extension)):
+            return fmt
+    raise FileNotFoundError(f"No exported library file found in {in_dir}")
+
+
+def _appids_without_genres(cursor, appids):
+    """Return the subset of ``appids`` with no catalog row or a row without genres."""
+    appids = list(set(appids))
+    known = set()
+    for start in range(0, len(appids), SQL_BATCH_SIZE):
+        chunk = appids[start:start + SQL_BATCH_SIZE]
+        cursor.execute(f"""
+            SELECT appid FROM catalog WHERE genres IS NOT NULL AND appid IN ({', '.join('?' * len(chunk))})
+        """, chunk)
+        known.update(row[0] for row in cursor.fetchall())
+    return set(appids) - known
+
+
+def _load_library(cursor, user_id, rows):
+    catalog_rows = {row[0]: row for row in rows}
+    missing_genres = _appids_without_genres(cursor, catalog_rows)
+    cursor.executemany(CATALOG_MERGE_SQL, [(appid, name, genres, cover, store)
+                                           for appid, _, _, _, name, genres, cover, store in catalog_rows.values()])
+    cursor.executemany("INSERT OR IGNORE INTO catalog_genres (appid, genre) VALUES (?, ?)",
+                       [(appid, genre) for appid in missing_genres for genre in split_genres(catalog_rows[appid][5])])
+    cursor.executemany("""
+        INSERT INTO library (user_id, steam_user_id, appid, playtime, added_on) VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT(user_id, steam_user_id, appid) DO UPDATE SET
+            playtime = MAX(COALESCE(playtime, 0), COALESCE(excluded.playtime, 0))
+    """, [(user_id, steam_user_id, appid, playtime, added_on)
+          for appid, steam_user_id, playtime, added_on, *_ in rows])
+
+
+def _load_reviews(cursor, user_id, rows):
+    cursor.executemany(CATALOG_MERGE_SQL, [(appid, name, None, None, None) for appid, name, *_ in rows])
+    cursor.executemany(REVIEW_IMPORT_SQL, [(user_id, appid, text, rating, created_at) for appid, _, text, rating, created_at in rows])
+
+
+def _load_wishlist(cursor, user_id, rows):
+    cursor.executemany("""
+        INSERT INTO wishlist (user_id, steam_game_id, game_name, cover_url, store_url, added_on)
+        SELECT ?, ?, ?, ?, ?, COALESCE(?, CURRENT_TIMESTAMP)
+        WHERE NOT EXISTS (SELECT 1 FROM wishlist WHERE user_id = ? AND steam_game_id = ?)
+    """, [(user_id, appid, name, cover, store, added_on, user_id, appid)
+          for appid, name, cover, store, added_on in rows])
+
+
+def _load_accounts(cursor, user_id, rows):
+    cursor.executemany("INSERT OR IGNORE INTO accounts (steam_user_id, user_id) VALUES (?, ?)",
+                       [(steam_user_id, user_id) for steam_user_id, in rows])
+
+
+LOADERS = {"library": _load_library, "reviews": _load_reviews, "wishlist": _load_wishlist, "accounts": _load_accounts}
+
+
+def import_user_data(user_id, in_dir, fmt=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Load an export produced by ``export_user_data`` into ``user_id``'s data.
+
+    Everything is bulk-loaded with ``executemany`` in a single transaction;
+    rows already present are merged (higher playtime wins, reviews are
+    replaced, wishlist and account entries are not duplicated).
+
+    Returns:
+        TransferResult: the format read and rows loaded per table
+    """
+    fmt = fmt or detect_format(in_dir)
+    _require_pyarrow(fmt)
+    rows_loaded = {}
+    conn = get_connection()
+    try:
+        cursor = conn.cursor()
+        for table in TABLES:
+            path = os.path.join(in_dir, table.name + FORMAT_EXTENSIONS[fmt])
+            if not os.path.exists(path):
+                continue
+            count = 0
+            for rows in _read_chunks(path, table, fmt, chunk_size):
+                LOADERS[table.name](cursor, user_id, rows)
+                count += len(rows)
+            rows_loaded[table.name] = count
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+    return TransferResult(fmt, rows_loaded)
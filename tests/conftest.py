@@ -0,0 +1,72 @@
+import http.server
+import threading
+
+import pytest
+
+from gameagg import breaker, cache, config
+from gameagg.db import init_db
+
+
+@pytest.fixture
+def temp_db(tmp_path, monkeypatch):
+    """Point the package at a fresh, initialised database file."""
+    path = str(tmp_path / "gameagg.db")
+    monkeypatch.setattr(config, "DB_FILE", path)
+    init_db()
+    return path
+
+
+@pytest.fixture(autouse=True)
+def isolated_state(monkeypatch):
+    """Give every test its own breakers and an empty in-process cache."""
+    monkeypatch.setattr(breaker, "_breakers", {})
+    cache.set_cache(cache.MemoryCache())
+    yield
+    cache.set_cache(None)
+
+
+class StandInServer:
+    """Local HTTP server whose responses a test can change while it runs.
+
+    ``handler(path)`` returns ``(status, body bytes)`` and may sleep to
+    simulate a slow upstream.
+    """
+
+    def __init__(self):
+        stand_in = self
+        self.handler = lambda path: (200, b"{}")
+        self.requests = 0
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                stand_in.requests += 1
+                status, body = stand_in.handler(self.path)
+                try:
+                    self.send_response(status)
+                    self.send_header("Content-Type", "application/json")
+                    self.end_headers()
+                    self.wfile.write(body)
+                except ConnectionError:
+                    pass  # The client timed out and hung up
+
+            def log_message(self, *args):
+                pass
+
+        self._server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self._server.server_port}"
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+@pytest.fixture
+def stand_in(monkeypatch):
+    """A stand-in for the Steam Web API and Store, wired in through config."""
+    server = StandInServer()
+    monkeypatch.setattr(config, "STEAM_API_URL", server.url)
+    monkeypatch.setattr(config, "STEAM_STORE_API_URL", server.url)
+    yield server
+    server.close()
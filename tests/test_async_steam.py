@@ -0,0 +1,49 @@
+import json
+
+import pytest
+
+from gameagg import steam
+from gameagg.async_steam import refresh_all_accounts_sync
+from gameagg.auth import register_user
+from gameagg.db import get_connection
+from gameagg.errors import SteamAPIError
+
+
+def _link(user_id, *steam_ids):
+    conn = get_connection()
+    try:
+        conn.executemany("INSERT INTO accounts (steam_user_id, user_id) VALUES (?, ?)",
+                         [(steam_id, user_id) for steam_id in steam_ids])
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def test_unreadable_library_fails_only_its_account(stand_in, temp_db):
+    owned = {"response": {"games": [{"appid": 620, "name": "Portal 2", "playtime_forever": 30}]}}
+
+    def handler(path):
+        if "GetOwnedGames" not in path:
+            return 200, b"{}"
+        if "steamid=111" in path:
+            return 200, json.dumps(owned).encode()
+        if "steamid=222" in path:
+            return 200, b"<html>Service Unavailable</html>"
+        return 200, b'{"response": {"games": [{"appid": 10}]}}'
+
+    stand_in.handler = handler
+    user_id = register_user("player", "secret")
+    _link(user_id, "111", "222", "333")
+
+    summary = {refresh.steam_user_id: refresh for refresh in refresh_all_accounts_sync(user_id)}
+    assert summary["111"].error is None
+    assert summary["111"].result.added == 1
+    assert "unreadable games list" in summary["222"].error
+    assert "unexpected games list" in summary["333"].error
+
+
+@pytest.mark.parametrize("body", [b"", b"<html></html>", b"[]"])
+def test_unreadable_vanity_response_is_a_steam_error(stand_in, body):
+    stand_in.handler = lambda path: (200, body)
+    with pytest.raises(SteamAPIError):
+        steam.resolve_vanity_url("someone")
@@ -0,0 +1,207 @@
+"""Fault injection: Steam calls against a local failing or slow stand-in server."""
+import json
+import time
+
+import pytest
+
+from gameagg import breaker, steam
+from gameagg.auth import register_user
+from gameagg.breaker import CLOSED, HALF_OPEN, MIN_CALLS, OPEN, CircuitBreaker, get_breaker
+from gameagg.db import get_connection
+from gameagg.errors import CircuitOpenError, SteamAPIError
+from gameagg.importer import import_steam_library, upsert_catalog
+from gameagg.repository import get_catalog_details
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_breaker_opens_at_failure_rate_and_probes_after_reset():
+    clock = FakeClock()
+    cb = CircuitBreaker("test", window=10, min_calls=4, failure_rate=0.5, reset_timeout=30, clock=clock)
+    for success in (True, False, True):
+        cb.check()
+        cb.record(success, 0.01)
+    assert cb.state == CLOSED  # Too few calls to judge
+    cb.check()
+    cb.record(False, 0.01)
+    assert cb.state == OPEN  # 2 of 4 failed
+
+    with pytest.raises(CircuitOpenError) as excinfo:
+        cb.check()
+    assert excinfo.value.retry_in == 30
+    assert cb.metrics()["rejected"] == 1
+
+    clock.now = 29.9
+    assert cb.state == OPEN
+    clock.now = 30
+    assert cb.state == HALF_OPEN
+    cb.check()  # The single probe
+    with pytest.raises(CircuitOpenError):
+        cb.check()  # Everyone else waits for its outcome
+    cb.record(False, 0.01)
+    assert cb.state == OPEN
+
+    clock.now = 60
+    cb.check()
+    cb.record(True, 0.01)
+    assert cb.state == CLOSED
+    assert cb.metrics()["times_opened"] == 2
+
+
+def test_slow_successes_count_as_failures():
+    cb = CircuitBreaker("test", slow_call_seconds=1, min_calls=2, clock=FakeClock())
+    cb.record(True, 2.0)
+    cb.record(True, 2.0)
+    assert cb.state == OPEN
+    assert cb.metrics()["slow_calls"] == 2
+    assert cb.metrics()["failures"] == 0
+
+
+def test_guard_records_exceptions_as_failures():
+    cb = CircuitBreaker("test", min_calls=1, clock=FakeClock())
+    with pytest.raises(ValueError):
+        with cb.guard():
+            raise ValueError("boom")
+    assert cb.state == OPEN
+
+
+def test_outcomes_from_before_a_state_change_are_ignored():
+    clock = FakeClock()
+    cb = CircuitBreaker("test", min_calls=2, reset_timeout=30, clock=clock)
+    slow_call = cb.check()  # Admitted while closed, still in flight
+    for _ in range(2):
+        cb.record(False, 0.01, cb.check())
+    assert cb.state == OPEN
+
+    clock.now = 30
+    probe = cb.check()
+    cb.record(True, 0.01, slow_call)
+    assert cb.state == HALF_OPEN  # Only the probe decides
+    with pytest.raises(CircuitOpenError):
+        cb.check()
+    cb.record(True, 0.01, probe)
+    assert cb.state == CLOSED
+    cb.record(False, 60, slow_call)
+    assert cb.metrics()["recent_failure_rate"] == 0.0
+    assert cb.metrics()["slow_calls"] == 1
+
+
+def test_unexpected_exception_in_a_probe_releases_it(monkeypatch):
+    api = get_breaker("steam_api")
+    for _ in range(MIN_CALLS):
+        api.record(False, 0.01)
+    assert api.state == OPEN
+    monkeypatch.setattr(api, "reset_timeout", 0)
+
+    def broken_get(*args, **kwargs):
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(breaker.requests, "get", broken_get)
+    with pytest.raises(KeyboardInterrupt):
+        breaker.guarded_get("steam_api", "http://localhost/", timeout=1)
+    assert api.metrics()["times_opened"] == 2
+    assert api.allow()  # Another probe may go after the reset timeout
+
+
+def test_store_errors_open_the_breaker_and_search_falls_back_to_catalog(stand_in, temp_db):
+    conn = get_connection()
+    upsert_catalog(conn.cursor(), "620", steam.parse_app_details("620", "Portal 2", None))
+    conn.commit()
+    conn.close()
+
+    stand_in.handler = lambda path: (500, b"")
+    for attempt in range(MIN_CALLS):
+        assert get_breaker("steam_store").state == CLOSED
+        with pytest.raises(SteamAPIError):
+            steam.search_game_by_name_steam(f"portal {attempt}")
+    assert get_breaker("steam_store").state == OPEN
+    assert stand_in.requests == MIN_CALLS
+
+    # Open: no request is made and search answers from the local catalog
+    started = time.perf_counter()
+    results = steam.search_game_by_name_steam("portal")
+    assert time.perf_counter() - started < 0.5
+    assert results == [{"appid": "620", "name": "Portal 2", "image": results[0]["image"]}]
+    assert stand_in.requests == MIN_CALLS
+
+    # Details fall back to the saved catalog row and are flagged, so they aren't cached
+    details = steam.fetch_game_details("620", "Portal 2")
+    assert details.name == "Portal 2"
+    assert "unavailable" in details.error
+    assert stand_in.requests == MIN_CALLS
+
+
+def test_half_open_probe_closes_the_breaker_on_recovery(stand_in, temp_db, monkeypatch):
+    stand_in.handler = lambda path: (503, b"")
+    for attempt in range(MIN_CALLS):
+        with pytest.raises(SteamAPIError):
+            steam.search_game_by_name_steam(f"game {attempt}")
+    store = get_breaker("steam_store")
+    assert store.state == OPEN
+
+    stand_in.handler = lambda path: (200, b"<html></html>")
+    monkeypatch.setattr(store, "reset_timeout", 0)
+    assert store.state == HALF_OPEN
+    assert steam.search_game_by_name_steam("recovered") == []
+    assert store.state == CLOSED
+    assert stand_in.requests == MIN_CALLS + 1
+
+
+def test_slow_upstream_opens_the_breaker_and_later_calls_fail_fast(stand_in, monkeypatch):
+    def slow(path):
+        time.sleep(0.3)
+        return 200, b'{"response": {"players": [{"personaname": "slowpoke"}]}}'
+
+    stand_in.handler = slow
+    api = get_breaker("steam_api")
+    monkeypatch.setattr(api, "slow_call_seconds", 0.1)
+    for attempt in range(MIN_CALLS):
+        assert steam.get_steam_username(f"7656{attempt}") == "slowpoke"
+    assert api.state == OPEN
+    assert api.metrics()["slow_calls"] == MIN_CALLS
+
+    started = time.perf_counter()
+    assert steam.get_steam_username("99999") == "99999"  # Falls back to the ID
+    assert time.perf_counter() - started < 0.1
+    assert stand_in.requests == MIN_CALLS
+
+
+def test_timeouts_count_as_failures(stand_in, monkeypatch):
+    def hang(path):
+        time.sleep(0.5)
+        return 200, b"{}"
+
+    stand_in.handler = hang
+    monkeypatch.setattr(steam, "REQUEST_TIMEOUT", 0.05)
+    for attempt in range(MIN_CALLS):
+        assert steam.fetch_game_news(attempt) is None
+    assert get_breaker("steam_api").state == OPEN
+    assert breaker.breaker_metrics()["steam_api"]["failures"] == MIN_CALLS
+    assert breaker.open_upstreams() == ["Steam Web API"]
+
+
+def test_import_during_store_outage_leaves_stubs_and_one_warning(stand_in, temp_db):
+    owned = {"response": {"games": [{"appid": 900 + i, "name": f"Game {i}", "playtime_forever": i}
+                                    for i in range(12)]}}
+    stand_in.handler = lambda path: (200, json.dumps(owned).encode()) if "GetOwnedGames" in path else (500, b"")
+    user_id = register_user("player", "secret")
+
+    result = import_steam_library(user_id, "76561")
+    assert result.added == 12
+    assert len(result.warnings) == 1
+    assert "12 games" in result.warnings[0]
+    assert get_breaker("steam_store").metrics()["rejected"] == 12 - MIN_CALLS
+
+    conn = get_connection()
+    try:
+        assert conn.execute("SELECT COUNT(*), COUNT(genres), COUNT(cover_url) FROM catalog").fetchone() == (12, 0, 0)
+        assert conn.execute("SELECT COUNT(*) FROM catalog_genres").fetchone() == (0,)
+    finally:
+        conn.close()
+    assert get_catalog_details([str(900 + i) for i in range(12)]) == {}
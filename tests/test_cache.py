@@ -0,0 +1,33 @@
+import sqlite3
+
+from gameagg import cache
+from gameagg.cache import SQLiteCache
+
+
+def _rows(path):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_sqlite_tier_purges_expired_rows_as_it_writes(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache, "PURGE_EVERY", 10)
+    path = str(tmp_path / "cache.db")
+    tier = SQLiteCache(path)
+    for i in range(9):
+        tier.set(f"old:{i}", i, ttl=-1)  # Already expired
+    tier.set("live", "value", ttl=3600)
+    assert _rows(path) == 1
+    assert tier.get("live") == "value"
+
+
+def test_sqlite_tier_failures_are_misses(tmp_path):
+    tier = SQLiteCache(str(tmp_path / "cache.db"))
+    tier.set("key", "value")
+    tier._connection().close()  # Any further statement on it raises sqlite3.ProgrammingError
+    assert tier.get("key") is None
+    tier.set("key", "other")
+    tier.delete("key")
+    assert tier.purge_expired() == 0
@@ -0,0 +1,61 @@
+import io
+import os
+import time
+
+from gameagg import config, images
+
+
+def _cache_size():
+    return sum(os.path.getsize(os.path.join(root, name))
+               for root, _, files in os.walk(config.IMAGE_CACHE_DIR) for name in files)
+
+
+def test_running_total_keeps_cache_under_cap_without_walking_every_write(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "IMAGE_CACHE_DIR", str(tmp_path / "images"))
+    monkeypatch.setattr(config, "IMAGE_CACHE_MAX_BYTES", 100_000)
+    monkeypatch.setattr(images, "_cached_bytes", None)
+    monkeypatch.setattr(images, "make_thumbnail", lambda data: data)
+    scans = []
+    real_prune = images.prune_cache
+    monkeypatch.setattr(images, "prune_cache", lambda: scans.append(1) or real_prune())
+
+    for i in range(300):
+        images.store_thumbnail(f"https://cdn.example/{i}.jpg", b"x" * 500)
+        assert _cache_size() <= config.IMAGE_CACHE_MAX_BYTES
+
+    # 150 KB into a 100 KB cache: an initial scan, then one per 10 KB of headroom rather than one per write
+    assert len(scans) <= 7
+    assert images.read_cached("https://cdn.example/299.jpg") == b"x" * 500
+    assert images.read_cached("https://cdn.example/0.jpg") is None
+
+
+def test_missing_cover_gets_a_placeholder_without_pillow(monkeypatch):
+    from PIL import Image
+
+    monkeypatch.setattr(images, "Image", None)
+    images.placeholder_thumbnail.cache_clear()
+    try:
+        data = images.get_thumbnail(None)
+    finally:
+        images.placeholder_thumbnail.cache_clear()
+    with Image.open(io.BytesIO(data)) as image:
+        assert image.format == "PNG"
+        assert image.size == (images.THUMBNAIL_WIDTH, 70)
+
+
+def test_reads_only_touch_files_not_used_for_a_day(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "IMAGE_CACHE_DIR", str(tmp_path / "images"))
+    monkeypatch.setattr(images, "make_thumbnail", lambda data: data)
+    url = "https://cdn.example/cover.jpg"
+    images.store_thumbnail(url, b"x" * 500, prune=False)
+    path = images.cache_path(url)
+
+    recent = time.time() - 3600
+    os.utime(path, (recent, recent))
+    assert images.read_cached(url) == b"x" * 500
+    assert os.stat(path).st_mtime == recent
+
+    stale = time.time() - images.TOUCH_INTERVAL - 1
+    os.utime(path, (stale, stale))
+    images.read_cached(url)
+    assert os.stat(path).st_mtime > recent
@@ -0,0 +1,89 @@
+import hashlib
+import threading
+
+import pytest
+
+from gameagg import passwords
+from gameagg.auth import login_user
+from gameagg.db import get_connection
+from gameagg.passwords import ScryptHasher
+
+
+@pytest.fixture(autouse=True)
+def default_hasher(monkeypatch):
+    monkeypatch.setattr(passwords, "_hasher", None)
+
+
+def _add_user(username, stored):
+    conn = get_connection()
+    try:
+        cursor = conn.execute("INSERT INTO users (username, password) VALUES (?, ?)", (username, stored))
+        conn.commit()
+        return cursor.lastrowid
+    finally:
+        conn.close()
+
+
+def _stored(user_id):
+    conn = get_connection()
+    try:
+        return conn.execute("SELECT password FROM users WHERE user_id = ?", (user_id,)).fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_legacy_sha256_is_upgraded_on_successful_login(temp_db):
+    user_id = _add_user("player", hashlib.sha256(b"secret").hexdigest())
+    assert login_user("player", "secret") == (user_id,)
+    stored = _stored(user_id)
+    assert stored.startswith("scrypt$")
+    assert passwords.verify_password("secret", stored) == (True, False)
+    assert login_user("player", "secret") == (user_id,)
+    assert _stored(user_id) == stored  # Already current; no second rehash
+
+
+def test_scrypt_is_upgraded_to_argon2_when_that_is_the_current_hasher(temp_db):
+    pytest.importorskip("argon2")
+    user_id = _add_user("player", ScryptHasher().hash("secret"))
+    passwords.set_hasher(passwords.Argon2Hasher(time_cost=1, memory_cost=1024))
+    assert login_user("player", "secret") == (user_id,)
+    assert _stored(user_id).startswith("$argon2id$")
+
+
+def test_wrong_password_leaves_the_stored_hash_alone(temp_db):
+    legacy = hashlib.sha256(b"secret").hexdigest()
+    user_id = _add_user("player", legacy)
+    assert login_user("player", "wrong") is None
+    assert _stored(user_id) == legacy
+
+
+def test_unknown_user_still_spends_a_verification(temp_db, monkeypatch):
+    burned = []
+    monkeypatch.setattr("gameagg.auth.burn_verification", burned.append)
+    assert login_user("nobody", "secret") is None
+    assert burned == ["secret"]
+
+
+def test_concurrent_first_logins_share_one_pool(monkeypatch):
+    created = []
+
+    class CountingPool(passwords.ThreadPoolExecutor):
+        def __init__(self, *args, **kwargs):
+            created.append(self)
+            super().__init__(*args, **kwargs)
+
+    monkeypatch.setattr(passwords, "ThreadPoolExecutor", CountingPool)
+    monkeypatch.setattr(passwords, "_pool", None)
+    barrier = threading.Barrier(8)
+
+    def login():
+        barrier.wait()
+        passwords._run(len, "x")
+
+    threads = [threading.Thread(target=login) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(created) == 1
+    created[0].shutdown()
@@ -0,0 +1,95 @@
+import json
+from types import SimpleNamespace
+from urllib.parse import parse_qs, urlparse
+
+from gameagg import config, prices
+from gameagg.auth import register_user
+from gameagg.prices import NO_PRICE, PriceOverview, poll_wishlist_prices, price_history
+from gameagg.repository import add_to_wishlist, fetch_wishlist
+
+
+def _entry(final, initial=None, discount=0):
+    if final is None:
+        return {"success": True, "data": []}  # What the store sends for apps without a price
+    return {"success": True, "data": {"price_overview": {
+        "currency": "USD", "initial": initial or final, "final": final, "discount_percent": discount}}}
+
+
+class Store:
+    """Stand-in handler answering price_overview batches from ``self.entries``."""
+
+    def __init__(self, entries):
+        self.entries = entries
+        self.batches = []
+        self.countries = []
+        self.failing = set()
+
+    def __call__(self, path):
+        query = parse_qs(urlparse(path).query)
+        appids = query["appids"][0].split(",")
+        self.batches.append(appids)
+        self.countries.append(query["cc"][0])
+        if self.failing & set(appids):
+            return 500, b""
+        return 200, json.dumps({appid: self.entries.get(appid, {"success": False}) for appid in appids}).encode()
+
+
+def _wishlist(user_id, *appids):
+    for appid in appids:
+        add_to_wishlist(user_id, appid, f"Game {appid}", None, None)
+
+
+def test_batches_failures_and_changed_only_history(stand_in, temp_db, monkeypatch):
+    clock = SimpleNamespace(now=1000)
+    monkeypatch.setattr(prices, "time", SimpleNamespace(time=lambda: clock.now))
+    monkeypatch.setattr(config, "STORE_COUNTRY", "de")
+    first, second = register_user("first", "secret"), register_user("second", "secret")
+    _wishlist(first, "10", "20", "30")
+    _wishlist(second, "20", "40", "50")
+    store = Store({appid: _entry(1999) for appid in ("10", "20", "30", "40", "50")})
+    stand_in.handler = store
+
+    result = poll_wishlist_prices(batch_size=2)
+    assert result == (5, 3, 5, 0)
+    assert sorted(appid for batch in store.batches for appid in batch) == ["10", "20", "30", "40", "50"]
+    assert store.countries == ["de"] * 3
+
+    # Unchanged prices add no rows; a failed batch only loses its own appids
+    clock.now = 2000
+    store.entries["10"] = _entry(999, 1999, 50)
+    store.failing = {store.batches[-1][0]}
+    result = poll_wishlist_prices(batch_size=2)
+    assert (result.requests, result.changed, result.failed_batches) == (3, 1, 1)
+    assert price_history("10") == [(1000, 1999, 0), (2000, 999, 50)]
+    assert price_history("20") == [(1000, 1999, 0)]
+
+
+def test_app_that_goes_free_stops_showing_its_old_price(stand_in, temp_db, monkeypatch):
+    clock = SimpleNamespace(now=1000)
+    monkeypatch.setattr(prices, "time", SimpleNamespace(time=lambda: clock.now))
+    user_id = register_user("player", "secret")
+    _wishlist(user_id, "10", "20")
+    store = Store({"10": _entry(1999), "20": _entry(None)})
+    stand_in.handler = store
+
+    assert poll_wishlist_prices().changed == 1  # The never-priced app gets no row
+    assert price_history("20") == []
+
+    clock.now = 2000
+    store.entries["10"] = _entry(None)
+    assert poll_wishlist_prices().changed == 1
+    assert price_history("10") == [(1000, 1999, 0), (2000, None, None)]
+    assert {row[0]: row[5:] for row in fetch_wishlist(user_id)}["10"] == (None, None, None, None)
+
+    clock.now = 3000
+    assert poll_wishlist_prices().changed == 0  # Still free: nothing new to record
+    store.entries["10"] = _entry(2499)
+    clock.now = 4000
+    assert poll_wishlist_prices().changed == 1
+    assert price_history("10")[-1] == (4000, 2499, 0)
+
+
+def test_parse_price_overviews():
+    assert prices.parse_price_overviews({
+        "10": _entry(1999, 2999, 33), "20": _entry(None), "30": {"success": False}, "40": None,
+    }) == {"10": PriceOverview("USD", 2999, 1999, 33), "20": NO_PRICE}
@@ -0,0 +1,63 @@
+import json
+from types import SimpleNamespace
+
+from gameagg.auth import register_user
+from gameagg.recommender import generate_recommendations, parse_recommendations
+from gameagg.repository import add_review
+
+
+class StubModel:
+    """Answers with ``replies`` in order; an exception in the list is raised instead."""
+
+    def __init__(self, *replies):
+        self.replies = list(replies)
+        self.calls = 0
+
+    def generate_content(self, prompt, **kwargs):
+        self.calls += 1
+        reply = self.replies.pop(0)
+        if isinstance(reply, Exception):
+            raise reply
+        recs = [{"name": name, "description": "d", "genres": ["RPG"]} for name in reply]
+        return SimpleNamespace(text=json.dumps({"recommendations": recs}))
+
+
+def test_failed_top_up_keeps_and_caches_the_first_answer(temp_db):
+    user_id = register_user("player", "secret")
+    add_review(user_id, 620, "Portal 2", "Loved it", 5)
+    model = StubModel([f"Game {i}" for i in range(7)], TimeoutError("deadline exceeded"))
+
+    recommendations = generate_recommendations(user_id, limit=10, model=model)
+    assert [rec["name"] for rec in recommendations] == [f"Game {i}" for i in range(7)]
+    assert model.calls == 2
+
+    # Cached: a second visit doesn't pay for the first call again
+    assert generate_recommendations(user_id, limit=10, model=model) == recommendations
+    assert model.calls == 2
+
+
+def test_failed_first_call_is_reported_and_not_cached(temp_db):
+    user_id = register_user("player", "secret")
+    add_review(user_id, 620, "Portal 2", "Loved it", 5)
+    model = StubModel(TimeoutError("deadline exceeded"), ["Game 1"])
+
+    assert generate_recommendations(user_id, limit=1, model=model)[0]["name"] == "Error"
+    assert [rec["name"] for rec in generate_recommendations(user_id, limit=1, model=model)] == ["Game 1"]
+
+
+def test_json_of_the_wrong_shape_is_not_reparsed_as_text():
+    assert parse_recommendations('{"recommendations": "oops"}') == []
+    assert parse_recommendations('```json\n{"recommendations": {"name": "Hades"}}\n```') == []
+
+
+def test_one_line_entries_are_split_into_fields():
+    text = """Here are some games you might like:
+1. Hades - A roguelike with great combat (Action, Roguelike)
+2. **Celeste** – Tight platforming
+3. Portal 2
+"""
+    assert parse_recommendations(text) == [
+        {"name": "Hades", "description": "A roguelike with great combat", "genres": "Action, Roguelike"},
+        {"name": "Celeste", "description": "Tight platforming", "genres": "Genre information unavailable"},
+        {"name": "Portal 2", "description": "No description available", "genres": "Genre information unavailable"},
+    ]
@@ -0,0 +1,96 @@
+import json
+from urllib.parse import parse_qs, urlparse
+
+from gameagg.auth import register_user
+from gameagg.breaker import MIN_CALLS
+from gameagg.cache import get_cache
+from gameagg.db import get_connection
+from gameagg.importer import upsert_catalog
+from gameagg.refresher import refresh_catalog
+from gameagg.steam import parse_app_details
+
+
+def _payload(appid, name, genres):
+    return {appid: {"success": True, "data": {
+        "name": name, "genres": [{"description": genre} for genre in genres],
+        "header_image": f"https://cdn.example/{appid}.jpg",
+    }}}
+
+
+def _serve(stand_in, store):
+    """Answer appdetails from ``store`` (appid -> payload), unknown apps as unlisted."""
+    def handler(path):
+        appid = parse_qs(urlparse(path).query)["appids"][0]
+        return 200, json.dumps(store.get(appid, {appid: {"success": False}})).encode()
+    stand_in.handler = handler
+
+
+def _query(sql, params=()):
+    conn = get_connection()
+    try:
+        return conn.execute(sql, params).fetchall()
+    finally:
+        conn.close()
+
+
+def _seed(store, owners=()):
+    """Write the catalog rows ``store`` describes, plus library rows for ``(user_id, appid)`` owners."""
+    conn = get_connection()
+    try:
+        for appid, payload in store.items():
+            upsert_catalog(conn.cursor(), appid, parse_app_details(appid, appid, payload))
+        conn.execute("UPDATE catalog SET updated_at = '2000-01-01'")
+        conn.executemany("INSERT INTO library (user_id, steam_user_id, appid, playtime) VALUES (?, 's', ?, 0)",
+                         owners)
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def test_only_changed_metadata_is_written_and_evicted(stand_in, temp_db):
+    store = {"10": _payload("10", "Hades", ["Action"]), "20": _payload("20", "Celeste", ["Platformer"]),
+             "30": _payload("30", "Delisted", ["Puzzle"])}
+    _seed(store)
+    store["20"] = _payload("20", "Celeste", ["Platformer", "Indie"])
+    del store["30"]
+    _serve(stand_in, store)
+    cache = get_cache()
+    cache.set("appdetails:10", "cached")
+    cache.set("appdetails:20", "cached")
+
+    result = refresh_catalog(budget=10)
+    assert result == (3, 1, 1, 1, 0, False)
+    assert _query("SELECT appid, genres, updated_at = '2000-01-01' FROM catalog ORDER BY appid") == [
+        ("10", "Action", 1), ("20", "Platformer, Indie", 0), ("30", "Puzzle", 1)]
+    assert _query("SELECT genre FROM catalog_genres WHERE appid = '20' ORDER BY genre") == [
+        ("Indie",), ("Platformer",)]
+    assert cache.get("appdetails:10") == "cached"
+    assert cache.get("appdetails:20") is None
+    assert _query("SELECT appid, content_hash IS NOT NULL, changed_at IS NOT NULL FROM catalog_refresh "
+                  "ORDER BY appid") == [("10", 1, 0), ("20", 1, 1), ("30", 0, 0)]
+
+    # Nothing is due again until max_age has passed
+    assert refresh_catalog(budget=10).requests == 0
+    assert stand_in.requests == 3
+    # The stored hash now matches, so the changed game reads as unchanged
+    assert refresh_catalog(budget=10, max_age=0) == (3, 0, 2, 1, 0, False)
+
+
+def test_budget_follows_ownership_and_an_open_breaker_stops_the_run(stand_in, temp_db):
+    store = {str(appid): _payload(str(appid), f"Game {appid}", ["RPG"]) for appid in range(10, 20)}
+    users = [register_user(f"user{i}", "secret") for i in range(3)]
+    _seed(store, [(user_id, "15") for user_id in users] + [(users[0], "12"), (users[1], "12")])
+    _serve(stand_in, store)
+
+    assert refresh_catalog(budget=2).requests == 2
+    assert _query("SELECT appid FROM catalog_refresh ORDER BY appid") == [("12",), ("15",)]
+
+    stand_in.handler = lambda path: (500, b"")
+    result = refresh_catalog(budget=10)
+    # With the first run's 2 successes in the window, the breaker opens after 3 of MIN_CALLS failures
+    failures = MIN_CALLS - 2
+    assert result == (failures, 0, 0, 0, failures, True)
+    assert stand_in.requests == 2 + failures
+    # Failed and skipped games stay due for the next run
+    assert _query("SELECT COUNT(*) FROM catalog_refresh") == [(2,)]
+    assert _query("SELECT requests, failed FROM catalog_refresh_runs ORDER BY id") == [(2, 0), (failures, failures)]
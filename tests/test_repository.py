@@ -0,0 +1,74 @@
+from gameagg.auth import register_user
+from gameagg.db import get_connection
+from gameagg.importer import upsert_catalog
+from gameagg.repository import get_games_from_db
+from gameagg.steam import GameDetails
+
+# appid -> (name, genres, playtime)
+LIBRARY = {
+    "10": ("Hades", "Action, Roguelike", 900),
+    "20": ("Celeste", "Platformer, Indie", 300),
+    "30": ("Portal 2", "Puzzle", 300),
+    "40": ("Stardew Valley", "Simulation, RPG", 0),
+    "50": ("Baldur's Gate 3", "RPG", None),
+    "60": ("Dota 2", "Action, Strategy, Free to Play", 6000),
+    "70": ("celeste Classic", "Platformer", 45),
+    "80": ("50% Off Simulator", "Simulation", 1),
+}
+
+
+def _library(temp_db):
+    user_id = register_user("player", "secret")
+    conn = get_connection()
+    try:
+        cursor = conn.cursor()
+        for appid, (name, genres, _) in LIBRARY.items():
+            upsert_catalog(cursor, appid, GameDetails(genres, None, None, "", name, None))
+        cursor.executemany("INSERT INTO library (user_id, steam_user_id, appid, playtime) VALUES (?, 'A', ?, ?)",
+                           [(user_id, appid, playtime) for appid, (_, _, playtime) in LIBRARY.items()])
+        # Another account's games never show up
+        cursor.execute("INSERT INTO library (user_id, steam_user_id, appid, playtime) VALUES (?, 'B', '10', 5)",
+                       (user_id,))
+        conn.commit()
+    finally:
+        conn.close()
+    return user_id
+
+
+def _names(games):
+    return [game.name for game in games]
+
+
+def test_playtime_order_matches_the_old_python_sort(temp_db):
+    user_id = _library(temp_db)
+    games = get_games_from_db(user_id, "A")
+    # The page used sorted(key=playtime, reverse=True); ties now break by name instead of row order
+    assert _names(games) == ["Dota 2", "Hades", "Celeste", "Portal 2", "celeste Classic", "50% Off Simulator",
+                             "Baldur's Gate 3", "Stardew Valley"]
+    assert [game.playtime for game in games] == [6000, 900, 300, 300, 45, 1, 0, 0]
+    assert all(game.appid in LIBRARY for game in games)
+
+
+def test_name_order_is_case_sensitive_like_the_old_python_sort(temp_db):
+    user_id = _library(temp_db)
+    names = _names(get_games_from_db(user_id, "A", sort_by="name"))
+    assert names == sorted(name for name, _, _ in LIBRARY.values())
+    assert names[-1] == "celeste Classic"
+
+
+def test_genre_filter_matches_any_genre_containing_the_text(temp_db):
+    user_id = _library(temp_db)
+    assert _names(get_games_from_db(user_id, "A", genre="rpg")) == ["Baldur's Gate 3", "Stardew Valley"]
+    assert _names(get_games_from_db(user_id, "A", sort_by="name", genre="PLAT")) == ["Celeste", "celeste Classic"]
+    assert _names(get_games_from_db(user_id, "A", genre="free to")) == ["Dota 2"]
+    assert get_games_from_db(user_id, "A", genre="%") == []  # Wildcards are literal
+    assert len(get_games_from_db(user_id, "A", genre="")) == len(LIBRARY)
+
+    # Only catalog_genres is consulted, not the comma-joined catalog.genres text
+    conn = get_connection()
+    try:
+        conn.execute("DELETE FROM catalog_genres WHERE appid = '50'")
+        conn.commit()
+    finally:
+        conn.close()
+    assert _names(get_games_from_db(user_id, "A", genre="rpg")) == ["Stardew Valley"]
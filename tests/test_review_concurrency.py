@@ -0,0 +1,68 @@
+"""Stress test: many processes upserting overlapping reviews at once."""
+import multiprocessing
+import random
+
+from gameagg import config
+from gameagg.auth import register_user
+from gameagg.db import get_connection
+from gameagg.repository import add_review, add_reviews
+
+PROCESSES = 8
+WRITES_PER_PROCESS = 200
+USERS = 3
+APPIDS = 25
+
+
+def _write_reviews(db_file, user_ids, seed):
+    config.DB_FILE = db_file
+    rng = random.Random(seed)
+    written = 0
+    while written < WRITES_PER_PROCESS:
+        if rng.random() < 0.5:
+            appid = rng.randrange(APPIDS)
+            add_review(rng.choice(user_ids), appid, f"Game {appid}", f"review {seed}-{written}", rng.randint(1, 5))
+            written += 1
+        else:
+            batch = []
+            for _ in range(rng.randint(2, 10)):
+                appid = rng.randrange(APPIDS)
+                batch.append((rng.choice(user_ids), appid, f"Game {appid}", f"batch {seed}-{written}",
+                              rng.randint(1, 5)))
+            written += add_reviews(batch)
+    return written
+
+
+def test_concurrent_upserts_leave_no_duplicates_and_consistent_aggregates(temp_db):
+    user_ids = [register_user(f"user{i}", "secret") for i in range(USERS)]
+    with multiprocessing.Pool(PROCESSES) as pool:
+        written = pool.starmap(_write_reviews, [(temp_db, user_ids, seed) for seed in range(PROCESSES)])
+    assert sum(written) >= PROCESSES * WRITES_PER_PROCESS
+
+    conn = get_connection()
+    try:
+        assert conn.execute("""
+            SELECT user_id, appid FROM reviews GROUP BY user_id, appid HAVING COUNT(*) > 1
+        """).fetchall() == []
+        total = conn.execute("SELECT COUNT(*) FROM reviews").fetchone()[0]
+        # Far more writes than keys, so every (user, game) pair ends up reviewed exactly once
+        assert total == USERS * APPIDS
+
+        assert conn.execute("""
+            SELECT user_id, review_count, rating_sum FROM user_stats ORDER BY user_id
+        """).fetchall() == conn.execute("""
+            SELECT user_id, COUNT(*), SUM(rating) FROM reviews GROUP BY user_id ORDER BY user_id
+        """).fetchall()
+        assert conn.execute("""
+            SELECT user_id, rating, review_count FROM user_rating_counts
+            WHERE review_count > 0 ORDER BY user_id, rating
+        """).fetchall() == conn.execute("""
+            SELECT user_id, rating, COUNT(*) FROM reviews GROUP BY user_id, rating ORDER BY user_id, rating
+        """).fetchall()
+
+        assert conn.execute("SELECT COUNT(*) FROM reviews_fts").fetchone()[0] == total
+        assert conn.execute("""
+            SELECT COUNT(*) FROM reviews r JOIN reviews_fts f ON f.rowid = r.review_id
+            WHERE f.review_text = r.review_text
+        """).fetchone()[0] == total
+    finally:
+        conn.close()
@@ -0,0 +1,83 @@
+import pytest
+
+from gameagg.auth import register_user
+from gameagg.db import get_connection
+from gameagg.repository import add_review, delete_review, update_review
+from gameagg.search import build_match_query, search_reviews
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("", None),
+    ("rogue", '"rogue"*'),
+    ("good story", '"good" AND "story"*'),
+    ("good -", '"good"'),
+    ("- *", None),
+    ('"dark souls" like', '"dark souls" AND "like"*'),
+    ('boss "hard fight"', '"boss" AND "hard fight"'),
+    ("NEAR(a b) OR c:d", '"NEAR" AND "a" AND "b" AND "OR" AND "c" AND "d"*'),
+    ('say "hi', '"say" AND "hi"*'),
+])
+def test_build_match_query(text, expected):
+    assert build_match_query(text) == expected
+
+
+def _names(page):
+    return [hit.game_name for hit in page.hits]
+
+
+@pytest.fixture
+def reviewer(temp_db):
+    user_id = register_user("player", "secret")
+    add_review(user_id, 10, "Hades", "A stylish roguelike with great combat", 5)
+    add_review(user_id, 20, "Celeste", "Hard but fair platforming", 4)
+    add_review(user_id, 30, "Portal 2", "Clever puzzles and a good story", 3)
+    return user_id
+
+
+def test_prefix_phrase_and_name_matches(reviewer):
+    assert _names(search_reviews(reviewer, "rogue")) == ["Hades"]
+    assert _names(search_reviews(reviewer, '"but fair"')) == ["Celeste"]
+    assert _names(search_reviews(reviewer, '"fair but"')) == []
+    assert _names(search_reviews(reviewer, "portal")) == ["Portal 2"]
+    assert _names(search_reviews(reviewer, "good -")) == ["Portal 2"]
+
+
+def test_user_input_never_breaks_the_query(reviewer):
+    for text in ['"', '"unterminated', "a AND", "OR", "*", "col:umn", "NEAR(", "(", "^start", "'"]:
+        search_reviews(reviewer, text)  # No sqlite3.OperationalError
+
+
+def test_filters_and_pages(reviewer):
+    page = search_reviews(reviewer, min_rating=4, page_size=1)
+    assert page.total == 2
+    assert len(page.hits) == 1
+    assert search_reviews(reviewer, min_rating=4, page=2, page_size=1).hits[0].review_id != page.hits[0].review_id
+
+
+def test_index_follows_review_and_catalog_changes(reviewer):
+    review_id = search_reviews(reviewer, "platforming").hits[0].review_id
+    update_review(review_id, "Precise jumping and a moving story", 5)
+    assert _names(search_reviews(reviewer, "platforming")) == []
+    assert _names(search_reviews(reviewer, "jumping")) == ["Celeste"]
+    assert sorted(_names(search_reviews(reviewer, "story"))) == ["Celeste", "Portal 2"]
+
+    # Upserting the same game replaces the indexed text
+    add_review(reviewer, 10, "Hades", "Gods and a tight loop", 5)
+    assert _names(search_reviews(reviewer, "roguelike")) == []
+    assert _names(search_reviews(reviewer, "gods")) == ["Hades"]
+
+    conn = get_connection()
+    try:
+        conn.execute("UPDATE catalog SET game_name = 'Hades II' WHERE appid = '10'")
+        conn.commit()
+    finally:
+        conn.close()
+    assert _names(search_reviews(reviewer, "II")) == ["Hades II"]
+
+    delete_review(review_id)
+    assert _names(search_reviews(reviewer, "jumping")) == []
+    conn = get_connection()
+    try:
+        assert conn.execute("SELECT COUNT(*) FROM reviews_fts").fetchone() == (2,)
+    finally:
+        conn.close()
@@ -0,0 +1,86 @@
+import random
+
+import pytest
+
+from gameagg.auth import register_user
+from gameagg.db import get_connection
+from gameagg.repository import add_review
+from gameagg.similarity import build_similarity, players_also_played
+
+pytest.importorskip("scipy")
+
+APPIDS = [str(appid) for appid in range(100, 116)]
+
+
+def _execute_many(sql, rows):
+    conn = get_connection()
+    try:
+        conn.executemany(sql, rows)
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def _neighbors():
+    conn = get_connection()
+    try:
+        rows = conn.execute("SELECT appid, neighbor, score FROM item_neighbors ORDER BY appid, neighbor").fetchall()
+    finally:
+        conn.close()
+    return [(appid, neighbor, round(score, 9)) for appid, neighbor, score in rows]
+
+
+@pytest.fixture
+def players(temp_db):
+    rng = random.Random(7)
+    _execute_many("INSERT INTO catalog (appid, game_name) VALUES (?, ?)",
+                  [(appid, f"Game {appid}") for appid in APPIDS])
+    user_ids = [register_user(f"user{i}", "secret") for i in range(10)]
+    _execute_many("INSERT INTO library (user_id, steam_user_id, appid, playtime) VALUES (?, ?, ?, ?)", [
+        (user_id, f"steam{user_id}", appid, rng.choice([0, 30, 600, 6000]))
+        for user_id in user_ids for appid in rng.sample(APPIDS, 5)
+    ])
+    for user_id in user_ids[:5]:
+        for appid in rng.sample(APPIDS, 2):
+            add_review(user_id, appid, f"Game {appid}", "", rng.randint(1, 5))
+    return user_ids
+
+
+def test_incremental_build_matches_a_full_rebuild(players):
+    assert build_similarity(top_k=3).full
+    user_id = players[0]
+    _execute_many("INSERT INTO library (user_id, steam_user_id, appid, playtime) VALUES (?, ?, ?, ?)",
+                  [(user_id, "new", appid, 900) for appid in ("114", "115")])
+    _execute_many("UPDATE library SET playtime = ? WHERE user_id = ? AND appid = ?", [(12000, players[1], "100")])
+    _execute_many("DELETE FROM library WHERE user_id = ? AND appid IN (?, ?)", [(players[2], "101", "102")])
+    add_review(players[3], "103", "Game 103", "", 1)
+
+    result = build_similarity(top_k=3)
+    assert not result.full
+    assert 0 < result.recomputed <= len(APPIDS)
+    incremental = _neighbors()
+
+    assert build_similarity(top_k=3, full=True).full
+    assert incremental == _neighbors()
+    assert build_similarity(top_k=3).recomputed == 0  # Nothing changed since
+
+
+def test_players_also_played_leaves_out_owned_and_reviewed_games(players):
+    user_id = players[0]
+    # A second linked account and a review of a game not in either library
+    _execute_many("INSERT INTO library (user_id, steam_user_id, appid, playtime) VALUES (?, ?, ?, ?)",
+                  [(user_id, "second", "115", 60)])
+    add_review(user_id, "114", "Game 114", "", 5)
+    build_similarity()
+
+    conn = get_connection()
+    try:
+        played = {row[0] for row in conn.execute(
+            "SELECT appid FROM library WHERE user_id = ? UNION SELECT appid FROM reviews WHERE user_id = ?",
+            (user_id, user_id))}
+    finally:
+        conn.close()
+    recommended = players_also_played(user_id, limit=len(APPIDS))
+    assert recommended
+    assert not {game.appid for game in recommended} & played
+    assert [game.score for game in recommended] == sorted((game.score for game in recommended), reverse=True)
@@ -0,0 +1,109 @@
+from gameagg.auth import register_user
+from gameagg.db import get_connection, init_db
+from gameagg.importer import set_catalog_genres, store_games
+from gameagg.stats import get_library_stats
+from gameagg.steam import GameDetails
+
+GENRES = {"10": "RPG, Action", "20": "Puzzle", "30": "RPG"}
+
+
+def _details(appid, name):
+    return GameDetails(GENRES[str(appid)], None, None, "", name, None)
+
+
+def _import(user_id, steam_user_id, playtimes):
+    conn = get_connection()
+    try:
+        games = [{"appid": appid, "name": f"N{appid}", "playtime_forever": playtime}
+                 for appid, playtime in playtimes.items()]
+        store_games(conn.cursor(), games, user_id, steam_user_id, fetch_details=_details)
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def _execute(sql, params=()):
+    conn = get_connection()
+    try:
+        conn.execute(sql, params)
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def _assert_matches_recompute():
+    """Compare the trigger-maintained aggregates with a from-scratch recompute."""
+    owned = """
+        SELECT user_id, appid, SUM(COALESCE(playtime, 0)) AS playtime
+        FROM library WHERE user_id IS NOT NULL GROUP BY user_id, appid
+    """
+    conn = get_connection()
+    try:
+        assert conn.execute("""
+            SELECT user_id, game_count, total_playtime, backlog_count FROM user_stats
+            WHERE game_count > 0 ORDER BY user_id
+        """).fetchall() == conn.execute(f"""
+            SELECT user_id, COUNT(*), SUM(playtime), SUM(playtime = 0) FROM ({owned})
+            GROUP BY user_id ORDER BY user_id
+        """).fetchall()
+        assert conn.execute("""
+            SELECT user_id, genre, game_count, playtime FROM user_genre_playtime
+            WHERE game_count > 0 ORDER BY user_id, genre
+        """).fetchall() == conn.execute(f"""
+            SELECT o.user_id, g.genre, COUNT(*), SUM(o.playtime)
+            FROM ({owned}) o JOIN catalog_genres g ON g.appid = o.appid
+            GROUP BY o.user_id, g.genre ORDER BY o.user_id, g.genre
+        """).fetchall()
+    finally:
+        conn.close()
+
+
+def test_games_on_several_linked_accounts_count_once(temp_db):
+    user_id = register_user("player", "secret")
+    _import(user_id, "A", {10: 7, 20: 0})
+    _import(user_id, "B", {10: 5, 30: 1})
+    _assert_matches_recompute()
+
+    stats = get_library_stats(user_id)
+    assert stats.game_count == 3
+    assert stats.total_playtime == 13
+    assert stats.backlog_count == 1
+    assert stats.most_played == [("N10", 12), ("N30", 1)]
+    assert sorted(stats.genres) == [("Action", 12, 1), ("Puzzle", 0, 1), ("RPG", 13, 2)]
+
+    # Playtime updates, including a backlog game picked up on a second account
+    _import(user_id, "A", {10: 9, 20: 0})
+    _import(user_id, "B", {10: 5, 20: 4, 30: 1})
+    _assert_matches_recompute()
+    assert get_library_stats(user_id).backlog_count == 0
+
+    # Catalog genre changes move playtime between genres
+    conn = get_connection()
+    try:
+        set_catalog_genres(conn.cursor(), "10", "Action, Strategy")
+        set_catalog_genres(conn.cursor(), "20", "")
+        conn.commit()
+    finally:
+        conn.close()
+    _assert_matches_recompute()
+
+    # Unlinking an account removes only the games no other account owns
+    _execute("DELETE FROM library WHERE user_id = ? AND steam_user_id = ?", (user_id, "B"))
+    _assert_matches_recompute()
+    stats = get_library_stats(user_id)
+    assert stats.game_count == 2
+    assert stats.backlog_count == 1
+    assert stats.most_played == [("N10", 9)]
+
+
+def test_existing_per_row_aggregates_are_recomputed(temp_db):
+    user_id = register_user("player", "secret")
+    _import(user_id, "A", {10: 7, 20: 0})
+    _import(user_id, "B", {10: 5, 20: 0})
+    # An older database: per-row counts and the triggers that kept them
+    _execute("DROP TRIGGER stats_owned_insert")
+    _execute("UPDATE user_stats SET game_count = 4, backlog_count = 2")
+
+    init_db()
+    _assert_matches_recompute()
+    assert get_library_stats(user_id).game_count == 2
@@ -0,0 +1,85 @@
+import pytest
+
+from gameagg import config, transfer
+from gameagg.auth import register_user
+from gameagg.db import get_connection, init_db
+from gameagg.importer import store_games
+from gameagg.repository import add_review, add_to_wishlist
+from gameagg.stats import get_library_stats
+from gameagg.steam import GameDetails
+
+FORMATS = ["jsonl"] + (["parquet", "arrow"] if transfer.pa is not None else [])
+GAMES = {10: ("Hades", "Action, Roguelike"), 20: ("Celeste", "Platformer"), 30: ("Portal 2", "Puzzle")}
+
+
+def _details(appid, name):
+    return GameDetails(GAMES[appid][1], f"https://cdn.example/{appid}.jpg", f"https://store.example/{appid}",
+                       "", name, None)
+
+
+def _query(sql, params=()):
+    conn = get_connection()
+    try:
+        return conn.execute(sql, params).fetchall()
+    finally:
+        conn.close()
+
+
+def _user_counts(user_id):
+    return {
+        "library": _query("SELECT COUNT(*) FROM library WHERE user_id = ?", (user_id,))[0][0],
+        "reviews": _query("SELECT COUNT(*) FROM reviews WHERE user_id = ?", (user_id,))[0][0],
+        "wishlist": _query("SELECT COUNT(*) FROM wishlist WHERE user_id = ?", (user_id,))[0][0],
+        "accounts": _query("SELECT COUNT(*) FROM accounts WHERE user_id = ?", (user_id,))[0][0],
+    }
+
+
+@pytest.mark.parametrize("fmt", FORMATS)
+def test_round_trip_into_a_fresh_database_is_idempotent(fmt, temp_db, tmp_path, monkeypatch):
+    user_id = register_user("player", "secret")
+    conn = get_connection()
+    try:
+        for steam_user_id, playtimes in (("A", {10: 90, 20: 0}), ("B", {10: 15, 30: 40})):
+            games = [{"appid": appid, "name": GAMES[appid][0], "playtime_forever": playtime}
+                     for appid, playtime in playtimes.items()]
+            store_games(conn.cursor(), games, user_id, steam_user_id, fetch_details=_details)
+        conn.commit()
+    finally:
+        conn.close()
+    add_review(user_id, 10, "Hades", "Fast and stylish roguelike", 5)
+    add_review(user_id, 30, "Portal 2", "Clever puzzles", 4)
+    add_to_wishlist(user_id, "40", "Hollow Knight", None, None)
+
+    exported = transfer.export_user_data(user_id, str(tmp_path / "dump"), fmt=fmt, chunk_size=2)
+    assert exported.rows == {"library": 4, "reviews": 2, "wishlist": 1, "accounts": 2}
+
+    monkeypatch.setattr(config, "DB_FILE", str(tmp_path / "fresh.db"))
+    init_db()
+    conn = get_connection()
+    try:
+        # A stub left by the wishlist or price paths: no name, genres or cover yet
+        conn.execute("INSERT INTO catalog (appid) VALUES ('10')")
+        conn.commit()
+    finally:
+        conn.close()
+    new_user = register_user("restored", "secret")
+
+    for _ in range(2):
+        loaded = transfer.import_user_data(new_user, str(tmp_path / "dump"), chunk_size=2)
+        assert loaded.format == fmt
+        assert loaded.rows == exported.rows
+        assert _user_counts(new_user) == exported.rows
+
+    assert _query("SELECT game_name, genres, cover_url FROM catalog WHERE appid = '10'") == [
+        ("Hades", "Action, Roguelike", "https://cdn.example/10.jpg")]
+    assert _query("SELECT genre FROM catalog_genres WHERE appid = '10' ORDER BY genre") == [
+        ("Action",), ("Roguelike",)]
+
+    assert _query("SELECT COUNT(*) FROM reviews_fts") == [(2,)]
+    assert _query("SELECT game_name FROM reviews_fts WHERE reviews_fts MATCH 'stylish'") == [("Hades",)]
+
+    stats = get_library_stats(new_user)
+    assert (stats.game_count, stats.total_playtime, stats.backlog_count) == (3, 145, 1)
+    assert (stats.review_count, stats.average_rating) == (2, 4.5)
+    assert sorted(stats.genres) == [("Action", 105, 1), ("Platformer", 0, 1), ("Puzzle", 40, 1),
+                                    ("Roguelike", 105, 1)]
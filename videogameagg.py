@@ -1,414 +1,152 @@
-import streamlit as st
-import requests
-import json
 import sqlite3
-import google.generativeai as genai
-import os
-from dotenv import load_dotenv
-import hashlib
-from urllib.parse import urlparse
-from bs4 import BeautifulSoup
-from datetime import datetime
-
-load_dotenv()
-
-# Steam API Key
-STEAM_API_KEY = os.getenv("STEAM_API_KEY")
-# Configure Google Generative AI
-GENAI_API_KEY = os.getenv("GENAI_API_KEY")
-import google.generativeai as genai
-genai.configure(api_key=GENAI_API_KEY)
-model = genai.GenerativeModel("gemini-1.5-flash")
-
-# IGDB API Credentials
-CLIENT_ID = os.getenv("IGDB_CLIENT_ID")
-ACCESS_TOKEN = os.getenv("IGDB_ACCESS_TOKEN")
-BASE_URL = "https://api.igdb.com/v4"
-
-# Database setup
-DB_FILE = "steam_games_recommendations.db"
-
-# Initialize database
-def init_db():
-    conn = sqlite3.connect(DB_FILE)
-    cursor = conn.cursor()
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS users (
-            user_id INTEGER PRIMARY KEY AUTOINCREMENT,
-            username TEXT UNIQUE NOT NULL,
-            password TEXT NOT NULL,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    """)
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS games (
-            id INTEGER PRIMARY KEY,
-            steam_game_id TEXT,
-            game_name TEXT,
-            playtime INTEGER,
-            genres TEXT,
-            cover_url TEXT,
-            store_url TEXT,
-            added_on TIMESTAMP,
-            user_id INTEGER,
-            steam_user_id TEXT,
-            FOREIGN KEY(user_id) REFERENCES users(user_id)
-        )
-    """)
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS reviews (
-            review_id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id INTEGER,
-            game_id INTEGER,
-            review_text TEXT,
-            rating INTEGER CHECK(rating >= 1 AND rating <= 5),
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY(user_id) REFERENCES users(user_id),
-            FOREIGN KEY(game_id) REFERENCES games(id)
-        )
-    """)
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS accounts (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            steam_user_id TEXT,
-            user_id INTEGER,
-            FOREIGN KEY(user_id) REFERENCES users(user_id),
-            UNIQUE(steam_user_id, user_id)
-        );
-    """)
-
-    # Create wishlist table
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS wishlist (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id INTEGER NOT NULL,
-            steam_game_id TEXT NOT NULL,
-            game_name TEXT NOT NULL,
-            cover_url TEXT,
-            store_url TEXT,
-            added_on TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY(user_id) REFERENCES users(user_id)
-        )
-    """)
-
-    # Check if cover_url and store_url exist, and add them if missing
-    try:
-        cursor.execute("ALTER TABLE wishlist ADD COLUMN cover_url TEXT")
-    except sqlite3.OperationalError:
-        pass  # Column already exists
-
-    try:
-        cursor.execute("ALTER TABLE wishlist ADD COLUMN store_url TEXT")
-    except sqlite3.OperationalError:
-        pass  # Column already exists
 
-    conn.commit()
-    conn.close()
+import streamlit as st
 
-init_db()
+import gameagg
+from gameagg import GameAggError
+from gameagg.config import STEAM_API_KEY
+from gameagg.prices import format_price
+from gameagg.search import search_reviews
+from gameagg.stats import get_library_stats
 
-# Utility functions
-def hash_password(password):
-    return hashlib.sha256(password.encode()).hexdigest()
+gameagg.init_db()
 
 
 def register_user(username, password):
-    conn = sqlite3.connect(DB_FILE)
-    cursor = conn.cursor()
-    hashed_password = hash_password(password)
     try:
-        cursor.execute("""
-            INSERT INTO users (username, password) VALUES (?,?)
-        """, (username, hashed_password))
-        conn.commit()
+        gameagg.register_user(username, password)
         st.success("Registration successful! You can now log in.")
-    except sqlite3.IntegrityError:
-        st.error("Username already exists.")
-    finally:
-        conn.close()
-
-def login_user(username, password):
-    conn = sqlite3.connect(DB_FILE)
-    cursor = conn.cursor()
-    hashed_password = hash_password(password)
-    cursor.execute("""
-        SELECT user_id FROM users WHERE username = ? AND password = ?
-    """, (username, hashed_password))
-    user = cursor.fetchone()
-    conn.close()
-    return user
+    except GameAggError as e:
+        st.error(str(e))
+
 
 def logout_user():
     if "user_id" in st.session_state:
         del st.session_state["user_id"]
         st.success("Logged out successfully.")
 
-def extract_user_id(steam_url):
-    try:
-        parsed_url = urlparse(steam_url)
-        path_segments = parsed_url.path.strip('/').split('/')
-        if len(path_segments) > 1 and path_segments[0] in ['profiles', 'id']:
-            return path_segments[-1]  # This will return the vanity URL part
-        else:
-            st.error("Invalid Steam URL format. Please use a valid profile or ID URL.")
-            return None
-    except Exception as e:
-        st.error(f"Error parsing URL: {e}")
-        return None
 
-def get_steam_username(steam_id):
-    """Fetch Steam username from Steam ID."""
-    url = f"https://api.steampowered.com/ISteamUser/GetPlayerSummaries/v2/"
-    params = {
-        "key": STEAM_API_KEY,
-        "steamids": steam_id
-    }
+def show_import_result(result):
+    for warning in result.warnings:
+        st.warning(warning)
+
+
+def show_cover(url):
+    """Render a cover from the local thumbnail cache, falling back to the remote URL."""
+    image = gameagg.get_thumbnail(url) or url
+    if image:
+        st.image(image, width=150)
+
+
+def has_existing_review(user_id, game_id):
     try:
-        response = requests.get(url, params=params)
-        if response.status_code == 200:
-            data = response.json()
-            players = data.get("response", {}).get("players", [])
-            if players:
-                return players[0].get("personaname", steam_id)
-        return steam_id  # Return the ID if username can't be fetched
-    except Exception as e:
-        st.error(f"Error fetching Steam username: {e}")
-        return steam_id
-
-def resolve_vanity_url(vanity_url):
-    url = f"https://api.steampowered.com/ISteamUser/ResolveVanityURL/v1/?key={STEAM_API_KEY}&vanityurl={vanity_url}"
-    response = requests.get(url)
-    if response.status_code == 200:
-        data = response.json()
-        if data.get("response", {}).get("success") == 1:
-            return data["response"].get("steamid")
-        else:
-            st.error("Could not resolve vanity URL. Ensure the vanity URL is correct.")
-    else:
-        st.error(f"Failed to resolve vanity URL. Steam API returned: {response.status_code}")
-    return None
-
-def fetch_game_news(app_id, steam_api_key):
-    """Fetch recent news for a game by its Steam App ID."""
-    url = f"https://api.steampowered.com/ISteamNews/GetNewsForApp/v2/"
-    params = {
-        "appid": app_id,
-        "count": 3,       # Number of news articles to fetch
-        "maxlength": 300, # Max length of news content
-        "format": "json"
-    }
-    response = requests.get(url, params=params)
-    if response.status_code == 200:
-        data = response.json()
-        news_items = data.get("appnews", {}).get("newsitems", [])
-        return news_items if news_items else None
-    else:
-        return None
+        return gameagg.has_existing_review(user_id, game_id)
+    except sqlite3.Error as e:
+        st.error(f"Error checking existing review: {e}")
+        return False
 
-# Function to display news or a fallback message
-def display_game_news(app_id, steam_api_key):
-    """Display news or a fallback message for the specified game."""
-    news = fetch_game_news(app_id, steam_api_key)
-    if news:
-        print(f"Recent News for Game (App ID: {app_id}):")
-        for article in news:
-            print(f"- {article['title']}: {article['contents'][:100]}...")
-            print(f"  Read more: {article['url']}\n")
-    else:
-        print(f"No recent news or patches available for this game (App ID: {app_id}).")
-
-def fetch_owned_games(steamid):
-    url = f"https://api.steampowered.com/IPlayerService/GetOwnedGames/v1/"
-    params = {
-        "key": STEAM_API_KEY,
-        "steamid": steamid,
-        "include_appinfo": True,
-        "include_played_free_games": True
-    }
-    response = requests.get(url, params=params)
-    if response.status_code == 200:
-        games = response.json().get("response", {}).get("games", [])
-        if not games:
-            st.error("No games found. Ensure the Steam64 ID is correct and your games are Public.")
-        return games
-    else:
-        st.error(f"Failed to fetch games. Steam API returned: {response.status_code} - {response.text}")
-        return []
-
-def fetch_game_details(appid, game_name):
-    """
-    Fetch game details from Steam API with improved error handling and language settings.
-
-    Args:
-        appid (str): Steam app ID
-        game_name (str): Default game name to fall back on
-
-    Returns:
-        tuple: (genres, cover_url, store_url, description, name)
-    """
-    # Default values in case of API failure
-    name = game_name
-    genres = "Unknown"
-    cover_url = "https://via.placeholder.com/150"
-    store_url = f"https://store.steampowered.com/app/{appid}"
-    description = "No description available."
 
+def is_game_in_wishlist(user_id, steam_game_id):
     try:
-        # Set language preference to English and include additional metadata
-        params = {
-            'appids': appid,
-            'l': 'english',  # Force English language
-            'cc': 'us'       # Set region to US for consistent results
-        }
+        return gameagg.is_game_in_wishlist(user_id, steam_game_id)
+    except sqlite3.Error as e:
+        st.error(f"Error checking wishlist: {e}")
+        return False
 
-        url = "https://store.steampowered.com/api/appdetails"
-        response = requests.get(url, params=params, timeout=10)
 
-        if response.status_code == 200:
-            data = response.json()
+def add_to_wishlist(user_id, steam_game_id, game_name, cover_url, store_url):
+    try:
+        if gameagg.add_to_wishlist(user_id, steam_game_id, game_name, cover_url, store_url):
+            st.success(f"'{game_name}' has been added to your wishlist!")
+        else:
+            st.warning(f"'{game_name}' is already in your wishlist!")
+    except sqlite3.Error as e:
+        st.error(f"Error adding game to wishlist: {e}")
 
-            # Check if we got valid data
-            if data and str(appid) in data and data[str(appid)].get('success', False):
-                game_data = data[str(appid)]['data']
 
-                # Extract game details with fallbacks
-                name = game_data.get('name', game_name)
+def remove_from_wishlist(user_id, steam_game_id):
+    try:
+        gameagg.remove_from_wishlist(user_id, steam_game_id)
+        st.success("Game removed from your wishlist.")
+    except sqlite3.Error as e:
+        st.error(f"Error removing game from wishlist: {e}")
 
-                # Get genres with error handling
-                genre_list = game_data.get('genres', [])
-                if genre_list and isinstance(genre_list, list):
-                    genres = ", ".join([genre.get('description', '') for genre in genre_list if genre.get('description')])
 
-                # Get header image with validation
-                if 'header_image' in game_data and game_data['header_image'].startswith('http'):
-                    cover_url = game_data['header_image']
+def add_review(user_id, game_id, game_name, review_text, rating):
+    try:
+        gameagg.add_review(user_id, game_id, game_name, review_text, rating)
+        return True
+    except sqlite3.Error as e:
+        st.error(f"Database error while saving review: {e}")
+        return False
 
-                # Get description with HTML cleanup
-                if 'short_description' in game_data:
-                    description = BeautifulSoup(game_data['short_description'], 'html.parser').get_text()
-                    # Limit description length
-                    if len(description) > 300:
-                        description = description[:297] + "..."
 
-                # Validate store URL format
-                store_url = f"https://store.steampowered.com/app/{appid}"
+def update_review(review_id, new_text, new_rating):
+    try:
+        gameagg.update_review(review_id, new_text, new_rating)
+        st.success("Review updated successfully!")
+    except sqlite3.Error as e:
+        st.error(f"Error updating review: {e}")
 
-        else:
-            st.warning(f"Unable to fetch details for {game_name}. Using basic information.")
 
-    except requests.RequestException as e:
-        st.error(f"Network error while fetching game details: {str(e)}")
-    except (KeyError, ValueError, json.JSONDecodeError) as e:
-        st.error(f"Error processing game data: {str(e)}")
-    except Exception as e:
-        st.error(f"Unexpected error: {str(e)}")
+def delete_review(review_id):
+    try:
+        gameagg.delete_review(review_id)
+        st.success("Review deleted successfully!")
+    except sqlite3.Error as e:
+        st.error(f"Error deleting review: {e}")
 
-    return genres, cover_url, store_url, description, name
 
-def add_games_to_db(games, user_id, steam_user_id):
-    conn = sqlite3.connect(DB_FILE)
-    cursor = conn.cursor()
-    cursor.execute("PRAGMA foreign_keys = ON;")
-    for game in games:
-        # Check if the game already exists
-        cursor.execute("""
-            SELECT playtime FROM games WHERE steam_game_id = ? AND user_id = ? AND steam_user_id = ?
-        """, (game["appid"], user_id, steam_user_id))
-        existing_game = cursor.fetchone()
-
-        if existing_game:
-            # Update playtime if it has increased
-            if game["playtime_forever"] > existing_game[0]:
-                cursor.execute("""
-                    UPDATE games
-                    SET playtime = ?, added_on = CURRENT_TIMESTAMP
-                    WHERE steam_game_id = ? AND user_id = ? AND steam_user_id = ?
-                """, (game["playtime_forever"], game["appid"], user_id, steam_user_id))
-        else:
-            # Insert new game
-            genres, cover_url, store_url, description, name = fetch_game_details(game["appid"], game["name"])
-            cursor.execute("""
-                INSERT INTO games (steam_game_id, game_name, playtime, genres, cover_url, store_url, added_on, user_id, steam_user_id)
-                VALUES (?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP, ?, ?)
-            """, (game["appid"], name, game["playtime_forever"], genres, cover_url, store_url, user_id, steam_user_id))
-    conn.commit()
-    conn.close()
-
-def save_review_to_db(game_id, game_name, review_text, rating):
-    """Save a user's review for a searched game to the database."""
-    user_id = st.session_state.get("user_id")  # Ensure the user is logged in
-    if not user_id:
-        st.error("You must be logged in to save a review.")
+def review_form(user_id, appid, name, key, label):
+    """Render the review expander for one game."""
+    if has_existing_review(user_id, appid):
+        st.info(f"You have already reviewed {name}. You can edit your review from the 'Your Reviews' page.")
         return
+    with st.expander(f"Review {name}"):
+        review = st.text_area(f"{label} {name}", key=f"review_{key}")
+        rating = st.slider(f"Rate {name}", 1, 5, key=f"rating_{key}")
+        if st.button(f"Submit Review for {name}", key=f"submit_review_{key}"):
+            if add_review(user_id, appid, name, review, rating):
+                st.success(f"Your review for {name} has been saved!")
 
-    conn = sqlite3.connect(DB_FILE)
-    cursor = conn.cursor()
-    try:
-        # Check if the game exists in the database
-        cursor.execute("""
-            SELECT id FROM games WHERE steam_game_id = ? AND user_id = ?
-        """, (game_id, user_id))
-        existing_game = cursor.fetchone()
-
-        if not existing_game:
-            # Add the game to the database
-            cursor.execute("""
-                INSERT INTO games (steam_game_id, game_name, user_id, added_on)
-                VALUES (?, ?, ?, ?)
-            """, (game_id, game_name, user_id, datetime.now()))
-            game_db_id = cursor.lastrowid
-        else:
-            game_db_id = existing_game[0]
-
-        # Add the review
-        cursor.execute("""
-            INSERT INTO reviews (user_id, game_id, review_text, rating, created_at)
-            VALUES (?, ?, ?, ?, ?)
-        """, (user_id, game_db_id, review_text, rating, datetime.now()))
-        conn.commit()
-    except Exception as e:
-        st.error(f"Error saving review: {e}")
-    finally:
-        conn.close()
 
-def has_existing_review(user_id, game_id):
-    """Check if a user has already reviewed a specific game."""
-    conn = sqlite3.connect(DB_FILE)
-    cursor = conn.cursor()
+def handle_steam_url_input():
+    steam_url = st.text_input("Enter your Steam Profile URL:", placeholder="https://steamcommunity.com/profiles/76561198882302331")
+    if st.button("Fetch My Steam Games"):
+        if not steam_url:
+            st.error("Please enter a valid Steam Profile URL.")
+            return None
+        try:
+            return gameagg.resolve_steam_id(steam_url)
+        except GameAggError as e:
+            st.error(str(e))
+            return None
+
+
+def import_library(user_id, steam_user_id):
+    """Fetch and store a Steam library, returning the ImportResult or None."""
     try:
-        cursor.execute("""
-            SELECT review_id FROM reviews r
-            JOIN games g ON r.game_id = g.id
-            WHERE r.user_id = ? AND g.steam_game_id = ?
-        """, (user_id, game_id))
-        existing_review = cursor.fetchone()
-        return bool(existing_review)
-    except Exception as e:
-        st.error(f"Error checking existing review: {e}")
-        return False
-    finally:
-        conn.close()
-
-def search_game_by_name_steam(name):
-    """Search for a game by name using Steam Store search."""
-    search_url = f"https://store.steampowered.com/search/?term={name.replace(' ', '+')}"
-    response = requests.get(search_url)
-    if response.status_code == 200:
-        soup = BeautifulSoup(response.text, "html.parser")
-        results = []
-        for game in soup.find_all("a", class_="search_result_row"):
-            appid = game.get("data-ds-appid")
-            if appid:
-                name = game.find("span", class_="title").text
-                image = game.find("img").get("src", "")
-                results.append({"appid": appid, "name": name, "image": image})
-        if not results:
-            st.error("No results found on Steam Store.")
-        return results
-    else:
-        st.error("Failed to search for games. Steam Store returned an error.")
-        st.write(f"Error Details: {response.status_code} - {response.text}")  # Debug log
-        return []
+        result = gameagg.import_account_sync(user_id, steam_user_id)
+    except GameAggError as e:
+        st.error(str(e))
+        return None
+    show_import_result(result)
+    return result
+
+
+def refresh_all_accounts(user_id, names):
+    """Refresh every linked library at once and show a per-account summary."""
+    with st.spinner("Refreshing all linked Steam accounts..."):
+        summary = gameagg.refresh_all_accounts_sync(user_id)
+    for refresh in summary:
+        label = f"{names.get(refresh.steam_user_id, refresh.steam_user_id)} ({refresh.steam_user_id})"
+        if refresh.error:
+            st.error(f"{label}: {refresh.error}")
+            continue
+        result = refresh.result
+        st.write(f"**{label}:** {result.fetched} games, {result.added} new, {result.updated} with more playtime")
+        show_import_result(result)
+
 
 # Full updated search_and_display_games function
 def search_and_display_games():
@@ -428,7 +166,11 @@ def search_and_display_games():
     if st.button("Search by Name"):
         if game_name.strip():  # Ensure the input is not empty or just whitespace
             st.session_state["last_search"] = game_name
-            search_results = search_game_by_name_steam(game_name)
+            try:
+                search_results = gameagg.search_game_by_name_steam(game_name)
+            except GameAggError as e:
+                st.error(str(e))
+                search_results = []
             if search_results:
                 st.session_state["search_results"] = search_results
             else:
@@ -440,51 +182,46 @@ def search_and_display_games():
     # Display search results
     if st.session_state["search_results"]:
         st.subheader(f"Search Results for: {st.session_state['last_search']}")
+        user_id = st.session_state.get("user_id")
 
+        # While the store is down every result fails with the same message; show it once
+        shown_errors = set()
         for game in st.session_state["search_results"]:
             # Fetch additional details for the game
-            genres, cover_url, store_url, description, name = fetch_game_details(game["appid"], game["name"])
+            details = gameagg.fetch_game_details(game["appid"], game["name"])
+            if details.error and details.error not in shown_errors:
+                shown_errors.add(details.error)
+                st.warning(details.error)
+            name = details.name
 
             col1, col2 = st.columns([1, 2])
 
             with col1:
-                st.image(cover_url, width=150)
+                show_cover(details.cover_url)
 
             with col2:
                 st.write(f"**Name:** {name}")
-                st.write(f"**Genres:** {genres}")
-                st.write(f"**Description:** {description}")
-                st.write(f"[View on Steam]({store_url})")
+                st.write(f"**Genres:** {details.genres}")
+                st.write(f"**Description:** {details.description}")
+                st.write(f"[View on Steam]({details.store_url})")
 
                 # Wishlist button logic
-                user_id = st.session_state.get("user_id")
                 if user_id:
                     if not is_game_in_wishlist(user_id, game["appid"]):
                         if st.button(f"Add to Wishlist: {name}", key=f"wishlist_{game['appid']}"):
-                            add_to_wishlist(user_id, game["appid"], name, cover_url, store_url)
+                            add_to_wishlist(user_id, game["appid"], name, details.cover_url, details.store_url)
                     else:
                         st.info(f"{name} is already in your wishlist!")
                 else:
                     st.error("Please log in to save games to your wishlist.")
 
             # Review Section
-            if user_id and has_existing_review(user_id, game["appid"]):
-                st.info(f"You have already reviewed {name}. You can edit your review from the 'Your Reviews' page.")
-            else:
-                with st.expander(f"Review {name}"):
-                    review = st.text_area(f"Review for {name}", key=f"review_{game['appid']}")
-                    rating = st.slider(f"Rate {name}", 1, 5, key=f"rating_{game['appid']}")
-
-                    if st.button(f"Submit Review for {name}", key=f"submit_review_{game['appid']}"):
-                        if user_id:
-                            add_review(user_id, game["appid"], name, review, rating)
-                            st.success(f"Your review for {name} has been saved!")
-                        else:
-                            st.error("Please log in to submit a review.")
+            if user_id:
+                review_form(user_id, game["appid"], name, game["appid"], "Review for")
 
             # News Section
             with st.expander(f"Recent News for {name}"):
-                news = fetch_game_news(game["appid"], STEAM_API_KEY)
+                news = gameagg.fetch_game_news(game["appid"], STEAM_API_KEY)
                 if news:
                     for article in news:
                         st.markdown(f"- **[{article['title']}]({article['url']})**")
@@ -496,369 +233,31 @@ def search_and_display_games():
         if st.session_state["last_search"]:
             st.error("No results found for your search. Try another game name.")
 
-# Add this function to check if a game is already in wishlist
-def is_game_in_wishlist(user_id, steam_game_id):
-    """Check if a game is already in the user's wishlist."""
-    conn = sqlite3.connect(DB_FILE)
-    cursor = conn.cursor()
-    try:
-        cursor.execute("""
-            SELECT id FROM wishlist 
-            WHERE user_id = ? AND steam_game_id = ?
-        """, (user_id, steam_game_id))
-        result = cursor.fetchone()
-        return bool(result)
-    except Exception as e:
-        st.error(f"Error checking wishlist: {e}")
-        return False
-    finally:
-        conn.close()
-
-def add_review(user_id, game_id, game_name, review_text, rating):
-    """Modified review addition function with better error handling"""
-    conn = sqlite3.connect(DB_FILE)
-    cursor = conn.cursor()
-    try:
-        # Debug output
-        st.write(f"Adding review for user {user_id}, game {game_name}")
-
-        # First ensure the game exists
-        cursor.execute("""
-            INSERT OR IGNORE INTO games (steam_game_id, game_name, user_id, added_on)
-            VALUES (?, ?, ?, CURRENT_TIMESTAMP)
-        """, (game_id, game_name, user_id))
-
-        # Get the game's database ID
-        cursor.execute("SELECT id FROM games WHERE steam_game_id = ? AND user_id = ?", (game_id, user_id))
-        game_entry = cursor.fetchone()
-
-        if not game_entry:
-            st.error("Failed to find or create game entry")
-            return False
-
-        game_db_id = game_entry[0]
-
-        # Check for existing review
-        cursor.execute("""
-            SELECT review_id FROM reviews 
-            WHERE user_id = ? AND game_id = ?
-        """, (user_id, game_db_id))
-        existing_review = cursor.fetchone()
-
-            # Add new review
-        cursor.execute("""
-            INSERT INTO reviews (user_id, game_id, review_text, rating, created_at)
-            VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
-        """, (user_id, game_db_id, review_text, rating))
-        st.success("Review added successfully!")
-
-        conn.commit()
-        return True
-
-    except sqlite3.Error as e:
-        st.error(f"Database error while saving review: {e}")
-        return False
-    finally:
-        conn.close()
-
-def get_games_from_db(user_id, steam_user_id):
-    conn = sqlite3.connect(DB_FILE)
-    cursor = conn.cursor()
-    cursor.execute("PRAGMA foreign_keys = ON;")
-    cursor.execute("""
-        SELECT * FROM games WHERE user_id = ? AND steam_user_id = ?
-    """, (user_id, steam_user_id))
-    rows = cursor.fetchall()
-    conn.close()
-    return rows
-
-def get_user_reviews(user_id):
-    """Retrieve all reviews submitted by the logged-in user."""
-    conn = sqlite3.connect(DB_FILE)
-    cursor = conn.cursor()
-    try:
-        cursor.execute("""
-            SELECT r.review_id, g.game_name, r.review_text, r.rating, r.created_at
-            FROM reviews r
-            JOIN games g ON r.game_id = g.id
-            WHERE r.user_id = ?
-        """, (user_id,))
-        reviews = cursor.fetchall()
-        return reviews
-    except Exception as e:
-        st.error(f"Error fetching reviews: {e}")
-        return []
-    finally:
-        conn.close()
-
-def update_review(review_id, new_text, new_rating):
-    conn = sqlite3.connect(DB_FILE)
-    cursor = conn.cursor()
-    try:
-        cursor.execute("""
-            UPDATE reviews
-            SET review_text = ?, rating = ?, created_at = CURRENT_TIMESTAMP
-            WHERE review_id = ?
-        """, (new_text, new_rating, review_id))
-        conn.commit()
-        st.success("Review updated successfully!")
-    except Exception as e:
-        st.error(f"Error updating review: {e}")
-    finally:
-        conn.close()
-
-def delete_review(review_id):
-    conn = sqlite3.connect(DB_FILE)
-    cursor = conn.cursor()
-    try:
-        cursor.execute("""
-            DELETE FROM reviews WHERE review_id = ?
-        """, (review_id,))
-        conn.commit()
-        st.success("Review deleted successfully!")
-    except Exception as e:
-        st.error(f"Error deleting review: {e}")
-    finally:
-        conn.close()
-
-def handle_steam_url_input():
-    steam_url = st.text_input("Enter your Steam Profile URL:", placeholder="https://steamcommunity.com/profiles/76561198882302331")
-    if st.button("Fetch My Steam Games"):
-        if steam_url:
-            user_id_or_vanity = extract_user_id(steam_url)
-            if user_id_or_vanity:
-                if user_id_or_vanity.isdigit():
-                    return user_id_or_vanity
-                else:
-                    resolved_id = resolve_vanity_url(user_id_or_vanity)
-                    if resolved_id:
-                        return resolved_id
-                    else:
-                        st.error("Could not resolve vanity URL to a Steam64 ID. Please ensure the URL is correct.")
-                        return None
-            else:
-                st.error("Invalid Steam URL format. Please try again.")
-                return None
-        else:
-            st.error("Please enter a valid Steam Profile URL.")
-            return None
-
-def get_username(user_id):
-    """Fetch username based on user_id."""
-    conn = sqlite3.connect(DB_FILE)
-    cursor = conn.cursor()
-    try:
-        cursor.execute("SELECT username FROM users WHERE user_id = ?", (user_id,))
-        result = cursor.fetchone()
-        return result[0] if result else None
-    except Exception as e:
-        st.error(f"Error fetching username: {e}")
-        return None
-    finally:
-        conn.close()
-
-def get_user_reviews_for_ai(user_id):
-    conn = sqlite3.connect(DB_FILE)
-    cursor = conn.cursor()
-    try:
-        # First, let's verify the user exists
-        cursor.execute("SELECT username FROM users WHERE user_id = ?", (user_id,))
-        user = cursor.fetchone()
-        if not user:
-            st.error(f"User ID {user_id} not found in database")
-            return []
-
-        # Direct query to get ALL reviews, without any joins initially
-        cursor.execute("""
-            SELECT r.review_id, r.review_text, r.rating, g.game_name
-            FROM reviews r
-            INNER JOIN games g ON r.game_id = g.id
-            WHERE r.user_id = ?
-        """, (user_id,))
-
-        reviews = cursor.fetchall()
-
-        # Debug output
-        st.write(f"Found {len(reviews)} reviews for user {user[0]}")
-        for review in reviews:
-            st.write(f"Game: {review[3]}")
-            st.write(f"Rating: {review[2]}")
-            st.write("---")
-
-        # Format reviews for return
-        formatted_reviews = [(r[3], r[1], r[2]) for r in reviews]
-        return formatted_reviews
-
-    except sqlite3.Error as e:
-        st.error(f"Database error: {e}")
-        return []
-    finally:
-        conn.close()
-
-
-def add_to_wishlist(user_id, steam_game_id, game_name, cover_url, store_url):
-    """Add a game to the user's wishlist if it is not already present."""
-    conn = sqlite3.connect(DB_FILE)
-    cursor = conn.cursor()
-    try:
-        # Check if the game is already in the wishlist
-        cursor.execute("""
-            SELECT id FROM wishlist WHERE user_id = ? AND steam_game_id = ?
-        """, (user_id, steam_game_id))
-        existing_entry = cursor.fetchone()
-
-        if existing_entry:
-            st.warning(f"'{game_name}' is already in your wishlist!")
-        else:
-            # Add the game to the wishlist
-            cursor.execute("""
-                INSERT INTO wishlist (user_id, steam_game_id, game_name, cover_url, store_url, added_on)
-                VALUES (?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
-            """, (user_id, steam_game_id, game_name, cover_url, store_url))
-            conn.commit()
-            st.success(f"'{game_name}' has been added to your wishlist!")
-    except Exception as e:
-        st.error(f"Error adding game to wishlist: {e}")
-    finally:
-        conn.close()
-
-def remove_from_wishlist(user_id, steam_game_id):
-    """Remove a game from the user's wishlist."""
-    conn = sqlite3.connect(DB_FILE)
-    cursor = conn.cursor()
-    try:
-        cursor.execute("""
-            DELETE FROM wishlist WHERE user_id = ? AND steam_game_id = ?
-        """, (user_id, steam_game_id))
-        conn.commit()
-        st.success("Game removed from your wishlist.")
-    except Exception as e:
-        st.error(f"Error removing game from wishlist: {e}")
-    finally:
-        conn.close()
-
-def fetch_wishlist(user_id):
-    """Fetch all games in the user's wishlist."""
-    conn = sqlite3.connect(DB_FILE)
-    cursor = conn.cursor()
-    try:
-        cursor.execute("""
-            SELECT steam_game_id, game_name, cover_url, store_url, added_on
-            FROM wishlist WHERE user_id = ?
-        """, (user_id,))
-        return cursor.fetchall()
-    except Exception as e:
-        st.error(f"Error fetching wishlist: {e}")
-        return []
-    finally:
-        conn.close()
-
-# Generate recommendations using Google Gemini
-def generate_recommendations(user_id, limit=10):
-    reviews = get_user_reviews_for_ai(user_id)
-
-    if not reviews:
-        return [{
-            "name": "No Reviews Found",
-            "description": "Please submit some game reviews to get personalized recommendations.",
-            "genres": "N/A"
-        }]
-
-    review_text = "\n".join([
-        f"Game: {game}\nReview: {review}\nRating: {rating}/5\n"
-        for game, review, rating in reviews
-    ])
-
-    prompt = f"""
-    Based on these user game reviews, recommend {limit} different Steam games.
-
-    User's Game Reviews:
-    {review_text}
-
-    For each game, provide exactly three lines in this format:
-    Game Name
-    Brief explanation of why this game matches the user's tastes (1-2 sentences)
-    Main genres separated by commas (e.g. Action, Adventure, RPG)
-    ---
-
-    Rules:
-    - Use plain text game names without any formatting
-    - Only recommend games available on Steam
-    - Do not recommend games the user has already reviewed
-    - Keep game names concise and exact as they appear on Steam
-    - Provide short, direct explanations
-    - Focus on games matching the user's demonstrated preferences
-
-    Please provide exactly {limit} recommendations following this format.
-    """
-
-    try:
-        response = model.generate_content(prompt)
-        recommendations = []
-
-        current_rec = {}
-        section = None
-
-        for line in response.text.split("\n"):
-            line = line.strip()
-            if not line or line == "---":
-                if current_rec and "name" in current_rec:
-                    current_rec.setdefault("description", "No description available")
-                    current_rec.setdefault("genres", "Genre information unavailable")
-                    recommendations.append(current_rec)
-                    current_rec = {}
-                continue
-
-            if not current_rec:
-                clean_name = line.strip('*').strip('_').strip()
-                current_rec = {"name": clean_name}
-                section = "description"
-            elif section == "description":
-                current_rec["description"] = line
-                section = "genres"
-            elif section == "genres":
-                current_rec["genres"] = line
-
-        if current_rec and "name" in current_rec:
-            current_rec.setdefault("description", "No description available")
-            current_rec.setdefault("genres", "Genre information unavailable")
-            recommendations.append(current_rec)
-
-        recommendations = recommendations[:limit]
-
-        if not recommendations:
-            return [{
-                "name": "No recommendations available",
-                "description": "Please try again.",
-                "genres": "N/A"
-            }]
-
-        return recommendations
-
-    except Exception as e:
-        return [{
-            "name": "Error",
-            "description": f"An error occurred: {str(e)}",
-            "genres": "N/A"
-        }]
-
 
 def display_recommendations(recommendations):
     """Display recommendations in a simple, clean format"""
     for rec in recommendations:
-        st.write(f"**{rec.get('name', 'Unknown Game')}**")
-        st.write(rec.get('description', 'No description available'))
-        genres = rec.get('genres', '')
-        if genres and genres != "N/A":
-            st.write(f"*{genres}*")
+        if rec.get("cover_url"):
+            col1, col2 = st.columns([1, 4])
+            with col1:
+                show_cover(rec["cover_url"])
+            body = col2
+        else:
+            body = st.container()
+        with body:
+            name = rec.get('name', 'Unknown Game')
+            if rec.get("store_url"):
+                st.write(f"**[{name}]({rec['store_url']})**")
+            else:
+                st.write(f"**{name}**")
+            st.write(rec.get('description', 'No description available'))
+            genres = rec.get('genres', '')
+            if genres and genres != "N/A":
+                st.write(f"*{genres}*")
         st.divider()
 
-# Streamlit UI
-st.set_page_config(page_title="Steam Recommendations", layout="wide")
-st.sidebar.title("Navigation")
-page = st.sidebar.radio("Select a page:", ["Register", "Login", "Add Steam Account", "Your Games", "Recommendations", "Your Reviews","Search Games", "My Wishlist", "Logout"])
 
-if page == "Register":
+def register_page():
     st.header("Create an Account")
     username = st.text_input("Username")
     password = st.text_input("Password", type="password")
@@ -868,197 +267,297 @@ if page == "Register":
         else:
             st.error("Please fill in all fields.")
 
-elif page == "Login":
+
+def login_page():
     st.header("Log In")
     username = st.text_input("Username")
     password = st.text_input("Password", type="password")
     if st.button("Log In"):
-        user = login_user(username, password)
+        user = gameagg.login_user(username, password)
         if user:
             st.session_state.user_id = user[0]
             st.success("Logged in successfully!")
         else:
             st.error("Invalid username or password.")
 
-elif page == "Logout":
-    logout_user()
 
-else:
-    if "user_id" not in st.session_state:
-        st.warning("Please log in to access this page.")
-        st.stop()
+def add_account_page(user_id):
+    st.header("Add Your Steam Account")
+    steam_user_id = handle_steam_url_input()
+    if steam_user_id:
+        result = import_library(user_id, steam_user_id)
+        if result and result.fetched:
+            st.success(f"Fetched {result.fetched} games from your Steam library!")
+        elif result is not None:
+            st.warning("No games found. Please check your Steam Profile URL or ensure your games are set to Public.")
 
-    user_id = st.session_state.user_id
 
-    if page == "Add Steam Account":
-        st.header("Add Your Steam Account")
-        steam_user_id = handle_steam_url_input()
-        if steam_user_id:
-            games = fetch_owned_games(steam_user_id)
-            if games:
-                add_games_to_db(games, st.session_state.user_id, steam_user_id)
-                st.success(f"Fetched {len(games)} games from your Steam library!")
-            else:
-                st.warning("No games found. Please check your Steam Profile URL or ensure your games are set to Public.")
+def wishlist_page(user_id):
+    st.header("Your Wishlist")
+    st.subheader("(Time is in GST)")
+
+    # Fetch the wishlist for the logged-in user
+    try:
+        wishlist = gameagg.fetch_wishlist(user_id)
+    except sqlite3.Error as e:
+        st.error(f"Error fetching wishlist: {e}")
+        wishlist = []
+
+    if wishlist:
+        gameagg.prefetch_thumbnails_sync(row[2] for row in wishlist)
+        for (steam_game_id, game_name, cover_url, store_url, added_on,
+             currency, initial_price, final_price, discount_percent) in wishlist:
+            # Display game image
+            show_cover(cover_url)
+
+            # Display game name as a hyperlink to the Steam store
+            st.write(f"**Name:** [{game_name}]({store_url})")
+
+            # Latest polled price, with the discount when on sale
+            price = format_price(final_price, currency)
+            if discount_percent:
+                price += f" (-{discount_percent}%, was {format_price(initial_price, currency)})"
+            st.write(f"**Price:** {price}")
+
+            # Show the timestamp when the game was added
+            st.write(f"**Added on:** {added_on}")
+
+            # Option to remove the game from the wishlist
+            if st.button(f"Remove from Wishlist: {game_name}", key=f"remove_{steam_game_id}"):
+                remove_from_wishlist(user_id, steam_game_id)
+    else:
+        # If the wishlist is empty
+        st.write("Your wishlist is empty.")
 
-    elif page == "My Wishlist":
-        st.header("Your Wishlist")
-        st.subheader("(Time is in GST)")
 
-        # Fetch the wishlist for the logged-in user
-        wishlist = fetch_wishlist(user_id)
+# "Your Games" Section with Steam Account Labeling Feature
+def games_page(user_id):
+    st.header("Your Steam Games")
 
-        if wishlist:
-            for steam_game_id, game_name, cover_url, store_url, added_on in wishlist:
-                # Display game image
-                st.image(cover_url, width=150)
+    # Fetch Steam accounts linked to the user
+    steam_accounts = gameagg.get_steam_accounts(user_id)
 
-                # Display game name as a hyperlink to the Steam store
-                st.write(f"**Name:** [{game_name}]({store_url})")
+    if not steam_accounts:
+        st.write("No Steam accounts linked. Please add your Steam account first.")
+        return
 
-                # Show the timestamp when the game was added
-                st.write(f"**Added on:** {added_on}")
+    # Convert Steam IDs to usernames
+    names = gameagg.get_steam_usernames_sync(steam_accounts)
+    options = [f"{names[account]} ({account})" for account in steam_accounts]
 
-                # Option to remove the game from the wishlist
-                if st.button(f"Remove from Wishlist: {game_name}", key=f"remove_{steam_game_id}"):
-                    remove_from_wishlist(user_id, steam_game_id)
-        else:
-            # If the wishlist is empty
-            st.write("Your wishlist is empty.")
-
-    # "Your Games" Section with Steam Account Labeling Feature
-    elif page == "Your Games":
-        st.header("Your Steam Games")
-
-        # Fetch Steam accounts linked to the user
-        conn = sqlite3.connect(DB_FILE)
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT DISTINCT steam_user_id
-            FROM games g WHERE user_id = ?
-        """, (user_id,))
-        steam_accounts = cursor.fetchall()
-        conn.close()
-
-        if not steam_accounts:
-            st.write("No Steam accounts linked. Please add your Steam account first.")
+    if len(steam_accounts) > 1 and st.button("Refresh All Linked Accounts"):
+        refresh_all_accounts(user_id, names)
+    selected_account = st.selectbox("Select Steam Account:", options)
+
+    if not selected_account or "None" in selected_account:
+        st.warning("Please select a valid Steam account to view the library.")
+        return
+
+    steam_user_id = steam_accounts[options.index(selected_account)]
+
+    # Enable Refresh Library button only if a valid account is selected
+    if st.button("Refresh Library"):
+        result = import_library(user_id, steam_user_id)
+        if result and result.fetched:
+            st.success("Library refreshed! Updated playtime and added any new games.")
+        elif result is not None:
+            st.warning("No games found or unable to fetch from Steam.")
+
+    sort_by = st.selectbox("Sort by:", ["Playtime", "Name"])
+    filter_genre = st.text_input("Filter by genre:")
+
+    # Fetch the games, already sorted and filtered, from the database
+    games = gameagg.get_games_from_db(user_id, steam_user_id, sort_by=sort_by.lower(), genre=filter_genre)
+    if not games:
+        if filter_genre:
+            st.write("No games on this account match that genre.")
         else:
-            # Convert Steam IDs to usernames
-            steam_accounts_with_names = [(account[0], get_steam_username(account[0])) for account in steam_accounts]
-            options = [f"{account[1]} ({account[0]})" for account in steam_accounts_with_names]
-            selected_account = st.selectbox("Select Steam Account:", options)
-
-            if selected_account:
-                # Extract Steam ID from the selected option
-                steam_user_id = selected_account.split('(')[-1].strip(')')
-
-            if selected_account and "None" not in selected_account:
-                steam_user_id = steam_accounts[options.index(selected_account)][0]
-
-                # Enable Refresh Library button only if a valid account is selected
-                if st.button("Refresh Library"):
-                    games = fetch_owned_games(steam_user_id)
-                    if games:
-                        add_games_to_db(games, user_id, steam_user_id)
-                        st.success(f"Library refreshed! Updated playtime and added any new games.")
-                    else:
-                        st.warning("No games found or unable to fetch from Steam.")
-
-                # Fetch and display games from the database
-                games = get_games_from_db(user_id, steam_user_id)
-                if games:
-                    sort_by = st.selectbox("Sort by:", ["Playtime", "Name"])
-                    filter_genre = st.text_input("Filter by genre:")
-                    games = sorted(games, key=lambda x: x[3], reverse=True) if sort_by == "Playtime" else sorted(games, key=lambda x: x[2])
-
-                    for game in games:
-                        if filter_genre.lower() in game[4].lower():
-                            col1, col2 = st.columns([1, 2])
-
-                            with col1:
-                                st.image(game[5], width=150)
-
-                            with col2:
-                                st.write(f"**[{game[2]}]({game[6]})**")
-                                hours = round(game[3] / 60, 1)
-                                st.write(f"**Playtime:** {game[3]} minutes ({hours} hours)")
-                                st.write(f"**Genres:** {game[4]}")
-
-                                # Add Wishlist button if it's not the user's own game
-                                if steam_user_id != st.session_state.get("steam_id"):
-                                    if not is_game_in_wishlist(user_id, game[1]):  # game[1] is steam_game_id
-                                        if st.button(f"Add to Wishlist: {game[2]}", key=f"wishlist_{game[1]}"):
-                                            add_to_wishlist(user_id, game[1], game[2], game[5], game[6])
-                                    else:
-                                        st.info(f"{game[2]} is already in your wishlist!")
-
-                            # Review Section
-                            if has_existing_review(user_id, game[1]):
-                                st.info(f"You have already reviewed {game[2]}. You can edit your review from the 'Your Reviews' page.")
-                            else:
-                                with st.expander(f"Review {game[2]}"):
-                                    review = st.text_area(f"Leave a review for {game[2]}", key=f"review_{game[0]}")
-                                    rating = st.slider(f"Rate {game[2]}", 1, 5, key=f"rating_{game[0]}")
-                                    if st.button(f"Submit Review for {game[2]}", key=f"submit_{game[0]}"):
-                                        add_review(user_id, game[1], game[2], review, rating)
-                                        st.success("Review submitted successfully.")
-
-                            st.divider()
+            st.write("You don't own any games on this account.")
+        return
+
+    for game in games:
+        col1, col2 = st.columns([1, 2])
+
+        with col1:
+            show_cover(game.cover_url)
+
+        with col2:
+            st.write(f"**[{game.name}]({game.store_url})**")
+            hours = round(game.playtime / 60, 1)
+            st.write(f"**Playtime:** {game.playtime} minutes ({hours} hours)")
+            st.write(f"**Genres:** {game.genres}")
+
+            # Add Wishlist button if it's not the user's own game
+            if steam_user_id != st.session_state.get("steam_id"):
+                if not is_game_in_wishlist(user_id, game.appid):
+                    if st.button(f"Add to Wishlist: {game.name}", key=f"wishlist_{game.appid}"):
+                        add_to_wishlist(user_id, game.appid, game.name, game.cover_url, game.store_url)
                 else:
-                    st.write("You don't own any games on this account.")
-            else:
-                st.warning("Please select a valid Steam account to view the library.")
+                    st.info(f"{game.name} is already in your wishlist!")
 
-    elif page == "Your Reviews":
-        st.header("Your Reviews And Notes")
-        st.subheader("(Time is in GST)")
-        user_id = st.session_state.get("user_id")
-        if not user_id:
-            st.warning("You must be logged in to view your reviews.")
-        else:
-            reviews = get_user_reviews(user_id)
-            if reviews:
-                for review_id, game_name, review_text, rating, created_at in reviews:
-                    st.subheader(f"{game_name}")
-                    st.write(f"**Rating:** {rating}/5")
-                    st.write(f"**Review:** {review_text}")
-                    st.write(f"**Date:** {created_at}")
-
-                    # Option to edit the review
-                    new_review_text = st.text_area(f"Edit Review for {game_name}", value=review_text, key=f"edit_text_{review_id}")
-                    new_rating = st.slider(f"Edit Rating for {game_name}", 1, 5, value=rating, key=f"edit_rating_{review_id}")
-                    if st.button(f"Save Changes to Review for {game_name}", key=f"edit_button_{review_id}"):
-                        update_review(review_id, new_review_text, new_rating)
-                        st.success(f"Review for {game_name} updated!")
-
-                    # Option to delete the review
-                    if st.button(f"Delete Review for {game_name}", key=f"delete_button_{review_id}"):
-                        delete_review(review_id)
-            else:
-                st.write("You have not submitted any reviews yet.")
+        # Review Section
+        review_form(user_id, game.appid, game.name, game.id, "Leave a review for")
 
-    # Streamlit Recommendations Tab
-    elif page == "Recommendations":
-        st.header("Personalized Game Recommendations")
+        st.divider()
 
-        # Get username for personalization
-        username = get_username(user_id)
-        if username:
-            st.write(f"Welcome back, **{username}**! Based on your reviews, here are some games you might enjoy:")
 
-        # Add refresh button
-        if st.button("🔄 Refresh Recommendations"):
-            st.session_state.rec_data = generate_recommendations(user_id, limit=10)
+def reviews_page(user_id):
+    st.header("Your Reviews And Notes")
+    st.subheader("(Time is in GST)")
 
-        # Generate initial recommendations if needed
-        if "rec_data" not in st.session_state:
-            st.session_state.rec_data = generate_recommendations(user_id, limit=10)
+    query = st.text_input("Search your reviews:", placeholder='e.g. co-op or "great story"')
+    col1, col2, col3 = st.columns([2, 1, 1])
+    with col1:
+        min_rating, max_rating = st.slider("Rating", 1, 5, (1, 5))
+    with col2:
+        since = st.date_input("From", value=None)
+    with col3:
+        until = st.date_input("To", value=None)
+    page = st.session_state.get("reviews_page", 1)
 
-        # Display recommendations
-        if st.session_state.rec_data:
-            display_recommendations(st.session_state.rec_data)
+    try:
+        results = search_reviews(user_id, query, min_rating, max_rating, since, until, page=page)
+    except sqlite3.Error as e:
+        st.error(f"Error fetching reviews: {e}")
+        return
+    if not results.total:
+        if query or (min_rating, max_rating) != (1, 5) or since or until:
+            st.write("No reviews match your search.")
         else:
-            st.warning("Unable to generate recommendations at this time. Please try again later.")
+            st.write("You have not submitted any reviews yet.")
+        return
 
-    elif page == "Search Games":
-        search_and_display_games()
\ No newline at end of file
+    pages = -(-results.total // results.page_size)
+    if page > pages:
+        # Filters narrowed the results below the remembered page
+        st.session_state["reviews_page"] = page = pages
+        results = search_reviews(user_id, query, min_rating, max_rating, since, until, page=page)
+    st.caption(f"{results.total} reviews found")
+    for hit in results.hits:
+        review_id, game_name, review_text, rating = hit.review_id, hit.game_name, hit.review_text, hit.rating
+        st.subheader(f"{game_name}")
+        st.write(f"**Rating:** {rating}/5")
+        st.write(f"**Review:** {hit.snippet or review_text}")
+        st.write(f"**Date:** {hit.created_at}")
+
+        # Option to edit the review
+        with st.expander(f"Edit or delete your review of {game_name}"):
+            new_review_text = st.text_area(f"Edit Review for {game_name}", value=review_text, key=f"edit_text_{review_id}")
+            new_rating = st.slider(f"Edit Rating for {game_name}", 1, 5, value=rating, key=f"edit_rating_{review_id}")
+            if st.button(f"Save Changes to Review for {game_name}", key=f"edit_button_{review_id}"):
+                update_review(review_id, new_review_text, new_rating)
+
+            # Option to delete the review
+            if st.button(f"Delete Review for {game_name}", key=f"delete_button_{review_id}"):
+                delete_review(review_id)
+
+    if pages > 1:
+        st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, key="reviews_page")
+
+
+def stats_page(user_id):
+    st.header("Your Library Statistics")
+    stats = get_library_stats(user_id)
+    if not stats.game_count and not stats.review_count:
+        st.write("No games or reviews yet. Add your Steam account to see statistics.")
+        return
+
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Games", stats.game_count)
+    col2.metric("Total playtime", f"{round(stats.total_playtime / 60, 1)} h")
+    col3.metric("Backlog (never played)", stats.backlog_count)
+    col4.metric("Average rating", f"{stats.average_rating:.1f}/5" if stats.average_rating else "N/A")
+
+    st.subheader("Playtime by genre (hours)")
+    st.bar_chart({genre: round(playtime / 60, 1) for genre, playtime, _ in stats.genres})
+
+    st.subheader("Most played")
+    for name, playtime in stats.most_played:
+        st.write(f"**{name}** – {round(playtime / 60, 1)} hours")
+
+    st.subheader("Rating distribution")
+    st.bar_chart({f"{rating}/5": count for rating, count in stats.ratings.items()})
+
+
+# Streamlit Recommendations Tab
+def recommendations_page(user_id):
+    st.header("Personalized Game Recommendations")
+
+    # Get username for personalization
+    username = gameagg.get_username(user_id)
+    if username:
+        st.write(f"Welcome back, **{username}**! Based on your reviews, here are some games you might enjoy:")
+
+    # Add refresh button
+    if st.button("🔄 Refresh Recommendations"):
+        st.session_state.rec_data = gameagg.generate_recommendations(user_id, limit=10, refresh=True)
+
+    # Generate initial recommendations if needed
+    if "rec_data" not in st.session_state:
+        st.session_state.rec_data = gameagg.generate_recommendations(user_id, limit=10)
+
+    # Display recommendations
+    if st.session_state.rec_data:
+        display_recommendations(st.session_state.rec_data)
+    else:
+        st.warning("Unable to generate recommendations at this time. Please try again later.")
+
+    # Collaborative picks from the offline similarity table
+    try:
+        also_played = gameagg.players_also_played(user_id, limit=10)
+    except sqlite3.Error as e:
+        also_played = []
+        st.error(f"Database error: {e}")
+    if also_played:
+        st.subheader("Players who loved your favourites also played")
+        for game in also_played:
+            col1, col2 = st.columns([1, 4])
+            with col1:
+                show_cover(game.cover_url)
+            with col2:
+                name = game.game_name or game.appid
+                st.write(f"**[{name}]({game.store_url})**" if game.store_url else f"**{name}**")
+        st.divider()
+
+
+PAGES = {
+    "Add Steam Account": add_account_page,
+    "Your Games": games_page,
+    "Recommendations": recommendations_page,
+    "Your Reviews": reviews_page,
+    "Statistics": stats_page,
+    "Search Games": lambda user_id: search_and_display_games(),
+    "My Wishlist": wishlist_page,
+}
+
+
+# Streamlit UI
+def main():
+    st.set_page_config(page_title="Steam Recommendations", layout="wide")
+    st.sidebar.title("Navigation")
+    page = st.sidebar.radio("Select a page:", ["Register", "Login", "Add Steam Account", "Your Games", "Recommendations", "Your Reviews", "Statistics", "Search Games", "My Wishlist", "Logout"])
+
+    if page == "Register":
+        register_page()
+    elif page == "Login":
+        login_page()
+    elif page == "Logout":
+        logout_user()
+    else:
+        if "user_id" not in st.session_state:
+            st.warning("Please log in to access this page.")
+            st.stop()
+        PAGES[page](st.session_state.user_id)
+
+    # Rendered after the page so it reflects the calls made while drawing it
+    for upstream in gameagg.open_upstreams():
+        st.sidebar.warning(f"{upstream} is unavailable; showing saved data where possible.")
+    metrics = gameagg.breaker_metrics()
+    if metrics:
+        with st.sidebar.expander("Service status"):
+            st.table({name: {"state": m["state"], "calls": m["calls"], "failures": m["failures"],
+                             "slow": m["slow_calls"], "rejected": m["rejected"]} for name, m in metrics.items()})
+
+
+if __name__ == "__main__":
+    main()